@@ -1,51 +1,63 @@
 import logging
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from utils.BasePage import BasePage
+from utils.BasePage import BasePage, ReadyGate
 
 log = logging.getLogger(__name__)
 
 # --- 1. Cart Page ---
 
 class CartPage(BasePage):
+    URL_PATH = "cart.html"
+
     PAGE_TITLE = (By.CLASS_NAME, "title")
     CHECKOUT_BUTTON = (By.ID, "checkout")
     ITEM_NAME = (By.CLASS_NAME, "inventory_item_name")
 
+    READY_GATES = (ReadyGate.element(PAGE_TITLE, "present"),)
+
     def __init__(self, driver):
         super().__init__(driver)
         log.info("CartPage initialized.")
-        # Wait for cart page to be fully loaded
-        self.wait.until(EC.presence_of_element_located(self.PAGE_TITLE))
 
-    def is_item_in_cart(self, item_name):
-        log.info(f"Verifying if '{item_name}' is in cart.")
+    def get_cart_item_names(self, timeout=None):
+        """
+        Returns the names of every item row in the cart. Waits for the first
+        row to be visible (the cart may still be rendering) and reads every
+        row in the same round trip. An empty cart returns [] once the wait
+        budget runs out.
+        """
         try:
-            item_text = self.get_element_text(self.ITEM_NAME)
-            return item_text == item_name
-        except:
-            return False
+            state = self.query_elements({"items": self.ITEM_NAME}, wait_for="visible", timeout=timeout)
+        except TimeoutException:
+            return []
+        return state["items"]["texts"]
+
+    def is_item_in_cart(self, item_name):
+        log.info("Verifying if '%s' is in cart.", item_name)
+        return item_name in self.get_cart_item_names()
 
     def proceed_to_checkout(self):
         log.info("Proceeding to checkout step 1.")
         self.do_click(self.CHECKOUT_BUTTON)
         # Page Chaining: Return the next page in the flow
-        return CheckoutInfoPage(self.driver)
+        return self.chain_to(CheckoutInfoPage)
 
 # --- 2. Checkout Info Page ---
 
 class CheckoutInfoPage(BasePage):
+    URL_PATH = "checkout-step-one.html"
+
     FIRST_NAME_INPUT = (By.ID, "first-name")
     LAST_NAME_INPUT = (By.ID, "last-name")
     POSTAL_CODE_INPUT = (By.ID, "postal-code")
     CONTINUE_BUTTON = (By.ID, "continue")
 
+    READY_GATES = (ReadyGate.element(FIRST_NAME_INPUT, "present"),)
+
     def __init__(self, driver):
         super().__init__(driver)
         log.info("CheckoutInfoPage initialized.")
-        # Wait for the first form field to be ready before proceeding
-        # This helps with headless mode stability
-        self.wait.until(EC.presence_of_element_located(self.FIRST_NAME_INPUT))
 
     def fill_shipping_info(self, first, last, code):
         log.info("Filling shipping information.")
@@ -54,43 +66,68 @@ class CheckoutInfoPage(BasePage):
         self.do_send_keys(self.POSTAL_CODE_INPUT, code)
         self.do_click(self.CONTINUE_BUTTON)
         # Page Chaining: Return the next page in the flow
-        return CheckoutOverviewPage(self.driver)
+        return self.chain_to(CheckoutOverviewPage)
 
 # --- 3. Checkout Overview Page ---
 
 class CheckoutOverviewPage(BasePage):
+    URL_PATH = "checkout-step-two.html"
+
     FINISH_BUTTON = (By.ID, "finish")
     ITEM_TOTAL_LABEL = (By.CLASS_NAME, "summary_subtotal_label")
+    TAX_LABEL = (By.CLASS_NAME, "summary_tax_label")
+    TOTAL_LABEL = (By.CLASS_NAME, "summary_total_label")
+
+    READY_GATES = (ReadyGate.element(ITEM_TOTAL_LABEL, "present"),)
 
     def __init__(self, driver):
         super().__init__(driver)
         log.info("CheckoutOverviewPage initialized.")
-        # Wait for overview page to be fully loaded
-        self.wait.until(EC.presence_of_element_located(self.ITEM_TOTAL_LABEL))
 
     def get_item_total(self):
-        return self.get_element_text(self.ITEM_TOTAL_LABEL)
+        return self.get_summary()["item_total"]
+
+    def get_summary(self):
+        """
+        Returns the item total, tax and total labels in one round trip.
+        """
+        state = self.query_elements(
+            {"item_total": self.ITEM_TOTAL_LABEL, "tax": self.TAX_LABEL, "total": self.TOTAL_LABEL},
+            wait_for="visible",
+        )
+        return {name: entry["text"] for name, entry in state.items()}
 
     def finish_checkout(self):
         log.info("Finishing checkout.")
         self.do_click(self.FINISH_BUTTON)
         # Page Chaining: Return the final page in the flow
-        return CheckoutCompletePage(self.driver)
+        return self.chain_to(CheckoutCompletePage)
 
 # --- 4. Checkout Complete Page ---
 
 class CheckoutCompletePage(BasePage):
+    URL_PATH = "checkout-complete.html"
+
     COMPLETE_HEADER = (By.CLASS_NAME, "complete-header")
     COMPLETE_TEXT = (By.CLASS_NAME, "complete-text")
 
+    READY_GATES = (ReadyGate.element(COMPLETE_HEADER, "present"),)
+
     def __init__(self, driver):
         super().__init__(driver)
         log.info("CheckoutCompletePage initialized.")
-        # Wait for complete page to be fully loaded
-        self.wait.until(EC.presence_of_element_located(self.COMPLETE_HEADER))
 
     def get_complete_message(self):
         return self.get_element_text(self.COMPLETE_HEADER)
 
     def get_complete_text(self):
         return self.get_element_text(self.COMPLETE_TEXT)
+
+    def get_confirmation(self):
+        """
+        Returns the header and body text of the confirmation in one round trip.
+        """
+        state = self.query_elements(
+            {"header": self.COMPLETE_HEADER, "text": self.COMPLETE_TEXT}, wait_for="visible"
+        )
+        return state["header"]["text"], state["text"]["text"]
@@ -1,7 +1,7 @@
 import logging
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from utils.BasePage import BasePage
+from utils.BasePage import BasePage, ReadyGate
 
 log = logging.getLogger(__name__)
 
@@ -10,6 +10,9 @@ class InventoryPage(BasePage):
     Page Object for the main Inventory/Product Page.
     """
 
+    # Path of this page relative to the site's base URL
+    URL_PATH = "inventory.html"
+
     # --- Locators ---
     PAGE_TITLE = (By.CLASS_NAME, "title")
     ADD_TO_CART_BACKPACK = (By.ID, "add-to-cart-sauce-labs-backpack")
@@ -17,22 +20,38 @@ class InventoryPage(BasePage):
     SHOPPING_CART_LINK = (By.CLASS_NAME, "shopping_cart_link")
     SHOPPING_CART_BADGE = (By.CLASS_NAME, "shopping_cart_badge")
 
+    READY_GATES = (ReadyGate.element(PAGE_TITLE, "visible"),)
+    PERF_BUDGETS = {"domContentLoaded": 800}
+
     def __init__(self, driver):
         super().__init__(driver)
         log.info("InventoryPage initialized.")
 
     # --- Verification Methods ---
 
-    def is_inventory_page_displayed(self):
+    def is_inventory_page_displayed(self, timeout=None):
         """
-        Verifies the user is on the inventory page by checking for the title.
+        Verifies the user is on the inventory page: its URL is loaded and the
+        title is visible (the page's readiness gates).
         """
         log.info("Checking if inventory page is displayed.")
-        return self.is_element_visible(self.PAGE_TITLE)
+        try:
+            self.wait_until_ready(timeout)
+            return True
+        except TimeoutException:
+            log.warning("Inventory page not displayed after %ss.", self.timeout if timeout is None else timeout)
+            return False
 
     def get_page_title_text(self):
         return self.get_element_text(self.PAGE_TITLE)
 
+    def get_cart_badge_count(self):
+        """
+        Returns the number shown on the cart badge (0 when there is no badge).
+        """
+        state = self.query_elements({"badge": self.SHOPPING_CART_BADGE})
+        return int(state["badge"]["text"]) if state["badge"]["visible"] else 0
+
     # --- High-Level Action Methods ---
 
     def add_backpack_to_cart(self):
@@ -41,9 +60,11 @@ class InventoryPage(BasePage):
         """
         log.info("Adding 'Sauce Labs Backpack' to cart.")
         self.do_click(self.ADD_TO_CART_BACKPACK)
-        # Verify the "Remove" button appears and cart badge updates
-        self.wait.until(EC.visibility_of_element_located(self.REMOVE_FROM_CART_BACKPACK))
-        self.wait.until(EC.visibility_of_element_located(self.SHOPPING_CART_BADGE))
+        # Verify the "Remove" button appears and cart badge updates (one round trip)
+        self.query_elements(
+            {"remove_button": self.REMOVE_FROM_CART_BACKPACK, "cart_badge": self.SHOPPING_CART_BADGE},
+            wait_for="visible",
+        )
 
     def go_to_cart(self):
         """
@@ -57,4 +78,4 @@ class InventoryPage(BasePage):
         # We import the next Page Object and return an instance of it.
         # This makes test scripts fluent and logical.
         from pages.CheckoutFlowPage import CartPage
-        return CartPage(self.driver)
+        return self.chain_to(CartPage)
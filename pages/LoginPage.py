@@ -1,6 +1,6 @@
 import logging
 from selenium.webdriver.common.by import By
-from utils.BasePage import BasePage
+from utils.BasePage import BasePage, ReadyGate
 
 # Get a logger
 log = logging.getLogger(__name__)
@@ -17,6 +17,11 @@ class LoginPage(BasePage):
     LOGIN_BUTTON = (By.ID, "login-button")
     ERROR_MESSAGE = (By.CSS_SELECTOR, "h3[data-test='error']")
 
+    # The form is usable as soon as the login button is; images and
+    # third-party scripts are not waited for
+    READY_GATES = (ReadyGate.element(LOGIN_BUTTON, "clickable"),)
+    PERF_BUDGETS = {"domContentLoaded": 800, "firstContentfulPaint": 1500}
+
     def __init__(self, driver):
         """
         Pass the driver to the BasePage's constructor
@@ -28,24 +33,27 @@ class LoginPage(BasePage):
 
     def navigate_to_login_page(self, url):
         """
-        Navigates the driver to the provided login URL.
+        Navigates the driver to the provided login URL and waits until the
+        login form can be used.
         """
-        log.info(f"Navigating to login page: {url}")
+        log.info("Navigating to login page: %s", url, extra={"event": "navigate"})
+        self.clear_element_cache()
         self.driver.get(url)
+        self.wait_until_ready()
 
     def login(self, username, password):
         """
         Performs a full login action by filling fields and clicking submit.
         This method uses the inherited 'do_send_keys' and 'do_click'.
         """
-        log.info(f"Attempting login with user: {username}")
+        log.info("Attempting login with user: %s", username)
         try:
             self.do_send_keys(self.USERNAME_INPUT, username)
             self.do_send_keys(self.PASSWORD_INPUT, password)
             self.do_click(self.LOGIN_BUTTON)
             log.info("Login form submitted.")
         except Exception as e:
-            log.error(f"Error during login: {e}", exc_info=True)
+            log.error("Error during login: %s", e, exc_info=True)
             raise
 
     def get_error_message(self):
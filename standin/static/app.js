@@ -0,0 +1,304 @@
+// Client-side behaviour of the saucedemo stand-in.
+// Mirrors the IDs, classes, messages and storage keys of https://www.saucedemo.com/
+// that the page objects rely on. The session lives in the 'session-username'
+// cookie and the cart in localStorage 'cart-contents', like the real site.
+(function () {
+    "use strict";
+
+    var PASSWORD = "secret_sauce";
+    var USERS = [
+        "standard_user", "locked_out_user", "problem_user",
+        "performance_glitch_user", "error_user", "visual_user"
+    ];
+    var SESSION_COOKIE = "session-username";
+    var CART_KEY = "cart-contents";
+    var TAX_RATE = 0.08;
+
+    var PRODUCTS = [
+        {id: 4, name: "Sauce Labs Backpack", price: 29.99,
+         desc: "carry.allTheThings() with the sleek, streamlined Sly Pack that melds uncompromising style with unequaled laptop and tablet protection."},
+        {id: 0, name: "Sauce Labs Bike Light", price: 9.99,
+         desc: "A red light isn't the desired state in testing but it sure helps when riding your bike at night. Water-resistant with 3 lighting modes, 1 AAA battery included."},
+        {id: 1, name: "Sauce Labs Bolt T-Shirt", price: 15.99,
+         desc: "Get your testing superhero on with the Sauce Labs bolt T-shirt. From American Apparel, 100% ringspun combed cotton, heather gray with red bolt."},
+        {id: 5, name: "Sauce Labs Fleece Jacket", price: 49.99,
+         desc: "It's not every day that you come across a midweight quarter-zip fleece jacket capable of handling everything from a relaxing day outdoors to a busy day at the office."},
+        {id: 2, name: "Sauce Labs Onesie", price: 7.99,
+         desc: "Rib snap infant onesie for the junior automation engineer in development. Reinforced 3-snap bottom closure, two-needle hemmed sleeved and bottom won't unravel."},
+        {id: 3, name: "Test.allTheThings() T-Shirt (Red)", price: 15.99,
+         desc: "This classic Sauce Labs t-shirt is perfect to wear when cozying up to your keyboard to automate a few tests. Super-soft and comfy ringspun combed cotton."}
+    ];
+
+    // --- Session and cart storage ---
+
+    function getSessionUser() {
+        var match = document.cookie.match(new RegExp("(?:^|; )" + SESSION_COOKIE + "=([^;]*)"));
+        return match ? decodeURIComponent(match[1]) : null;
+    }
+
+    function startSession(user) {
+        document.cookie = SESSION_COOKIE + "=" + encodeURIComponent(user) + "; path=/; max-age=600";
+    }
+
+    function getCart() {
+        try {
+            return JSON.parse(window.localStorage.getItem(CART_KEY)) || [];
+        } catch (e) {
+            return [];
+        }
+    }
+
+    function setCart(ids) {
+        if (ids.length) {
+            window.localStorage.setItem(CART_KEY, JSON.stringify(ids));
+        } else {
+            window.localStorage.removeItem(CART_KEY);
+        }
+    }
+
+    function toggleCartItem(id) {
+        var cart = getCart();
+        var index = cart.indexOf(id);
+        if (index === -1) {
+            cart.push(id);
+        } else {
+            cart.splice(index, 1);
+        }
+        setCart(cart);
+    }
+
+    function cartProducts() {
+        var cart = getCart();
+        return PRODUCTS.filter(function (p) { return cart.indexOf(p.id) !== -1; });
+    }
+
+    // --- DOM helpers ---
+
+    function h(tag, attrs, children) {
+        var node = document.createElement(tag);
+        Object.keys(attrs || {}).forEach(function (name) {
+            if (name === "text") {
+                node.textContent = attrs[name];
+            } else if (name === "onclick") {
+                node.addEventListener("click", attrs[name]);
+            } else {
+                node.setAttribute(name, attrs[name]);
+            }
+        });
+        (children || []).forEach(function (child) { if (child) { node.appendChild(child); } });
+        return node;
+    }
+
+    function slug(name) {
+        return name.toLowerCase().replace(/\s+/g, "-");
+    }
+
+    function money(value) {
+        return "$" + value.toFixed(2);
+    }
+
+    function go(path) {
+        window.location.href = path;
+    }
+
+    function header(title) {
+        var count = getCart().length;
+        var cartLink = h("a", {"class": "shopping_cart_link", "data-test": "shopping-cart-link",
+                               onclick: function () { go("cart.html"); }},
+                         [count ? h("span", {"class": "shopping_cart_badge", "data-test": "shopping-cart-badge",
+                                             text: String(count)}) : null]);
+        return h("div", {id: "header_container", "class": "header_container"}, [
+            h("div", {"class": "primary_header"}, [
+                h("div", {"class": "app_logo", text: "Swag Labs"}),
+                h("div", {id: "shopping_cart_container", "class": "shopping_cart_container"}, [cartLink])
+            ]),
+            h("div", {"class": "header_secondary_container"}, [
+                h("span", {"class": "title", "data-test": "title", text: title})
+            ])
+        ]);
+    }
+
+    function itemRow(product, rowClass, withButton, rerender) {
+        var inCart = getCart().indexOf(product.id) !== -1;
+        var button = null;
+        if (withButton) {
+            button = h("button", {
+                "class": "btn btn_small btn_inventory " + (inCart ? "btn_secondary" : "btn_primary"),
+                id: (inCart ? "remove-" : "add-to-cart-") + slug(product.name),
+                name: (inCart ? "remove-" : "add-to-cart-") + slug(product.name),
+                text: inCart ? "Remove" : "Add to cart",
+                onclick: function () { toggleCartItem(product.id); rerender(); }
+            });
+        }
+        return h("div", {"class": rowClass, "data-test": rowClass.replace(/_/g, "-")}, [
+            rowClass === "inventory_item" ? h("div", {"class": "inventory_item_img"}, [
+                h("img", {src: "static/img/item.svg", alt: product.name, "class": "inventory_item_img"})
+            ]) : h("div", {"class": "cart_quantity", text: "1"}),
+            h("div", {"class": "inventory_item_description"}, [
+                h("a", {id: "item_" + product.id + "_title_link", href: "#"}, [
+                    h("div", {"class": "inventory_item_name", "data-test": "inventory-item-name", text: product.name})
+                ]),
+                h("div", {"class": "inventory_item_desc", text: product.desc}),
+                h("div", {"class": "pricebar"}, [
+                    h("div", {"class": "inventory_item_price", text: money(product.price)}),
+                    button
+                ])
+            ])
+        ]);
+    }
+
+    function mount(children) {
+        var root = document.getElementById("root");
+        root.textContent = "";
+        children.forEach(function (child) { root.appendChild(child); });
+    }
+
+    function showError(container, message) {
+        container.textContent = "";
+        container.appendChild(h("h3", {"data-test": "error", text: message}));
+    }
+
+    // --- Pages ---
+
+    function renderLogin() {
+        var form = document.getElementById("login-form");
+        var errors = document.querySelector(".error-message-container");
+
+        var denied = new URLSearchParams(window.location.search).get("denied");
+        if (denied) {
+            showError(errors, "Epic sadface: You can only access '/" + denied + "' when you are logged in.");
+        }
+
+        form.addEventListener("submit", function (event) {
+            event.preventDefault();
+            var user = document.getElementById("user-name").value;
+            var password = document.getElementById("password").value;
+
+            if (!user) {
+                showError(errors, "Epic sadface: Username is required");
+            } else if (!password) {
+                showError(errors, "Epic sadface: Password is required");
+            } else if (USERS.indexOf(user) === -1 || password !== PASSWORD) {
+                showError(errors, "Epic sadface: Username and password do not match any user in this service");
+            } else if (user === "locked_out_user") {
+                showError(errors, "Epic sadface: Sorry, this user has been locked out.");
+            } else {
+                startSession(user);
+                go("inventory.html");
+            }
+        });
+    }
+
+    function renderInventory() {
+        mount([
+            header("Products"),
+            h("div", {id: "inventory_container", "class": "inventory_list", "data-test": "inventory-list"},
+              PRODUCTS.map(function (p) { return itemRow(p, "inventory_item", true, renderInventory); }))
+        ]);
+    }
+
+    function renderCart() {
+        mount([
+            header("Your Cart"),
+            h("div", {"class": "cart_list", "data-test": "cart-list"},
+              cartProducts().map(function (p) { return itemRow(p, "cart_item", true, renderCart); })),
+            h("div", {"class": "cart_footer"}, [
+                h("button", {"class": "btn btn_secondary back btn_medium", id: "continue-shopping",
+                             text: "Continue Shopping", onclick: function () { go("inventory.html"); }}),
+                h("button", {"class": "btn btn_action btn_medium checkout_button", id: "checkout",
+                             text: "Checkout", onclick: function () { go("checkout-step-one.html"); }})
+            ])
+        ]);
+    }
+
+    function renderCheckoutInfo() {
+        var errors = h("div", {"class": "error-message-container"});
+        var form = h("form", {id: "checkout-info-form"}, [
+            h("div", {"class": "checkout_info"}, [
+                h("input", {"class": "input_error form_input", placeholder: "First Name", type: "text",
+                            id: "first-name", name: "firstName", "data-test": "firstName"}),
+                h("input", {"class": "input_error form_input", placeholder: "Last Name", type: "text",
+                            id: "last-name", name: "lastName", "data-test": "lastName"}),
+                h("input", {"class": "input_error form_input", placeholder: "Zip/Postal Code", type: "text",
+                            id: "postal-code", name: "postalCode", "data-test": "postalCode"})
+            ]),
+            errors,
+            h("div", {"class": "checkout_buttons"}, [
+                h("button", {"class": "btn btn_secondary back btn_medium cart_cancel_link", id: "cancel",
+                             type: "button", text: "Cancel", onclick: function () { go("cart.html"); }}),
+                h("input", {"class": "submit-button btn btn_primary cart_button btn_action", type: "submit",
+                            id: "continue", name: "continue", value: "Continue", "data-test": "continue"})
+            ])
+        ]);
+        form.addEventListener("submit", function (event) {
+            event.preventDefault();
+            var fields = [["first-name", "First Name"], ["last-name", "Last Name"], ["postal-code", "Postal Code"]];
+            for (var i = 0; i < fields.length; i++) {
+                if (!document.getElementById(fields[i][0]).value) {
+                    showError(errors, "Error: " + fields[i][1] + " is required");
+                    return;
+                }
+            }
+            go("checkout-step-two.html");
+        });
+        mount([header("Checkout: Your Information"), h("div", {"class": "checkout_info_wrapper"}, [form])]);
+    }
+
+    function renderCheckoutOverview() {
+        var products = cartProducts();
+        var itemTotal = products.reduce(function (sum, p) { return sum + p.price; }, 0);
+        var tax = Math.round(itemTotal * TAX_RATE * 100) / 100;
+        mount([
+            header("Checkout: Overview"),
+            h("div", {"class": "cart_list"}, products.map(function (p) { return itemRow(p, "cart_item", false); })),
+            h("div", {"class": "summary_info"}, [
+                h("div", {"class": "summary_subtotal_label", "data-test": "subtotal-label",
+                          text: "Item total: " + money(itemTotal)}),
+                h("div", {"class": "summary_tax_label", "data-test": "tax-label", text: "Tax: " + money(tax)}),
+                h("div", {"class": "summary_info_label summary_total_label", "data-test": "total-label",
+                          text: "Total: " + money(itemTotal + tax)}),
+                h("div", {"class": "cart_footer"}, [
+                    h("button", {"class": "btn btn_secondary back btn_medium cart_cancel_link", id: "cancel",
+                                 text: "Cancel", onclick: function () { go("inventory.html"); }}),
+                    h("button", {"class": "btn btn_action btn_medium cart_button", id: "finish", text: "Finish",
+                                 onclick: function () { setCart([]); go("checkout-complete.html"); }})
+                ])
+            ])
+        ]);
+    }
+
+    function renderCheckoutComplete() {
+        mount([
+            header("Checkout: Complete!"),
+            h("div", {id: "checkout_complete_container", "class": "checkout_complete_container"}, [
+                h("h2", {"class": "complete-header", "data-test": "complete-header", text: "Thank you for your order!"}),
+                h("div", {"class": "complete-text", "data-test": "complete-text",
+                          text: "Your order has been dispatched, and will arrive just as fast as the pony can get there!"}),
+                h("button", {"class": "btn btn_primary btn_small", id: "back-to-products", text: "Back Home",
+                             onclick: function () { go("inventory.html"); }})
+            ])
+        ]);
+    }
+
+    var PAGES = {
+        "inventory": renderInventory,
+        "cart": renderCart,
+        "checkout-step-one": renderCheckoutInfo,
+        "checkout-step-two": renderCheckoutOverview,
+        "checkout-complete": renderCheckoutComplete
+    };
+
+    document.addEventListener("DOMContentLoaded", function () {
+        var page = document.body.getAttribute("data-page");
+        if (page === "login") {
+            renderLogin();
+            return;
+        }
+        if (!getSessionUser()) {
+            // Same guard as the real site: protected pages bounce to the login form
+            window.location.replace("./?denied=" + page + ".html");
+            return;
+        }
+        PAGES[page]();
+    });
+})();
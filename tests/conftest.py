@@ -7,23 +7,91 @@ project_root = Path(__file__).resolve().parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
+import argparse
 import pytest
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from webdriver_manager.firefox import GeckoDriverManager
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.support import expected_conditions as EC
+from utils.DriverFactory import create_driver, create_remote_driver, prepare_launch_profile, SUPPORTED_BROWSERS
+from utils.DriverResolver import resolve_driver_path
+from utils.SessionPool import SessionPool
+from utils.BrowserState import AuthStateCache, CheckpointStore, apply_state, capture_state, record_checkpoint
+from utils.StandInServer import StandInServer
+from utils.Instrumentation import CommandRecorder
+from utils.Artifacts import ArtifactPipeline
+from utils.ResourceProfiles import RESOURCE_PROFILES, ResourceStats, format_types
+from utils.LaunchProfiles import LAUNCH_PROFILES, LaunchTimings, load_launch_history
+from utils.TabRunner import TabGroup, run_cases
+from utils.PerfMetrics import PerfRecorder
+from utils.EventLog import EventLog
+from utils.Grid import (
+    GridDispatcher, LocalNodes, format_utilization, merge_node_stats, parse_node_urls, split_slots
+)
+from utils.ResourceGovernor import ResourceGovernor
+from utils.ResultsStore import ResultsStore, changed_files, failing_step, fingerprint_files, module_dependencies
+from utils.Benchmark import (
+    BenchmarkRecorder, append_history, baseline_from_history, find_regressions, format_summary, load_history,
+    merge_samples, summarize
+)
+from utils.ParallelRunner import (
+    ResultRecorder, assign_shards, get_worker_id, load_durations, run_parallel, save_durations
+)
+from pages import (
+    LoginPage, InventoryPage, CartPage, CheckoutInfoPage, CheckoutOverviewPage, CheckoutCompletePage
+)
+from selenium.common.exceptions import TimeoutException
+from utils.BasePage import BasePage
 import os
+import time
+import contextlib
 import pytest_html
-from datetime import datetime
 import logging
 
 # Get a logger for this module
 log = logging.getLogger(__name__)
 
+# Per-test durations recorded by earlier runs, used to balance parallel workers
+DURATIONS_FILE = project_root / ".test_durations.json"
+# Outcome history of every run, used by --recent-failures-first and --changed-only
+RESULTS_DB = project_root / ".test_results.db"
+RESULT_RECORDER_KEY = pytest.StashKey[ResultRecorder]()
+COMMAND_RECORDER_KEY = pytest.StashKey[CommandRecorder]()
+BENCHMARK_RECORDER_KEY = pytest.StashKey[BenchmarkRecorder]()
+ARTIFACT_PIPELINE_KEY = pytest.StashKey[ArtifactPipeline]()
+RESOURCE_STATS_KEY = pytest.StashKey[ResourceStats]()
+SESSION_POOL_KEY = pytest.StashKey[SessionPool]()
+LAUNCH_TIMINGS_KEY = pytest.StashKey[LaunchTimings]()
+TAB_GROUP_KEY = pytest.StashKey[TabGroup]()
+PERF_RECORDER_KEY = pytest.StashKey[PerfRecorder]()
+EVENT_LOG_KEY = pytest.StashKey[EventLog]()
+GRID_DISPATCHER_KEY = pytest.StashKey[GridDispatcher]()
+LOCAL_NODES_KEY = pytest.StashKey[LocalNodes]()
+RESOURCE_GOVERNOR_KEY = pytest.StashKey[ResourceGovernor]()
+RESULTS_STORE_KEY = pytest.StashKey[ResultsStore]()
+# Set once pre-warming was considered, at the first test that needs a browser
+PREWARM_STARTED_KEY = pytest.StashKey[bool]()
+# {flow name: nodeid of the test that failed it} with --fast-fail-deps
+FAILED_FLOWS_KEY = pytest.StashKey[dict]()
+
+REAL_SITE_URL = "https://www.saucedemo.com/"
+BENCHMARK_HISTORY_FILE = project_root / "benchmarks" / "history.json"
+LAUNCH_HISTORY_FILE = project_root / "benchmarks" / "launch_times.json"
+PERF_TRENDS_FILE = project_root / "benchmarks" / "perf_trends.json"
+# Every saucedemo test account shares this password
+DEFAULT_PASSWORD = "secret_sauce"
+
+
+def _add_backpack_and_go_to_cart(inventory_page):
+    inventory_page.add_backpack_to_cart()
+    return inventory_page.go_to_cart()
+
+
+# The shared prefix of the checkout tests: for every page, the page before it
+# and the step that leads from there (see the 'start_from' fixture)
+CHECKOUT_CHAIN = {
+    CartPage: (InventoryPage, _add_backpack_and_go_to_cart),
+    CheckoutInfoPage: (CartPage, lambda page: page.proceed_to_checkout()),
+    CheckoutOverviewPage: (CheckoutInfoPage, lambda page: page.fill_shipping_info("Test", "User", "12345")),
+    CheckoutCompletePage: (CheckoutOverviewPage, lambda page: page.finish_checkout()),
+}
+
 # Hook to add custom command-line options
 def pytest_addoption(parser):
     """
@@ -41,60 +109,1062 @@ def pytest_addoption(parser):
         default=False,
         help="Run browser in headless mode (no GUI)"
     )
+    parser.addoption(
+        "--max-session-uses",
+        action="store",
+        type=int,
+        default=25,
+        help="Number of tests a pooled browser session serves before it is recycled. "
+             "Use 1 to launch a fresh browser for every test. Default: 25"
+    )
+    parser.addoption(
+        "--launch-profile",
+        action="store",
+        default="default",
+        choices=sorted(LAUNCH_PROFILES),
+        help="How browsers are launched: 'default', 'tuned' (performance flags, window size set at "
+             "launch) or 'fast' ('tuned' plus a pre-initialized profile copied to tmpfs). Default: 'default'"
+    )
+    parser.addoption(
+        "--prewarm-browsers",
+        action="store",
+        type=int,
+        default=1,
+        help="Browsers to launch in the background while tests are collected (0 to disable). Default: 1"
+    )
+    parser.addoption(
+        "--tabs",
+        action="store",
+        type=int,
+        default=0,
+        help="Run the parametrized cases of 'tabbed' tests as up to N concurrent tabs of one browser, "
+             "each in its own browser context (Chrome). 0 disables. Default: 0"
+    )
+    parser.addoption(
+        "--resource-governor",
+        action="store_true",
+        default=False,
+        help="Start a local browser only while the host has free memory, CPU and /dev/shm, and "
+             "recycle browsers that grow past --browser-memory-ceiling (measuring needs psutil)"
+    )
+    parser.addoption(
+        "--min-free-memory",
+        action="store",
+        type=int,
+        default=1024,
+        help="Host memory in MB that must stay available to start another browser. Default: 1024"
+    )
+    parser.addoption(
+        "--max-cpu-percent",
+        action="store",
+        type=float,
+        default=90,
+        help="Host CPU use in percent above which new browsers wait. Default: 90"
+    )
+    parser.addoption(
+        "--browser-memory-ceiling",
+        action="store",
+        type=int,
+        default=1500,
+        help="Memory in MB (browser process tree RSS) above which a session is recycled. Default: 1500"
+    )
+    parser.addoption(
+        "--workers",
+        action="store",
+        type=int,
+        default=1,
+        help="Run the suite in N parallel worker processes, each with its own browser. Default: 1"
+    )
+    parser.addoption(
+        "--grid-url",
+        action="store",
+        default=None,
+        help="Run browsers as remote sessions: a Selenium Grid URL, or comma-separated node URLs "
+             "(each optionally 'URL=N' for N session slots). New sessions go to the node with the most free slots"
+    )
+    parser.addoption(
+        "--local-nodes",
+        action="store",
+        type=int,
+        default=0,
+        help="Start N local driver processes (chromedriver/geckodriver) and use them as grid nodes. Default: 0"
+    )
+    parser.addoption(
+        "--grid-retries",
+        action="store",
+        type=int,
+        default=1,
+        help="Extra rounds over all grid nodes when no node could start a session. Default: 1"
+    )
+    parser.addoption(
+        "--offline-drivers",
+        action="store_true",
+        default=False,
+        help="Never download driver binaries; use the on-disk cache, PATH or Selenium Manager only"
+    )
+    parser.addoption(
+        "--instrument-commands",
+        action="store_true",
+        default=False,
+        help="Record every WebDriver command with its duration and phase; adds a per-test "
+             "summary to the HTML report and writes reports/webdriver_commands.json"
+    )
+    parser.addoption(
+        "--structured-logs",
+        action="store_true",
+        default=False,
+        help="Write log records as JSONL (with test and worker id) to logs/events.jsonl from a "
+             "background thread, and show a run-end summary instead of per-action console output"
+    )
+    parser.addoption(
+        "--verbose-logs",
+        action="store_true",
+        default=False,
+        help="With --structured-logs, keep the per-action console and test_run.log output as well"
+    )
+    parser.addoption(
+        "--page-load-strategy",
+        action="store",
+        default="eager",
+        choices=("normal", "eager", "none"),
+        help="When navigation returns: 'normal' (load event), 'eager' (DOM ready) or 'none'. "
+             "Page objects wait for their own readiness gates either way. Default: 'eager'"
+    )
+    parser.addoption(
+        "--cache-elements",
+        action="store_true",
+        default=False,
+        help="Let page objects reuse elements found by earlier actions on the same page "
+             "(refreshed automatically when stale)"
+    )
+    parser.addoption(
+        "--perf-metrics",
+        action="store_true",
+        default=False,
+        help="Collect Navigation Timing, paint and long-task metrics whenever a page becomes ready; "
+             "adds them to the HTML report and writes reports/perf_metrics.json"
+    )
+    parser.addoption(
+        "--perf-budgets",
+        action="store",
+        default="warn",
+        choices=("off", "warn", "fail"),
+        help="What a page exceeding its PERF_BUDGETS does with --perf-metrics: 'off', 'warn' "
+             "or 'fail' the test. Default: 'warn'"
+    )
+    parser.addoption(
+        "--resource-profile",
+        action="store",
+        default="none",
+        choices=sorted(RESOURCE_PROFILES),
+        help="Block resources the tests don't need: 'lean' (images, fonts, media, trackers) or "
+             "'strict' (also stylesheets). Full blocking and per-test stats need Chrome. Default: 'none'"
+    )
+    parser.addoption(
+        "--base-url",
+        action="store",
+        default=None,
+        help="Site under test: a URL, or 'local' to start the bundled saucedemo stand-in. "
+             f"Default: '{REAL_SITE_URL}' ('local' in --benchmark mode)"
+    )
+    parser.addoption(
+        "--standin-latency",
+        action="store",
+        type=float,
+        default=0,
+        help="Artificial latency in ms added to every request served by the local stand-in. Default: 0"
+    )
+    parser.addoption(
+        "--standin-jitter",
+        action="store",
+        type=float,
+        default=0,
+        help="Random +/- jitter in ms added on top of --standin-latency. Default: 0"
+    )
+    parser.addoption(
+        "--standin-seed",
+        action="store",
+        type=int,
+        default=0,
+        help="Seed for the stand-in's jitter sequence, for reproducible timings. Default: 0"
+    )
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="Run only the 'benchmark' tests: time each page-object flow step over several "
+             "rounds and fail if a step regresses against the stored history"
+    )
+    parser.addoption(
+        "--benchmark-rounds",
+        action="store",
+        type=int,
+        default=10,
+        help="Measured rounds per benchmark flow. Default: 10"
+    )
+    parser.addoption(
+        "--benchmark-warmup",
+        action="store",
+        type=int,
+        default=1,
+        help="Unmeasured warm-up rounds per benchmark flow. Default: 1"
+    )
+    parser.addoption(
+        "--benchmark-threshold",
+        action="store",
+        type=float,
+        default=20,
+        help="Allowed slowdown of a step's p50/p95 over the baseline, in percent. Default: 20"
+    )
+    parser.addoption(
+        "--benchmark-history",
+        action="store",
+        default=str(BENCHMARK_HISTORY_FILE),
+        help=f"History file the baseline is built from. Default: {BENCHMARK_HISTORY_FILE.relative_to(project_root)}"
+    )
+    parser.addoption(
+        "--login-state-ttl",
+        action="store",
+        type=int,
+        default=300,
+        help="Seconds a captured login state may be reused by 'logged_in_driver'. Default: 300"
+    )
+    parser.addoption(
+        "--results-db",
+        action="store",
+        default=str(RESULTS_DB),
+        help=f"SQLite file every run's outcomes are recorded in. Default: {RESULTS_DB.relative_to(project_root)}"
+    )
+    parser.addoption(
+        "--recent-failures-first",
+        action="store_true",
+        default=False,
+        help="Run the tests whose last recorded result was a failure first"
+    )
+    parser.addoption(
+        "--fast-fail-deps",
+        action="store_true",
+        default=False,
+        help="Run the tests that provide a flow ('provides' mark) before the tests that depend on it "
+             "('depends_on' mark), and skip the dependents once a provider of their flow has failed"
+    )
+    parser.addoption(
+        "--changed-only",
+        action="store_true",
+        default=False,
+        help="Run only tests whose test module, page objects or data files changed since they last "
+             "passed, plus tests that did not pass in their last run"
+    )
+    # Internal options passed to each worker process by the parallel runner
+    parser.addoption("--shard-id", action="store", type=int, default=0, help=argparse.SUPPRESS)
+    parser.addoption("--num-shards", action="store", type=int, default=1, help=argparse.SUPPRESS)
 
 
-# --- The central driver fixture ---
-@pytest.fixture(scope="function")
-def driver(request):
+def pytest_configure(config):
+    config.stash[RESULT_RECORDER_KEY] = ResultRecorder()
+    config.stash[ARTIFACT_PIPELINE_KEY] = ArtifactPipeline(report_dir="reports")
+    config.stash[LAUNCH_TIMINGS_KEY] = LaunchTimings()
+    if config.getoption("--fast-fail-deps"):
+        config.stash[FAILED_FLOWS_KEY] = {}
+    config.stash[RESOURCE_STATS_KEY] = ResourceStats(RESOURCE_PROFILES[config.getoption("--resource-profile")])
+    if config.getoption("--instrument-commands"):
+        config.stash[COMMAND_RECORDER_KEY] = CommandRecorder()
+    if config.getoption("--perf-metrics"):
+        config.stash[PERF_RECORDER_KEY] = PerfRecorder(budget_mode=config.getoption("--perf-budgets"))
+    # A '--workers' controller only merges the workers' event logs
+    if config.getoption("--structured-logs") and (get_worker_id() or config.getoption("--workers") <= 1):
+        _start_event_log(config)
+    if config.getoption("--cache-elements"):
+        BasePage.CACHE_ELEMENTS = True
+    if config.getoption("--resource-governor"):
+        config.stash[RESOURCE_GOVERNOR_KEY] = ResourceGovernor(
+            min_free_memory_mb=config.getoption("--min-free-memory"),
+            max_cpu_percent=config.getoption("--max-cpu-percent"),
+            memory_ceiling_mb=config.getoption("--browser-memory-ceiling"),
+        )
+    if config.getoption("--benchmark"):
+        config.stash[BENCHMARK_RECORDER_KEY] = BenchmarkRecorder(
+            rounds=config.getoption("--benchmark-rounds"),
+            warmup=config.getoption("--benchmark-warmup"),
+        )
+
+
+def _start_event_log(config):
+    worker_id = get_worker_id()
+    event_log = config.stash[EVENT_LOG_KEY] = EventLog(
+        os.path.join("logs", f"events-{worker_id}.jsonl" if worker_id else "events.jsonl"), worker_id=worker_id
+    )
+    if not config.getoption("--verbose-logs"):
+        # The event log takes INFO records; pytest's own handlers (console,
+        # test_run.log, report sections) only format warnings and errors
+        config.option.log_cli_level = "WARNING"
+        config.option.log_file_level = "WARNING"
+        config.option.log_level = "WARNING"
+    event_log.start()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item):
+    # Stamps the running test's id on the event log's records
+    event_log = item.config.stash.get(EVENT_LOG_KEY, None)
+    if event_log is not None:
+        event_log.current_test = item.nodeid
+    yield
+    if event_log is not None:
+        event_log.current_test = None
+
+
+def _open_results_store(config):
     """
-    A pytest fixture that manages the Selenium WebDriver lifecycle for a test.
+    Opens (creating if needed) the results database for a run that will
+    record its outcomes: a serial run or a '--workers' controller.
     """
-    # --- 1. Get browser and headless options from command-line
-    browser_name = request.config.getoption("--browser").lower()
-    is_headless = request.config.getoption("--headless")
+    store = ResultsStore(config.getoption("--results-db"))
+    store.start_run(fingerprint_files(project_root))
+    return store
+
+
+def _results_history(config):
+    """
+    The results database for reading, or None if no run was recorded yet.
+    Never creates it (collect-only runs and workers only read).
+    """
+    path = config.getoption("--results-db")
+    return ResultsStore(path) if os.path.exists(path) else None
 
-    driver_instance = None
 
-    # --- 2. Initialize the browser specified
-    if browser_name == "chrome":
-        chrome_options = ChromeOptions()
-        if is_headless:
-            chrome_options.add_argument("--headless")
-            # Arguments required for running headless in CI/Docker environments
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--window-size=1920,1080")
+def pytest_cmdline_main(config):
+    """
+    In '--workers N' mode this process only acts as the controller: it starts
+    the worker processes, waits for them and merges their output.
+    """
+    num_workers = config.getoption("--workers")
+    if num_workers > 1 and get_worker_id() is None and not config.option.collectonly:
+        # pytest's logging plugin is never configured in the controller, so
+        # its progress goes to the console in the same format
+        logging.basicConfig(
+            level=logging.INFO,
+            format=config.getini("log_cli_format"),
+            datefmt=config.getini("log_cli_date_format"),
+        )
+        reports_dir = os.path.join(str(config.invocation_params.dir), "reports")
+        sample_files = [os.path.join(reports_dir, f"benchmark-gw{index}.json") for index in range(num_workers)]
+        grid_files = [os.path.join(reports_dir, f"grid-gw{index}.json") for index in range(num_workers)]
+        for path in sample_files + grid_files:
+            # Left by an earlier run
+            if os.path.exists(path):
+                os.remove(path)
+        local_nodes, worker_options = _start_shared_nodes(config)
+        try:
+            # Only the controller records the run; workers just read the history
+            exit_code = run_parallel(config, num_workers, DURATIONS_FILE,
+                                     on_results=_open_results_store(config).record_run,
+                                     worker_options=worker_options)
+        finally:
+            if local_nodes is not None:
+                local_nodes.stop()
+
+        grid_nodes, elapsed = merge_node_stats(grid_files)
+        if grid_nodes:
+            log.info("Grid utilization (all workers):")
+            for line in format_utilization(grid_nodes, elapsed):
+                log.info(line)
+
+        samples = merge_samples(sample_files)
+        if samples:
+            summary, regressions = _check_benchmarks(config, samples)
+            for line in format_summary(summary):
+                log.info(line)
+            for message in regressions:
+                log.error(f"Benchmark regression: {message}")
+            if regressions and exit_code in (pytest.ExitCode.OK, pytest.ExitCode.NO_TESTS_COLLECTED):
+                exit_code = pytest.ExitCode.TESTS_FAILED
+        return exit_code
+
+
+def _start_shared_nodes(config):
+    """
+    Starts the '--local-nodes' driver processes once for every worker of a
+    parallel run. Returns (LocalNodes or None, worker_options for
+    run_parallel): the workers get the nodes as '--grid-url' entries and
+    split their slots (see Grid.split_slots).
+    """
+    num_local_nodes = config.getoption("--local-nodes")
+    browser_name = config.getoption("--browser").lower()
+    if num_local_nodes <= 0 or browser_name not in SUPPORTED_BROWSERS:
+        return None, None
+    local_nodes = LocalNodes(
+        browser_name, num_local_nodes,
+        resolve_driver_path(browser_name, offline=config.getoption("--offline-drivers")),
+    )
+    try:
+        nodes = local_nodes.start()
+    except RuntimeError as e:
+        raise pytest.UsageError(f"--local-nodes: {e}")
+    grid_url = config.getoption("--grid-url")
+    urls = ([grid_url] if grid_url else []) + [f"{node.url}={node.max_sessions}" for node in nodes]
+    return local_nodes, {"--local-nodes": None, "--grid-url": ",".join(urls)}
+
+
+def _check_benchmarks(config, samples):
+    """
+    Compares this run's step timings with the history's baseline and appends
+    them to the history. Returns (summary, regression messages).
+    """
+    history_file = config.getoption("--benchmark-history")
+    summary = summarize(samples)
+    baseline = baseline_from_history(load_history(history_file))
+    regressions = find_regressions(summary, baseline, config.getoption("--benchmark-threshold") / 100)
+    append_history(history_file, summary, regressed=bool(regressions))
+    return summary, regressions
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Keeps only the benchmark tests in --benchmark mode (and drops them
+    otherwise), and only changed tests with '--changed-only'. In a worker
+    process, keeps only the tests assigned to this worker's shard. Then
+    orders the tests (recent failures, flow providers first) and, with
+    '--tabs', groups the remaining 'tabbed' cases.
+    """
+    benchmark_mode = config.getoption("--benchmark")
+    deselected = [item for item in items if (item.get_closest_marker("benchmark") is None) == benchmark_mode]
+    if deselected:
+        items[:] = [item for item in items if item not in deselected]
+        config.hook.pytest_deselected(items=deselected)
 
-        # Use webdriver-manager to automatically handle the driver binary
-        service = ChromeService(ChromeDriverManager().install())
-        driver_instance = webdriver.Chrome(service=service, options=chrome_options)
+    if config.getoption("--changed-only"):
+        _select_changed_tests(config, items)
 
-    elif browser_name == "firefox":
-        firefox_options = FirefoxOptions()
-        if is_headless:
-            firefox_options.add_argument("--headless")
+    num_shards = config.getoption("--num-shards")
+    if num_shards > 1:
+        shard_id = config.getoption("--shard-id")
+        shards = assign_shards([item.nodeid for item in items], load_durations(DURATIONS_FILE), num_shards)
+        selected = set(shards[shard_id])
 
-        service = FirefoxService(GeckoDriverManager().install())
-        driver_instance = webdriver.Firefox(service=service, options=firefox_options)
+        deselected = [item for item in items if item.nodeid not in selected]
+        items[:] = [item for item in items if item.nodeid in selected]
+        config.hook.pytest_deselected(items=deselected)
 
+    _order_tests(config, items)
+
+    if config.getoption("--tabs") > 0:
+        _group_tab_cases(items)
+
+
+def _select_changed_tests(config, items):
+    """
+    Deselects tests whose last result was a pass and whose dependencies (see
+    ResultsStore.module_dependencies) are unchanged since that pass.
+    """
+    history = _results_history(config)
+    if history is None:
+        log.info("--changed-only: no run recorded yet, running every test.")
+        return
+    current = fingerprint_files(project_root)
+    latest = history.latest_outcomes()
+    passed_files = history.last_passed_files()
+    # Both keyed by id(): tests that last passed in the same run share its fingerprint
+    changed_since = {}
+    dependencies = {}
+
+    def needs_run(item):
+        module = getattr(item, "module", None)
+        baseline = passed_files.get(item.nodeid)
+        if module is None or baseline is None or latest.get(item.nodeid) != "passed":
+            return True
+        if id(baseline) not in changed_since:
+            changed_since[id(baseline)] = changed_files(current, baseline)
+        if module not in dependencies:
+            dependencies[module] = module_dependencies(module, project_root)
+        return bool(dependencies[module] & changed_since[id(baseline)])
+
+    selected = [item for item in items if needs_run(item)]
+    deselected = [item for item in items if item not in selected]
+    log.info(f"--changed-only: {len(selected)} of {len(items)} test(s) changed or not passing.")
+    if deselected:
+        items[:] = selected
+        config.hook.pytest_deselected(items=deselected)
+
+
+def _order_tests(config, items):
+    """
+    With '--fast-fail-deps', flow providers run before their dependents;
+    with '--recent-failures-first', recently failed tests run first within
+    that. The order is otherwise unchanged.
+    """
+    fast_fail = config.getoption("--fast-fail-deps")
+    recent = {}
+    if config.getoption("--recent-failures-first"):
+        history = _results_history(config)
+        failures = history.recent_failures() if history is not None else []
+        recent = {nodeid: index for index, nodeid in enumerate(failures)}
+    if not fast_fail and not recent:
+        return
+    items.sort(key=lambda item: (
+        fast_fail and item.get_closest_marker("depends_on") is not None,
+        recent.get(item.nodeid, len(recent)),
+    ))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """
+    With '--fast-fail-deps', skips a test before its fixtures are set up
+    if a flow it depends on already failed in this run.
+    """
+    failed_flows = item.config.stash.get(FAILED_FLOWS_KEY, None)
+    if not failed_flows:
+        return
+    for marker in item.iter_markers("depends_on"):
+        for flow in marker.args:
+            if flow in failed_flows:
+                pytest.skip(f"Prerequisite flow '{flow}' failed in this run ({failed_flows[flow]})")
+
+
+def _group_tab_cases(items):
+    """
+    Groups consecutive cases of the same 'tabbed' test into TabGroups.
+    A case can join a group only if it needs nothing but the driver, its
+    parameters and session-scoped fixtures, and has no skip or xfail marks.
+    """
+
+    groups, current, current_key = [], [], None
+    for item in items:
+        key = (item.module.__name__, item.originalname) if _can_run_in_tab(item) else None
+        if key is None or key != current_key:
+            groups.append(current)
+            current = []
+        current_key = key
+        if key is not None:
+            current.append(item)
+    groups.append(current)
+
+    for members in groups:
+        if len(members) > 1:
+            group = TabGroup(members)
+            for member in members:
+                member.stash[TAB_GROUP_KEY] = group
+            log.info(f"Tab group: {len(members)} case(s) of {members[0].originalname}")
+
+
+def _can_run_in_tab(item):
+    if item.get_closest_marker("tabbed") is None or not hasattr(item, "callspec"):
+        return False
+    if any(item.get_closest_marker(name) for name in ("skip", "skipif", "xfail")):
+        return False
+    for name in item._fixtureinfo.argnames:
+        if name in item.callspec.params or name == "driver":
+            continue
+        fixturedefs = item._fixtureinfo.name2fixturedefs.get(name)
+        if not fixturedefs or fixturedefs[-1].scope != "session":
+            return False
+    return True
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """
+    Runs a whole TabGroup when its leader is called, then reports each
+    case's own outcome when pytest reaches it.
+    """
+    group = pyfuncitem.stash.get(TAB_GROUP_KEY, None)
+    if group is None:
+        return None
+    if not group.has_run:
+        if pyfuncitem is not group.leader:
+            # The leader never got to run the group (e.g. its setup failed)
+            return None
+        _run_tab_group(pyfuncitem, group)
+
+    error = group.outcomes.get(pyfuncitem.nodeid)
+    if error is not None:
+        raise error
+    return True
+
+
+def _run_tab_group(leader, group):
+    pipeline = leader.config.stash[ARTIFACT_PIPELINE_KEY]
+
+    def case(member):
+        arguments = {
+            name: member.callspec.params[name] if name in member.callspec.params else leader.funcargs[name]
+            for name in member._fixtureinfo.argnames
+        }
+        return lambda tab_driver: member.obj(**dict(arguments, driver=tab_driver))
+
+    def capture(tab_driver, case_id):
+        group.artifacts[case_id] = pipeline.capture(tab_driver, case_id.split("::")[-1])
+
+    group.outcomes = run_cases(
+        leader.funcargs["driver"],
+        [(member.nodeid, case(member)) for member in group.items],
+        max_tabs=leader.config.getoption("--tabs"),
+        on_failure=capture,
+    )
+
+
+def pytest_sessionfinish(session):
+    """
+    Saves this run's test durations. A worker hands its results to the
+    controller instead of writing the shared history file itself.
+    """
+    try:
+        _finish_session(session)
+    finally:
+        # Last, so records from the final browser teardowns are written too
+        event_log = session.config.stash.get(EVENT_LOG_KEY, None)
+        if event_log is not None:
+            event_log.stop()
+
+
+def _finish_session(session):
+    # Let the background pipeline finish writing failure artifacts
+    session.config.stash[ARTIFACT_PIPELINE_KEY].close()
+    # Quits browsers pre-warmed for a run whose tests never asked for one
+    pool = session.config.stash.get(SESSION_POOL_KEY, None)
+    if pool is not None:
+        pool.close()
+    local_nodes = session.config.stash.get(LOCAL_NODES_KEY, None)
+    if local_nodes is not None:
+        local_nodes.stop()
+    governor = session.config.stash.get(RESOURCE_GOVERNOR_KEY, None)
+    if governor is not None:
+        governor.stop()
+
+    command_recorder = session.config.stash.get(COMMAND_RECORDER_KEY, None)
+    if command_recorder is not None and command_recorder.records:
+        os.makedirs("reports", exist_ok=True)
+        suffix = f"-{get_worker_id()}" if get_worker_id() else ""
+        command_recorder.write_json(os.path.join("reports", f"webdriver_commands{suffix}.json"))
+
+    perf_recorder = session.config.stash.get(PERF_RECORDER_KEY, None)
+    if perf_recorder is not None and perf_recorder.records:
+        suffix = f"-{get_worker_id()}" if get_worker_id() else ""
+        perf_recorder.write_json(os.path.join("reports", f"perf_metrics{suffix}.json"))
+        # Parallel workers don't write the shared trend file concurrently
+        if get_worker_id() is None:
+            perf_recorder.append_trend(PERF_TRENDS_FILE)
+
+    dispatcher = session.config.stash.get(GRID_DISPATCHER_KEY, None)
+    if dispatcher is not None and get_worker_id():
+        dispatcher.write_stats(os.path.join("reports", f"grid-{get_worker_id()}.json"))
+
+    bench = session.config.stash.get(BENCHMARK_RECORDER_KEY, None)
+    if bench is not None and bench.samples:
+        if get_worker_id():
+            # The controller gates the merged samples of every worker and
+            # writes one history entry for the run
+            bench.write_samples(os.path.join("reports", f"benchmark-{get_worker_id()}.json"))
+        else:
+            _, bench.regressions = _check_benchmarks(session.config, bench.samples)
+            if bench.regressions:
+                session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    recorder = session.config.stash[RESULT_RECORDER_KEY]
+    if not recorder.results:
+        return
+
+    worker_id = get_worker_id()
+    if worker_id:
+        os.makedirs("reports", exist_ok=True)
+        recorder.write(os.path.join("reports", f"results-{worker_id}.json"))
     else:
+        save_durations(DURATIONS_FILE, recorder.durations())
+        store = session.config.stash.get(RESULTS_STORE_KEY, None)
+        if store is not None:
+            store.record_run(recorder.results)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    event_log = config.stash.get(EVENT_LOG_KEY, None)
+    if event_log is not None:
+        terminalreporter.section("log summary")
+        for line in event_log.summary_lines():
+            terminalreporter.write_line(line)
+
+    dispatcher = config.stash.get(GRID_DISPATCHER_KEY, None)
+    if dispatcher is not None:
+        terminalreporter.section("grid utilization")
+        for line in dispatcher.utilization_lines():
+            terminalreporter.write_line(line)
+
+    governor = config.stash.get(RESOURCE_GOVERNOR_KEY, None)
+    if governor is not None:
+        terminalreporter.section("resource governor")
+        for line in governor.summary_lines():
+            terminalreporter.write_line(line)
+
+    bench = config.stash.get(BENCHMARK_RECORDER_KEY, None)
+    if bench is None or not bench.samples:
+        return
+    terminalreporter.section("benchmark results")
+    for line in format_summary(bench.summary()):
+        terminalreporter.write_line(line)
+    if bench.regressions:
+        terminalreporter.section("benchmark regressions", red=True)
+        for message in bench.regressions:
+            terminalreporter.write_line(message, red=True)
+
+
+# --- Browser session pool (shared by every test in the run) ---
+def _create_session_pool(config):
+    """
+    Builds the run's SessionPool. Nothing is launched here; the driver binary
+    is resolved on the first launch (once per run, see DriverResolver).
+    """
+    browser_name = config.getoption("--browser").lower()
+    is_headless = config.getoption("--headless")
+    offline = config.getoption("--offline-drivers")
+    command_recorder = config.stash.get(COMMAND_RECORDER_KEY, None)
+    perf_recorder = config.stash.get(PERF_RECORDER_KEY, None)
+    resource_profile = config.stash[RESOURCE_STATS_KEY].profile
+    page_load_strategy = config.getoption("--page-load-strategy")
+    launch_profile = LAUNCH_PROFILES[config.getoption("--launch-profile")]
+    launch_timings = config.stash[LAUNCH_TIMINGS_KEY]
+    dispatcher = _create_grid_dispatcher(config)
+    governor = config.stash.get(RESOURCE_GOVERNOR_KEY, None)
+
+    def launch():
+        if dispatcher is not None:
+            started = time.perf_counter()
+            new_driver = dispatcher.launch()
+        else:
+            driver_path = resolve_driver_path(browser_name, offline=offline)
+            # One-time profile template setup is kept out of the launch timings
+            prepare_launch_profile(browser_name, is_headless, driver_path, launch_profile)
+            # Parallel workers queue here for host headroom, one launch at a time
+            with governor.admission() if governor is not None else contextlib.nullcontext():
+                started = time.perf_counter()
+                new_driver = create_driver(
+                    browser_name, is_headless, driver_path, resource_profile, page_load_strategy, launch_profile
+                )
+            if governor is not None:
+                governor.track(new_driver)
+        launch_timings.record(browser_name, launch_profile.name, time.perf_counter() - started)
+        if command_recorder is not None:
+            command_recorder.add("launchBrowser", "setup", time.perf_counter() - started)
+            command_recorder.attach(new_driver)
+        if perf_recorder is not None:
+            perf_recorder.attach(new_driver)
+        return new_driver
+
+    return SessionPool(
+        launch,
+        max_uses=config.getoption("--max-session-uses"),
+        recycle_check=governor.recycle_reason if governor is not None else None,
+    )
+
+
+def _create_grid_dispatcher(config):
+    """
+    Returns the GridDispatcher for '--grid-url' / '--local-nodes', or None
+    when browsers are launched locally.
+    """
+    grid_url = config.getoption("--grid-url")
+    num_local_nodes = config.getoption("--local-nodes")
+    if (not grid_url and num_local_nodes <= 0) or config.option.collectonly:
+        return None
+
+    browser_name = config.getoption("--browser").lower()
+    if browser_name not in SUPPORTED_BROWSERS:
+        return None
+    nodes = parse_node_urls(grid_url) if grid_url else []
+    if num_local_nodes > 0:
+        local_nodes = config.stash[LOCAL_NODES_KEY] = LocalNodes(
+            browser_name, num_local_nodes,
+            resolve_driver_path(browser_name, offline=config.getoption("--offline-drivers")),
+        )
+        try:
+            nodes += local_nodes.start()
+        except RuntimeError as e:
+            raise pytest.UsageError(f"--local-nodes: {e}")
+    num_shards = config.getoption("--num-shards")
+    if num_shards > 1:
+        # Every worker sees the same nodes; /status slot counts are shared
+        # truth, declared ones are divided so they aren't oversubscribed
+        split_slots(nodes, config.getoption("--shard-id"), num_shards)
+
+    is_headless = config.getoption("--headless")
+    resource_profile = config.stash[RESOURCE_STATS_KEY].profile
+    page_load_strategy = config.getoption("--page-load-strategy")
+    launch_profile = LAUNCH_PROFILES[config.getoption("--launch-profile")]
+    dispatcher = config.stash[GRID_DISPATCHER_KEY] = GridDispatcher(
+        nodes,
+        lambda url: create_remote_driver(
+            url, browser_name, is_headless, resource_profile, page_load_strategy, launch_profile
+        ),
+        retries=config.getoption("--grid-retries"),
+    )
+    return dispatcher
+
+
+def pytest_sessionstart(session):
+    """
+    Creates the session pool (browsers are pre-warmed once collection finds
+    a test that needs one, see pytest_itemcollected). A serial run that
+    executes tests also opens the results database (in parallel mode only
+    the controller records the run).
+    """
+    config = session.config
+    if not config.option.collectonly and get_worker_id() is None:
+        config.stash[RESULTS_STORE_KEY] = _open_results_store(config)
+    governor = config.stash.get(RESOURCE_GOVERNOR_KEY, None)
+    if governor is not None and not config.option.collectonly:
+        governor.start()
+    config.stash[SESSION_POOL_KEY] = _create_session_pool(config)
+
+
+def _needs_browser(item):
+    # The browser-backed 'driver' fixture (and anything else that launches
+    # through the pool) uses session_pool; stand-in drivers don't
+    return "session_pool" in getattr(item, "fixturenames", ())
+
+
+def pytest_itemcollected(item):
+    """
+    Unless disabled, starts launching browsers in the background at the
+    first collected test that needs one, so they are ready by the time
+    collection is done. Runs of browser-less tests launch nothing.
+    """
+    config = item.config
+    if config.stash.get(PREWARM_STARTED_KEY, False) or not _needs_browser(item):
+        return
+    config.stash[PREWARM_STARTED_KEY] = True
+    prewarm = config.getoption("--prewarm-browsers")
+    if prewarm > 0 and not config.option.collectonly and config.getoption("--browser").lower() in SUPPORTED_BROWSERS:
+        config.stash[SESSION_POOL_KEY].prewarm(prewarm)
+
+
+def pytest_collection_finish(session):
+    """
+    Cancels the pre-warmed browsers if no selected test needs one.
+    """
+    if session.config.stash.get(PREWARM_STARTED_KEY, False) and not any(map(_needs_browser, session.items)):
+        session.config.stash[SESSION_POOL_KEY].cancel_prewarm()
+
+
+@pytest.fixture(scope="session")
+def session_pool(request):
+    """
+    Keeps warm browsers alive across tests so each test doesn't pay for a
+    full browser cold start. Sessions are reset between tests and recycled
+    after '--max-session-uses' uses.
+    """
+    browser_name = request.config.getoption("--browser").lower()
+    if browser_name not in SUPPORTED_BROWSERS:
         # If an unsupported browser is specified, raise an error
         raise pytest.UsageError(f"--browser='{browser_name}' is not supported. Use 'chrome' or 'firefox'.")
 
-    # --- 3. Configure common driver properties
-    driver_instance.implicitly_wait(10)  # Implicitly wait for elements
-    driver_instance.maximize_window()
+    pool = request.config.stash[SESSION_POOL_KEY]
+
+    yield pool
+
+    # --- Teardown: quit the warm browsers and report what the pool saved
+    pool.close()
+    log.info(pool.summary())
+    launch_timings = request.config.stash[LAUNCH_TIMINGS_KEY]
+    for line in launch_timings.summary_lines(load_launch_history(LAUNCH_HISTORY_FILE)):
+        log.info(line)
+    # Parallel workers don't write the shared history file concurrently
+    if launch_timings.samples and get_worker_id() is None:
+        launch_timings.append_history(LAUNCH_HISTORY_FILE)
+    resource_stats = request.config.stash[RESOURCE_STATS_KEY]
+    if resource_stats.profile.is_active:
+        log.info(resource_stats.summary())
+
+
+# --- The central driver fixture ---
+@pytest.fixture(scope="function")
+def driver(request, session_pool):
+    """
+    A pytest fixture that hands a clean WebDriver session to a test.
+    The browser comes from the session pool and is reset when the test ends.
+    """
+    group = request.node.stash.get(TAB_GROUP_KEY, None)
+    if group is not None and group.has_run:
+        # This case already ran in a tab of its group leader's browser
+        yield None
+        return
+
+    command_recorder = request.config.stash.get(COMMAND_RECORDER_KEY, None)
+    if command_recorder is not None:
+        command_recorder.start_test(request.node.nodeid)
+    perf_recorder = request.config.stash.get(PERF_RECORDER_KEY, None)
+    if perf_recorder is not None:
+        perf_recorder.start_test(request.node.nodeid)
+
+    def in_phase(name):
+        return command_recorder.phase(name) if command_recorder is not None else contextlib.nullcontext()
+
+    with in_phase("setup"):
+        session = session_pool.acquire()
+
+    # --- Yield the driver to the test function
+    # The 'yield' keyword passes the driver instance to the test
+    yield session.driver
+
+    # --- Teardown (runs after the test completes)
+    # Resets the browser and returns it to the pool (or quits it if it is
+    # worn out or unhealthy). This is guaranteed to run, even if the test fails
+    with in_phase("teardown"):
+        try:
+            # Read the request log before the reset so it only covers this test
+            resources = request.config.stash[RESOURCE_STATS_KEY].collect(session.driver)
+            if resources is not None:
+                log.info(
+                    f"{request.node.nodeid}: blocked {resources['blocked']} request(s)"
+                    f"{format_types(resources['blocked_types'])}; loaded {resources['requests']} "
+                    f"request(s), {resources['bytes'] / 1024:.0f} KiB"
+                )
+        finally:
+            # A dead session must still go back to the pool, which quits it
+            session_pool.release(session)
+    if command_recorder is not None:
+        command_recorder.end_test()
+    if perf_recorder is not None:
+        perf_recorder.end_test()
+
 
-    log.info(f"WebDriver initialized: {browser_name}, headless={is_headless}")
+# --- Site under test ---
+@pytest.fixture(scope="session")
+def base_url(request):
+    """
+    The base URL of the site under test. With '--base-url=local' the bundled
+    stand-in server is started for the run and its URL is returned.
+    """
+    url = request.config.getoption("--base-url")
+    if url is None:
+        # Benchmarks need a deterministic target, so they default to the stand-in
+        url = "local" if request.config.getoption("--benchmark") else REAL_SITE_URL
+    if url != "local":
+        yield url if url.endswith("/") else url + "/"
+        return
 
-    # --- 4. Yield the driver to the test function
-    # The 'yield' keyword passes the driver_instance to the test
-    yield driver_instance
+    server = StandInServer(
+        latency=request.config.getoption("--standin-latency") / 1000,
+        jitter=request.config.getoption("--standin-jitter") / 1000,
+        seed=request.config.getoption("--standin-seed"),
+    )
+    with server:
+        yield server.base_url
 
-    # --- 5. Teardown (runs after the test completes)
-    # This 'quit()' is guaranteed to run, even if the test fails
-    log.info("WebDriver teardown: Closing browser")
-    driver_instance.quit()
+
+# --- Benchmark step timer ---
+@pytest.fixture(scope="session")
+def bench(request):
+    """
+    The run's BenchmarkRecorder; only available in --benchmark mode.
+    """
+    recorder = request.config.stash.get(BENCHMARK_RECORDER_KEY, None)
+    if recorder is None:
+        pytest.skip("Benchmarks only run with --benchmark")
+    return recorder
+
+
+# --- Login state shared by every test in the run ---
+@pytest.fixture(scope="session")
+def auth_state_cache(request):
+    """
+    Cookies and web storage of users who already logged in through the UI.
+    """
+    cache = AuthStateCache(ttl=request.config.getoption("--login-state-ttl"))
+    yield cache
+    log.info(cache.summary())
+
+
+@pytest.fixture(scope="function")
+def logged_in_driver(driver, base_url, auth_state_cache):
+    """
+    Returns a function that puts the test's browser on the inventory page as
+    a logged-in user:
+
+        driver = logged_in_driver("standard_user")
+
+    The first call per user logs in through the UI and captures the state;
+    later calls inject that state instead. If the injected state doesn't
+    land on the inventory page, it is invalidated and the UI login is redone.
+    Only tests/test_login.py should exercise the real login form.
+    """
+    def _logged_in_driver(user="standard_user", password=DEFAULT_PASSWORD):
+        inventory_url = base_url + InventoryPage.URL_PATH
+
+        state = auth_state_cache.get(user)
+        if state is not None:
+            apply_state(driver, state, base_url, inventory_url)
+            if InventoryPage(driver).is_inventory_page_displayed(timeout=5):
+                auth_state_cache.hits += 1
+                log.info(f"Logged in as '{user}' from cached state.")
+                return driver
+            log.warning(f"Cached login state for '{user}' was rejected; logging in through the UI.")
+            auth_state_cache.invalidate(user)
+            driver.delete_all_cookies()
+
+        login_page = LoginPage(driver)
+        login_page.navigate_to_login_page(base_url)
+        login_page.login(user, password)
+        if not InventoryPage(driver).is_inventory_page_displayed():
+            raise AssertionError(f"UI login as '{user}' did not reach the inventory page.")
+
+        auth_state_cache.ui_logins += 1
+        auth_state_cache.put(user, capture_state(driver))
+        return driver
+
+    return _logged_in_driver
+
+
+@pytest.fixture(scope="session")
+def checkpoint_store(request):
+    """
+    Browser states captured along the checkout chain, shared by the run.
+    """
+    store = CheckpointStore(ttl=request.config.getoption("--login-state-ttl"))
+    yield store
+    log.info(store.summary())
+
+
+@pytest.fixture(scope="function")
+def start_from(driver, logged_in_driver, base_url, checkpoint_store):
+    """
+    Returns a function that puts the test's browser on a page of the
+    checkout chain and returns that page object:
+
+        overview_page = start_from(CheckoutOverviewPage)
+
+    The page is restored from its checkpoint when a fresh one exists and it
+    still lands on the page. Otherwise the checkpoint is rebuilt from the
+    nearest usable earlier one, and every page passed on the way is
+    checkpointed for later tests.
+    """
+    def _start_from(page_cls, user="standard_user"):
+        key = f"{user}:{page_cls.__name__}"
+
+        state = checkpoint_store.get(key)
+        if state is not None:
+            apply_state(driver, state, base_url)
+            try:
+                page = page_cls(driver).wait_until_ready(timeout=5)
+                checkpoint_store.hits += 1
+                log.info(f"Started from checkpoint '{key}'.")
+                return page
+            except TimeoutException:
+                log.warning(f"Checkpoint '{key}' no longer lands on {page_cls.__name__}; rebuilding it.")
+                checkpoint_store.invalidate(key)
+                driver.delete_all_cookies()
+
+        if page_cls is InventoryPage:
+            logged_in_driver(user)
+            with checkpoint_store.recording(driver, user):
+                record_checkpoint(driver, InventoryPage.__name__)
+            return InventoryPage(driver)
+
+        previous_cls, step = CHECKOUT_CHAIN[page_cls]
+        previous_page = _start_from(previous_cls, user)
+        with checkpoint_store.recording(driver, user):
+            checkpoint_store.builds += 1
+            return step(previous_page)
+
+    return _start_from
 
 
 # --- Hook for adding screenshots to HTML report on failure ---
@@ -107,41 +1177,60 @@ def pytest_runtest_makereport(item, call):
     # Execute all other hooks to obtain the report object
     outcome = yield
     report = outcome.get_result()
+    if report.failed and call.excinfo is not None:
+        report.failing_step = failing_step(call.excinfo, project_root)
+        report.failure_message = call.excinfo.exconly().splitlines()[0][:500]
+        # A failed provider stops the tests that depend on its flow
+        failed_flows = item.config.stash.get(FAILED_FLOWS_KEY, None)
+        if failed_flows is not None:
+            for marker in item.iter_markers("provides"):
+                for flow in marker.args:
+                    failed_flows.setdefault(flow, item.nodeid)
+    item.config.stash[RESULT_RECORDER_KEY].record(report)
 
     # Clear 'extras' on report setup
     if report.when == "setup":
         report.extras = []
 
+    # Attach the WebDriver command summary once the driver has been released
+    command_recorder = item.config.stash.get(COMMAND_RECORDER_KEY, None)
+    if report.when == "teardown" and command_recorder is not None and item.nodeid in command_recorder.records:
+        report.extras = getattr(report, "extras", []) + [
+            pytest_html.extras.html(command_recorder.summary_html(item.nodeid))
+        ]
+
+    perf_recorder = item.config.stash.get(PERF_RECORDER_KEY, None)
+    if report.when == "teardown" and perf_recorder is not None and item.nodeid in perf_recorder.records:
+        report.extras = getattr(report, "extras", []) + [
+            pytest_html.extras.html(perf_recorder.summary_html(item.nodeid))
+        ]
+
     # We only want to add extras when the test 'call' has failed
     if report.when == "call" and report.failed:
         log.error(f"Test '{item.name}' FAILED. Capturing screenshot.")
 
+        # Cases run in a tab were captured while their tab was still open
+        group = item.stash.get(TAB_GROUP_KEY, None)
+        if group is not None and group.has_run:
+            if item.nodeid in group.artifacts:
+                report.extras = getattr(report, "extras", []) + [
+                    pytest_html.extras.html(group.artifacts[item.nodeid].to_html(item.name))
+                ]
+
         # 'item' is the test function. We can access its fixtures.
-        if "driver" in item.fixturenames:
+        elif "driver" in item.fixturenames:
             driver = item.funcargs["driver"]
 
             try:
-                # --- Create reports/screenshots directory if it doesn't exist
-                screenshot_dir = os.path.join("reports", "screenshots")
-                os.makedirs(screenshot_dir, exist_ok=True)
-
-                # --- Generate a unique screenshot name
-                timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                test_name = item.name.replace('[', '-').replace(']', '')  # Clean parameterized names
-                screenshot_file = os.path.join(screenshot_dir, f"{test_name}_{timestamp}.png")
-
-                # --- Save the screenshot
-                driver.save_screenshot(screenshot_file)
-                log.info(f"Screenshot saved: {screenshot_file}")
-
-                # --- Add screenshot to the HTML report ---
-                # Create relative path for the HTML report
-                relative_path = os.path.join("screenshots", f"{test_name}_{timestamp}.png")
-
-                # Create an <img> tag
-                html = f'<div><img src="{relative_path}" alt="Screenshot" style="width:600px;" onclick="window.open(this.src)" align="right"/></div>'
+                # --- Grab screenshot, page source and URL; the pipeline
+                # writes, thumbnails and compresses them in the background
+                artifacts = item.config.stash[ARTIFACT_PIPELINE_KEY].capture(driver, item.name)
 
-                report.extras.append(pytest_html.extras.html(html))
+                # --- Add the thumbnail (linking to the full screenshot) to the HTML report
+                # pytest-html only sets 'extras' on call reports after this hook
+                report.extras = getattr(report, "extras", []) + [
+                    pytest_html.extras.html(artifacts.to_html(item.name))
+                ]
 
             except Exception as e:
                 log.warning(f"Could not take screenshot for failed test {item.name}: {e}")
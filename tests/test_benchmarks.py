@@ -0,0 +1,68 @@
+import pytest
+from pages import LoginPage, InventoryPage
+import logging
+
+log = logging.getLogger(__name__)
+
+# --- Page-object flow benchmarks ---
+# These only run with 'pytest --benchmark'. Each flow is repeated
+# '--benchmark-rounds' times and every step is timed separately; the results
+# are compared against benchmarks/history.json at the end of the run.
+
+
+@pytest.mark.benchmark
+def test_benchmark_login(driver, base_url, bench):
+    """
+    Times LoginPage.navigate_to_login_page, LoginPage.login and the
+    inventory check that follows a successful login.
+    """
+    login_page = LoginPage(driver)
+
+    for _ in bench.rounds():
+        driver.delete_all_cookies()
+        with bench.step("login.navigate_to_login_page"):
+            login_page.navigate_to_login_page(base_url)
+        with bench.step("login.login"):
+            login_page.login("standard_user", "secret_sauce")
+        with bench.step("login.is_inventory_page_displayed"):
+            assert InventoryPage(driver).is_inventory_page_displayed(), "Login failed during benchmark."
+
+
+@pytest.mark.benchmark
+def test_benchmark_add_backpack_to_cart(logged_in_driver, base_url, bench):
+    """
+    Times InventoryPage.add_backpack_to_cart, starting from an empty cart.
+    """
+    driver = logged_in_driver("standard_user")
+
+    for _ in bench.rounds():
+        driver.execute_script("window.localStorage.removeItem('cart-contents');")
+        driver.get(base_url + InventoryPage.URL_PATH)
+        inventory_page = InventoryPage(driver)
+        with bench.step("inventory.add_backpack_to_cart"):
+            inventory_page.add_backpack_to_cart()
+
+
+@pytest.mark.benchmark
+def test_benchmark_checkout_chain(logged_in_driver, base_url, bench):
+    """
+    Times every transition of the CartPage -> CheckoutCompletePage chain.
+    """
+    driver = logged_in_driver("standard_user")
+
+    for _ in bench.rounds():
+        driver.get(base_url + InventoryPage.URL_PATH)
+        inventory_page = InventoryPage(driver)
+        inventory_page.add_backpack_to_cart()
+
+        with bench.step("checkout.go_to_cart"):
+            cart_page = inventory_page.go_to_cart()
+        with bench.step("checkout.proceed_to_checkout"):
+            checkout_info_page = cart_page.proceed_to_checkout()
+        with bench.step("checkout.fill_shipping_info"):
+            checkout_overview_page = checkout_info_page.fill_shipping_info("Test", "User", "12345")
+        with bench.step("checkout.finish_checkout"):
+            checkout_complete_page = checkout_overview_page.finish_checkout()
+
+        message = checkout_complete_page.get_complete_message()
+        assert message == "Thank you for your order!", f"Checkout failed during benchmark: '{message}'"
@@ -0,0 +1,143 @@
+import json
+import pytest
+from selenium.common.exceptions import WebDriverException
+from utils import Grid
+from utils.Grid import GridDispatcher, GridNode, format_utilization, merge_node_stats, split_slots
+
+# --- Unit tests for the grid dispatcher's node selection and failover ---
+# Nodes answer from canned slot counts and sessions are stand-ins; no grid,
+# driver binary or browser is needed.
+
+
+class FakeNode(GridNode):
+    def __init__(self, url, free):
+        super().__init__(url, max_sessions=4)
+        self.free = free
+
+    def free_slots(self):
+        return max(0, self.free - self.active)
+
+
+class FakeDriver:
+    def __init__(self, url):
+        self.url = url
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeSessions:
+    """
+    start_session() stand-in: fails on the URLs in 'failing', records every
+    attempt in order.
+    """
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.attempts = []
+
+    def __call__(self, url):
+        self.attempts.append(url)
+        if url in self.failing:
+            raise WebDriverException(f"{url} refused the session")
+        return FakeDriver(url)
+
+
+def test_launch_picks_the_node_with_most_free_slots():
+    nodes = [FakeNode("http://a", 1), FakeNode("http://b", 3), FakeNode("http://c", 0)]
+    sessions = FakeSessions()
+    driver = GridDispatcher(nodes, sessions).launch()
+    assert driver.url == "http://b"
+    assert nodes[1].active == 1 and nodes[1].sessions == 1
+
+
+def test_full_nodes_are_never_tried():
+    nodes = [FakeNode("http://a", 0), FakeNode("http://b", 0)]
+    sessions = FakeSessions()
+    with pytest.raises(WebDriverException):
+        GridDispatcher(nodes, sessions, retries=0, wait_for_slot=0).launch()
+    assert sessions.attempts == []
+
+
+def test_failed_node_falls_over_to_the_next_one():
+    nodes = [FakeNode("http://a", 3), FakeNode("http://b", 1)]
+    sessions = FakeSessions(failing={"http://a"})
+    driver = GridDispatcher(nodes, sessions).launch()
+    assert sessions.attempts == ["http://a", "http://b"]
+    assert driver.url == "http://b"
+    assert nodes[0].failures == 1 and nodes[0].active == 0 and nodes[0].failed_at is not None
+
+
+def test_recently_failed_node_is_tried_last():
+    nodes = [FakeNode("http://a", 3), FakeNode("http://b", 2)]
+    dispatcher = GridDispatcher(nodes, FakeSessions(failing={"http://a"}))
+    dispatcher.launch()
+    assert dispatcher._by_free_slots() == [nodes[1], nodes[0]]
+
+
+def test_cooldown_expires():
+    nodes = [FakeNode("http://a", 3), FakeNode("http://b", 2)]
+    dispatcher = GridDispatcher(nodes, FakeSessions(failing={"http://a"}))
+    dispatcher.launch()
+    nodes[0].failed_at -= Grid.FAILURE_COOLDOWN
+    assert dispatcher._by_free_slots() == [nodes[0], nodes[1]]
+
+
+def test_launch_gives_up_after_every_retry_round():
+    nodes = [FakeNode("http://a", 2), FakeNode("http://b", 1)]
+    sessions = FakeSessions(failing={"http://a", "http://b"})
+    with pytest.raises(WebDriverException, match="http://b refused"):
+        GridDispatcher(nodes, sessions, retries=2).launch()
+    # Three rounds over both nodes; 'b' goes first once 'a' is cooling down
+    assert sessions.attempts == ["http://a", "http://b"] * 3
+    assert nodes[0].failures == 3 and nodes[1].failures == 3
+    assert nodes[0].active == nodes[1].active == 0
+
+
+def test_quit_gives_the_slot_back():
+    node = FakeNode("http://a", 1)
+    dispatcher = GridDispatcher([node], FakeSessions())
+    driver = dispatcher.launch()
+    assert node.free_slots() == 0
+    driver.quit()
+    assert driver.quit_called
+    assert node.active == 0 and node.free_slots() == 1
+    assert node.busy_seconds > 0
+
+
+def test_split_slots_never_oversubscribes_a_node():
+    for num_workers in (1, 2, 3, 5):
+        totals = [0, 0, 0]
+        for worker in range(num_workers):
+            nodes = [GridNode("http://a", 4), GridNode("http://b", 1), GridNode("http://c", 1)]
+            split_slots(nodes, worker, num_workers)
+            for index, node in enumerate(nodes):
+                totals[index] += node.share
+        assert totals == [4, 1, 1]
+
+    # Single-slot nodes go to different workers
+    shares = []
+    for worker in range(2):
+        nodes = [GridNode("http://a", 1), GridNode("http://b", 1)]
+        split_slots(nodes, worker, 2)
+        shares.append([node.share for node in nodes])
+    assert shares == [[1, 0], [0, 1]]
+
+
+def test_merge_node_stats_sums_workers(tmp_path):
+    paths = []
+    for worker, sessions in enumerate((2, 3)):
+        path = tmp_path / f"grid-gw{worker}.json"
+        path.write_text(json.dumps({"elapsed": 10.0 + worker, "nodes": [{
+            "url": "http://a", "max_sessions": 4, "sessions": sessions, "failures": 1, "peak": 2,
+            "busy_seconds": 11.0,
+        }]}), encoding="utf-8")
+        paths.append(path)
+    nodes, elapsed = merge_node_stats(paths + [tmp_path / "missing.json"])
+    assert elapsed == 11.0
+    assert nodes == [{"url": "http://a", "max_sessions": 4, "sessions": 5, "failures": 2, "peak": 4,
+                      "busy_seconds": 22.0}]
+    assert format_utilization(nodes, elapsed) == [
+        "Grid node http://a: 5 session(s), 2 failed start(s), peak 4/4 concurrent, 50% utilized over 11s"
+    ]
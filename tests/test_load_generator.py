@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+from utils.LoadGenerator import LoadGenerator, format_report
+
+# --- Unit tests for the load generator's bookkeeping ---
+# The flows and the browsers are replaced by stand-ins; no browser is needed.
+
+
+class FakeDriver:
+    """
+    Just enough of a WebDriver for SessionPool.reset() and quit().
+    """
+
+    def __init__(self):
+        self.window_handles = ["main"]
+        self.switch_to = SimpleNamespace(window=lambda handle: None)
+        self.quit_called = False
+
+    def execute_script(self, script, *args):
+        return None
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_report_computes_throughput_and_step_percentiles():
+    generator = LoadGenerator(flow=None, base_url="http://stand-in/", launcher=FakeDriver, users=2)
+    generator.samples = {"login.login": [0.1, 0.2, 0.3, 0.4, 0.5]}
+    generator.iterations = 5
+    generator.errors = ["vu-0: AssertionError: boom"]
+    generator.elapsed = 30.0
+
+    report = generator.report()
+
+    assert report["users"] == 2 and report["browsers"] == 2
+    assert report["iterations"] == 5 and report["errors"] == 1
+    assert report["throughput_per_minute"] == 10.0
+    step = report["steps"]["login.login"]
+    assert step["n"] == 5
+    assert step["p50"] == 0.3
+    assert step["max"] == 0.5
+    assert abs(step["p90"] - 0.46) < 1e-9
+
+
+def test_report_without_elapsed_time_has_zero_throughput():
+    generator = LoadGenerator(flow=None, base_url="http://stand-in/", launcher=FakeDriver)
+    assert generator.report()["throughput_per_minute"] == 0.0
+
+
+def test_run_times_steps_counts_errors_and_quits_browsers():
+    launched = []
+
+    def launcher():
+        launched.append(FakeDriver())
+        return launched[-1]
+
+    calls = []
+
+    def flow(driver, base_url, step, think):
+        calls.append(base_url)
+        with step("flow.step"):
+            think()
+        if len(calls) == 1:
+            raise AssertionError("first iteration fails")
+
+    generator = LoadGenerator(
+        flow, "http://stand-in/", launcher, users=2, think_time=0.02, duration=0.2, max_browsers=1
+    )
+    report = generator.run()
+
+    assert report["errors"] == 1
+    assert report["iterations"] == len(calls) - 1 > 0
+    assert report["steps"]["flow.step"]["n"] == report["iterations"]
+    assert report["steps"]["iteration"]["n"] == report["iterations"]
+    # One browser at a time is enough for both users, and it is quit at the end
+    assert len(launched) == 1 and launched[0].quit_called
+    assert format_report(report)[0].startswith("2 user(s) on 1 browser(s)")
+
+
+def test_failed_browser_launch_counts_as_an_error():
+    launched = []
+
+    def launcher():
+        if not launched:
+            launched.append(None)
+            raise RuntimeError("browser did not start")
+        launched.append(FakeDriver())
+        return launched[-1]
+
+    def flow(driver, base_url, step, think):
+        with step("flow.step"):
+            think()
+
+    generator = LoadGenerator(
+        flow, "http://stand-in/", launcher, users=1, think_time=0.02, duration=0.2, max_browsers=1
+    )
+    report = generator.run()
+
+    assert report["errors"] == 1
+    assert generator.errors == ["vu-0: RuntimeError: browser did not start"]
+    # The virtual user kept going with the next launch
+    assert report["iterations"] > 0 and len(launched) == 2
@@ -0,0 +1,79 @@
+from selenium.webdriver.common.by import By
+from utils.LocatorRegistry import LocatorRegistry, compile_lookup_script, discover_pages, find_problems
+
+# --- Unit tests for the locator registry ---
+# Stand-in page classes, so the checks don't change when the real pages do.
+
+
+class FakeBase:
+    pass
+
+
+class LoginForm(FakeBase):
+    USERNAME = (By.ID, "user-name")
+    TITLE = (By.CLASS_NAME, "title")
+    timeout = 10  # not a locator
+
+
+class Inventory(FakeBase):
+    URL_PATH = "inventory.html"
+    TITLE = (By.CLASS_NAME, "title")
+    ADD = (By.XPATH, "//button[text()='Add']")
+
+
+class NoLocators(FakeBase):
+    URL_PATH = "about.html"
+
+
+def test_discover_pages_keeps_classes_with_locators():
+    assert discover_pages(FakeBase) == [LoginForm, Inventory]
+
+
+def test_shared_locators_lists_every_page_declaring_them():
+    registry = LocatorRegistry([LoginForm, Inventory])
+    assert registry.shared_locators() == {(By.CLASS_NAME, "title"): ["LoginForm.TITLE", "Inventory.TITLE"]}
+
+
+def test_page_for_url_falls_back_to_the_page_without_url_path():
+    registry = LocatorRegistry([LoginForm, Inventory])
+    assert registry.page_for_url("http://stand-in/inventory.html") is Inventory
+    assert registry.page_for_url("http://stand-in/") is LoginForm
+
+
+def test_find_problems_flags_missing_duplicate_slow_and_shared_locators():
+    registry = LocatorRegistry([LoginForm, Inventory])
+    results = {
+        LoginForm: {
+            "USERNAME": {"count": 1, "visible": 1, "ms": 0.1},
+            "TITLE": {"count": 0, "visible": 0, "ms": 0.1},
+        },
+        Inventory: {
+            "TITLE": {"count": 1, "visible": 1, "ms": 0.1},
+            "ADD": {"count": 6, "visible": 6, "ms": 2.0},
+        },
+    }
+
+    problems = find_problems(registry, results, slow_ms=0.5)
+
+    assert problems == [
+        ("LoginForm", "TITLE", "matches no element"),
+        ("Inventory", "ADD", "not unique: matches 6 elements"),
+        ("Inventory", "ADD", "slow: 2.000ms per find"),
+        ("LoginForm.TITLE, Inventory.TITLE", "", "('class name', 'title') is shared by 2 pages"),
+    ]
+
+
+def test_compile_lookup_script_uses_native_calls_per_strategy():
+    script = compile_lookup_script(Inventory)
+    assert script.startswith("function () { return {") and script.endswith("}; }")
+    assert '"TITLE": document.getElementsByClassName("title")[0] || null' in script
+    assert 'document.evaluate("//button[text()=\'Add\']", document' in script
+    # Compiled once per class
+    assert compile_lookup_script(Inventory) is script
+
+
+def test_compile_lookup_script_falls_back_to_find_all_for_link_text():
+    class Links:
+        HELP = (By.LINK_TEXT, "Help")
+
+    assert '"HELP": findAll("link text", "Help")[0] || null' in compile_lookup_script(Links)
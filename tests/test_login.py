@@ -1,12 +1,10 @@
 import pytest
 from pages import LoginPage, InventoryPage
-from utils.DataUtils import get_csv_data
+from utils.DataProvider import load_params
 import logging
 
 log = logging.getLogger(__name__)
 
-BASE_URL = "https://www.saucedemo.com/"
-
 # --- Data for parameterization ---
 # We define our test cases as a list of tuples
 # (username, password, expected_result, expected_message)
@@ -17,10 +15,12 @@ login_test_data = [
 ]
 
 @pytest.mark.login
+@pytest.mark.provides("login")
+@pytest.mark.tabbed
 @pytest.mark.parametrize(
     "username, password, expected_result, expected_message", login_test_data
 )
-def test_login_scenarios(driver, username, password, expected_result, expected_message):
+def test_login_scenarios(driver, base_url, username, password, expected_result, expected_message):
     """
     Data-driven test for multiple login scenarios.
     This single function runs 3 times, once for each tuple in 'login_test_data'.
@@ -29,7 +29,7 @@ def test_login_scenarios(driver, username, password, expected_result, expected_m
 
     # --- 1. ARRANGE
     login_page = LoginPage(driver)
-    login_page.navigate_to_login_page(BASE_URL)
+    login_page.navigate_to_login_page(base_url)
 
     # --- 2. ACT
     login_page.login(username, password)
@@ -51,14 +51,21 @@ def test_login_scenarios(driver, username, password, expected_result, expected_m
 
 
 # --- Data-driven test using external CSV file ---
-login_test_data_from_file = get_csv_data("login_data.csv")
+# Rows are streamed from the CSV and cached; ids look like 'standard_user-success'
+login_test_data_from_file = load_params(
+    "login_data.csv",
+    columns=("username", "password", "expected_result", "expected_message"),
+    id_columns=("username", "expected_result"),
+)
 
 @pytest.mark.login
+@pytest.mark.provides("login")
+@pytest.mark.tabbed
 @pytest.mark.parametrize(
     "username, password, expected_result, expected_message", 
     login_test_data_from_file
 )
-def test_login_scenarios_from_file(driver, username, password, expected_result, expected_message):
+def test_login_scenarios_from_file(driver, base_url, username, password, expected_result, expected_message):
     """
     Data-driven test that reads test cases from login_data.csv
     """
@@ -66,7 +73,7 @@ def test_login_scenarios_from_file(driver, username, password, expected_result,
 
     # --- 1. ARRANGE
     login_page = LoginPage(driver)
-    login_page.navigate_to_login_page(BASE_URL)
+    login_page.navigate_to_login_page(base_url)
 
     # --- 2. ACT
     login_page.login(username, password)
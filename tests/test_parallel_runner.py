@@ -0,0 +1,44 @@
+import json
+from utils.ParallelRunner import assign_shards, merge_results, strip_option
+
+# --- Unit tests for the parallel runner's scheduling and merging ---
+# These need no browser.
+
+
+def test_assign_shards_balances_recorded_durations():
+    """
+    The longest test gets a worker to itself; the rest fill the other one.
+    """
+    durations = {"a": 10.0, "b": 4.0, "c": 3.0, "d": 2.0}
+    shards = assign_shards(["a", "b", "c", "d"], durations, 2)
+    assert shards == [["a"], ["b", "c", "d"]]
+
+
+def test_assign_shards_keeps_collection_order_and_every_test():
+    nodeids = ["t1", "t2", "t3", "t4", "t5"]
+    shards = assign_shards(nodeids, {}, 3)
+    assert sorted(sum(shards, [])) == nodeids
+    for shard in shards:
+        assert shard == sorted(shard, key=nodeids.index)
+
+
+def test_assign_shards_uses_median_for_untimed_tests():
+    # 'new' is assumed to take the median (5s), so it doesn't join 'slow'
+    shards = assign_shards(["slow", "fast", "new"], {"slow": 9.0, "fast": 1.0}, 2)
+    assert ["slow"] in shards
+
+
+def test_strip_option_removes_both_forms():
+    args = ["-v", "--workers", "4", "-k", "login", "--workers=2", "--workers-x"]
+    assert strip_option(args, "--workers") == ["-v", "-k", "login", "--workers-x"]
+
+
+def test_merge_results_tags_worker_and_skips_missing_files(tmp_path):
+    (tmp_path / "results-gw0.json").write_text(
+        json.dumps({"tests/a.py::t": {"outcome": "passed", "duration": 1.0}}), encoding="utf-8"
+    )
+    (tmp_path / "results-gw2.json").write_text("not json", encoding="utf-8")
+
+    results = merge_results(str(tmp_path), ["gw0", "gw1", "gw2"])
+
+    assert results == {"tests/a.py::t": {"outcome": "passed", "duration": 1.0, "worker": "gw0"}}
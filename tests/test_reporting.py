@@ -0,0 +1,54 @@
+from pathlib import Path
+
+# pytester runs a small suite against this project's conftest in a subprocess
+pytest_plugins = ["pytester"]
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# A 1x1 PNG, so the artifact pipeline has a real image to thumbnail
+SCREENSHOT_B64 = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGP4z8AAAAMBAQDJ/pLvAAAAAElFTkSuQmCC"
+
+# --- Failure artifacts in the HTML report ---
+# A failing test with a stand-in driver (no browser needed) must end up with
+# the screenshot thumbnail and DOM snapshot link in reports/report.html.
+
+FAILING_TEST = """
+import pytest
+
+
+class FakeDriver:
+    page_source = "<html><body>cart</body></html>"
+    current_url = "http://stand-in/cart.html"
+
+    def get_screenshot_as_base64(self):
+        return SCREENSHOT_B64
+
+
+@pytest.fixture
+def driver():
+    return FakeDriver()
+
+
+def test_fails_on_purpose(driver):
+    assert False, "failing on purpose"
+"""
+
+
+def test_failure_artifacts_are_attached_to_the_html_report(pytester, monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", str(PROJECT_ROOT))
+    pytester.makeconftest("from tests.conftest import *\n")
+    pytester.makepyfile(
+        test_failing=f"SCREENSHOT_B64 = {SCREENSHOT_B64!r}\n" + FAILING_TEST
+    )
+
+    result = pytester.runpytest_subprocess(
+        "-p", "no:cacheprovider",
+        f"--results-db={pytester.path / 'results.db'}",
+        "--html=reports/report.html",
+        "--self-contained-html",
+    )
+
+    result.assert_outcomes(failed=1)
+    result.stdout.no_fnmatch_line("*Could not take screenshot*")
+    report = (pytester.path / "reports" / "report.html").read_text(encoding="utf-8")
+    assert "DOM snapshot" in report, "The failure artifacts were not added to the HTML report."
+    assert any((pytester.path / "reports" / "screenshots").glob("*.png")), "No screenshot was written."
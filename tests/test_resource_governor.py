@@ -0,0 +1,113 @@
+import time
+import pytest
+from utils import ResourceGovernor as governor_module
+from utils.ResourceGovernor import MB, ResourceGovernor
+
+# --- Unit tests for the resource governor's admission rules ---
+# Host headroom is replaced by a stand-in; no browser is needed.
+
+ENOUGH = (8192 * MB, 10.0, 1024 * MB)
+LOW_MEMORY = (100 * MB, 10.0, 1024 * MB)
+
+
+class FakeDriver:
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def headroom(monkeypatch):
+    """
+    Makes host_headroom() return the given readings in turn (the last one
+    repeats) and counts the calls.
+    """
+    readings = []
+    calls = []
+
+    def host_headroom():
+        calls.append(time.monotonic())
+        return readings[min(len(calls), len(readings)) - 1]
+
+    monkeypatch.setattr(governor_module, "host_headroom", host_headroom)
+
+    def set_readings(*values):
+        readings[:] = values
+        return calls
+
+    return set_readings
+
+
+def make_governor(tmp_path, **kwargs):
+    kwargs.setdefault("sample_interval", 0.01)
+    kwargs.setdefault("max_wait", 0.1)
+    return ResourceGovernor(lock_path=str(tmp_path / "governor.lock"), **kwargs)
+
+
+def test_admits_immediately_with_headroom(tmp_path, headroom):
+    headroom(ENOUGH)
+    governor = make_governor(tmp_path)
+    governor.track(FakeDriver())
+    governor.admit()
+    assert governor.throttled == 0 and governor.forced_admissions == 0
+
+
+def test_first_browser_never_waits(tmp_path, headroom):
+    calls = headroom(LOW_MEMORY)
+    governor = make_governor(tmp_path, max_wait=60)
+    started = time.monotonic()
+    governor.admit()
+    assert time.monotonic() - started < 1
+    assert len(calls) == 1
+    assert governor.throttled == 0 and governor.forced_admissions == 1
+
+
+def test_waits_until_headroom_returns(tmp_path, headroom):
+    calls = headroom(LOW_MEMORY, LOW_MEMORY, ENOUGH)
+    governor = make_governor(tmp_path, max_wait=60)
+    governor.track(FakeDriver())
+    governor.admit()
+    assert len(calls) == 3
+    assert governor.throttled == 1 and governor.throttle_reasons == {"memory": 1}
+    assert governor.forced_admissions == 0
+    assert governor.lowest_free_memory == 100 * MB
+
+
+def test_forced_admission_spares_the_next_launch_the_wait(tmp_path, headroom):
+    headroom(LOW_MEMORY)
+    governor = make_governor(tmp_path, max_wait=0.2)
+    governor.track(FakeDriver())
+
+    started = time.monotonic()
+    governor.admit()
+    assert time.monotonic() - started >= 0.2
+    assert governor.forced_admissions == 1
+
+    started = time.monotonic()
+    governor.admit()
+    assert time.monotonic() - started < 0.1
+    assert governor.forced_admissions == 2 and governor.throttled == 1
+
+
+def test_forced_admission_is_shared_through_the_lock_file(tmp_path, headroom):
+    headroom(LOW_MEMORY)
+    first = make_governor(tmp_path, max_wait=0.2)
+    second = make_governor(tmp_path, max_wait=60)
+    first.track(FakeDriver())
+    second.track(FakeDriver())
+
+    with first.admission():
+        pass
+    started = time.monotonic()
+    with second.admission():
+        pass
+    assert time.monotonic() - started < 1
+    assert second.throttled == 0 and second.forced_admissions == 1
+
+
+def test_quit_browsers_no_longer_count_as_running(tmp_path, headroom):
+    headroom(LOW_MEMORY)
+    governor = make_governor(tmp_path, max_wait=60)
+    driver = governor.track(FakeDriver())
+    driver.quit()
+    governor.admit()
+    assert governor.throttled == 0 and len(governor.finished) == 1
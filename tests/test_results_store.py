@@ -0,0 +1,122 @@
+import importlib
+import importlib.util
+from pathlib import Path
+import pytest
+from utils.ResultsStore import (
+    SHARED_DEPENDENCIES, ResultsStore, changed_files, failing_step, module_dependencies,
+)
+
+# --- Unit tests for the results history behind --changed-only and
+# --recent-failures-first ---
+# These need no browser.
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_changed_files_reports_added_removed_and_modified():
+    baseline = {"pages/A.py": "1", "pages/B.py": "2", "tests/test_a.py": "3"}
+    current = {"pages/A.py": "1", "pages/B.py": "changed", "data/users.csv": "4"}
+    assert changed_files(current, baseline) == {"pages/B.py", "tests/test_a.py", "data/users.csv"}
+
+
+def test_latest_outcomes_and_recent_failures(tmp_path):
+    store = ResultsStore(tmp_path / "results.db")
+    store.record_run({
+        "t::a": {"outcome": "failed", "duration": 1.0},
+        "t::b": {"outcome": "passed", "duration": 1.0},
+    })
+    store.record_run({
+        "t::a": {"outcome": "passed", "duration": 1.0},
+        "t::b": {"outcome": "error", "duration": 1.0},
+        "t::c": {"outcome": "failed", "duration": 1.0},
+    })
+    store.record_run({"t::d": {"outcome": "skipped", "duration": 0.0}})
+
+    assert store.latest_outcomes() == {"t::a": "passed", "t::b": "error", "t::c": "failed", "t::d": "skipped"}
+    assert sorted(store.recent_failures()) == ["t::b", "t::c"]
+
+
+def test_last_passed_files_is_per_test(tmp_path):
+    store = ResultsStore(tmp_path / "results.db")
+    store.start_run({"pages/A.py": "v1"})
+    store.record_run({"t::a": {"outcome": "passed", "duration": 1.0},
+                      "t::b": {"outcome": "passed", "duration": 1.0}})
+    # A partial run that fails 't::b' and never runs 't::a'
+    store.start_run({"pages/A.py": "v2"})
+    store.record_run({"t::b": {"outcome": "failed", "duration": 1.0}})
+    store.start_run({"pages/A.py": "v3"})
+    store.record_run({"t::c": {"outcome": "passed", "duration": 1.0}})
+
+    assert store.last_passed_files() == {
+        "t::a": {"pages/A.py": "v1"},
+        "t::b": {"pages/A.py": "v1"},
+        "t::c": {"pages/A.py": "v3"},
+    }
+
+
+def test_module_dependencies_follow_imported_page_objects():
+    module = importlib.import_module("tests.test_checkout")
+    dependencies = module_dependencies(module, ROOT)
+    assert set(SHARED_DEPENDENCIES) <= dependencies
+    assert {"tests/test_checkout.py", "pages/InventoryPage.py", "pages/CheckoutFlowPage.py"} <= dependencies
+    assert "tests/test_login.py" not in dependencies
+
+
+# --- failing_step on a synthetic project: a BasePage helper, a page object
+# calling it and a test calling the page object ---
+
+BASE_SOURCE = """
+class BasePage:
+    def wait(self):
+        raise TimeoutError("element never appeared")
+"""
+
+PAGE_SOURCE = """
+class CartPage:
+    def __init__(self, base):
+        self.base = base
+
+    def go_to_cart(self):
+        self.base.wait()
+"""
+
+TEST_SOURCE = """
+def run(action):
+    action()
+"""
+
+
+def _load(path, source):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(source, encoding="utf-8")
+    spec = importlib.util.spec_from_file_location(f"synthetic_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def project(tmp_path):
+    base = _load(tmp_path / "utils" / "BasePage.py", BASE_SOURCE).BasePage()
+    cart = _load(tmp_path / "pages" / "cart.py", PAGE_SOURCE).CartPage(base)
+    test = _load(tmp_path / "tests" / "test_x.py", TEST_SOURCE)
+    return tmp_path, base, cart, test
+
+
+def test_failing_step_prefers_the_page_object_method(project):
+    root, base, cart, test = project
+    with pytest.raises(TimeoutError) as excinfo:
+        test.run(cart.go_to_cart)
+    assert failing_step(excinfo, root) == "CartPage.go_to_cart"
+
+
+def test_failing_step_falls_back_to_base_page_then_test_line(project):
+    root, base, cart, test = project
+    with pytest.raises(TimeoutError) as excinfo:
+        test.run(base.wait)
+    assert failing_step(excinfo, root) == "BasePage.wait"
+
+    with pytest.raises(ZeroDivisionError) as excinfo:
+        test.run(lambda: 1 / 0)
+    # The lambda is defined here, outside the synthetic project
+    assert failing_step(excinfo, root) == "tests/test_x.py:3"
@@ -0,0 +1,71 @@
+import threading
+import time
+from types import SimpleNamespace
+from utils.SessionPool import SessionPool
+
+# --- Unit tests for pre-warming in the session pool ---
+# The launcher returns stand-in drivers; no browser is needed.
+
+
+class FakeDriver:
+    def __init__(self):
+        self.window_handles = ["main"]
+        self.switch_to = SimpleNamespace(window=lambda handle: None)
+        self.quit_called = False
+
+    def execute_script(self, script, *args):
+        return None
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+class SlowLauncher:
+    """
+    Launches stand-in drivers, each one only once 'proceed' is set.
+    """
+
+    def __init__(self):
+        self.proceed = threading.Event()
+        self.launched = []
+
+    def __call__(self):
+        self.proceed.wait(5)
+        self.launched.append(FakeDriver())
+        return self.launched[-1]
+
+
+def test_acquire_waits_for_the_prewarmed_session():
+    launcher = SlowLauncher()
+    pool = SessionPool(launcher)
+    pool.prewarm(1)
+    launcher.proceed.set()
+    session = pool.acquire()
+    assert session.driver is launcher.launched[0]
+    assert pool.launches == pool.prewarmed == 1
+    pool.release(session)
+    pool.close()
+    assert session.driver.quit_called
+
+
+def test_close_after_cancel_does_not_wait_for_the_launch():
+    launcher = SlowLauncher()
+    pool = SessionPool(launcher)
+    pool.prewarm(1)
+    pool.cancel_prewarm()
+
+    started = time.monotonic()
+    pool.close()
+    assert time.monotonic() - started < 1
+
+    # The launch finishes later and quits its unneeded browser itself
+    launcher.proceed.set()
+    pool._warm_threads[0].join(5)
+    assert launcher.launched[0].quit_called
+    assert pool.prewarmed == 0
@@ -0,0 +1,143 @@
+import base64
+import gzip
+import hashlib
+import html
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+# Pillow is optional: without it screenshots are stored as-is and the report
+# shows the full image scaled down instead of a real thumbnail
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+THUMBNAIL_WIDTH = 320
+
+
+class FailureArtifacts:
+    """
+    Paths (relative to the report directory) of what was captured for one failure.
+    """
+
+    def __init__(self, screenshot, thumbnail, dom_snapshot, url):
+        self.screenshot = screenshot
+        self.thumbnail = thumbnail
+        self.dom_snapshot = dom_snapshot
+        self.url = url
+
+    def to_html(self, test_name):
+        """
+        A report fragment that only embeds the small thumbnail; the full
+        screenshot and DOM snapshot are loaded when clicked.
+        """
+        return (
+            f'<div style="float:right;text-align:right">'
+            f'<a href="{self.screenshot}" target="_blank">'
+            f'<img src="{self.thumbnail}" alt="Screenshot of {html.escape(test_name)}" '
+            f'loading="lazy" style="width:{THUMBNAIL_WIDTH}px"/></a><br/>'
+            f'<a href="{self.dom_snapshot}" target="_blank">DOM snapshot</a> | '
+            f'URL: {html.escape(self.url)}</div>'
+        )
+
+
+class ArtifactPipeline:
+    """
+    Captures failure artifacts (screenshot, page source, URL) and processes
+    them on a background thread pool.
+
+    Only the browser reads run on the test's thread. Decoding, thumbnailing,
+    compression and writing happen in the background. Files are named by
+    content hash, so identical screenshots or pages are stored only once,
+    even across parallel workers.
+    """
+
+    def __init__(self, report_dir="reports", workers=2):
+        self.report_dir = report_dir
+        self.screenshot_dir = os.path.join(report_dir, "screenshots")
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="artifacts")
+        self._pending = []
+        self._known = set()
+        self._lock = threading.Lock()
+
+    def capture(self, driver, test_name):
+        """
+        Grabs the artifacts from the browser and queues their processing.
+        Returns the FailureArtifacts paths for the report right away.
+        """
+        # The screenshot stays base64 here; decoding it is background work
+        screenshot_b64 = driver.get_screenshot_as_base64()
+        page_source = driver.page_source
+        url = driver.current_url
+
+        shot_hash = hashlib.sha1(screenshot_b64.encode("ascii")).hexdigest()[:16]
+        dom_hash = hashlib.sha1(page_source.encode("utf-8")).hexdigest()[:16]
+        thumbnail_name = f"{shot_hash}_thumb.png" if Image is not None else f"{shot_hash}.png"
+
+        self._submit(shot_hash, self._write_screenshot, screenshot_b64, shot_hash)
+        self._submit(dom_hash, self._write_dom_snapshot, page_source, url, dom_hash)
+
+        log.info(f"Queued failure artifacts for {test_name} (screenshot {shot_hash}, DOM {dom_hash})")
+        return FailureArtifacts(
+            screenshot=f"screenshots/{shot_hash}.png",
+            thumbnail=f"screenshots/{thumbnail_name}",
+            dom_snapshot=f"screenshots/{dom_hash}.html.gz",
+            url=url,
+        )
+
+    def close(self):
+        """
+        Waits for all queued artifacts to be written. Called at the end of the run.
+        """
+        for future in self._pending:
+            try:
+                future.result()
+            except Exception as e:
+                log.warning(f"Could not write a failure artifact: {e}")
+        self._executor.shutdown(wait=True)
+        self._pending = []
+
+    # --- Background work ---
+
+    def _submit(self, content_hash, function, *args):
+        with self._lock:
+            if content_hash in self._known:
+                return
+            self._known.add(content_hash)
+            self._pending.append(self._executor.submit(function, *args))
+
+    def _write_screenshot(self, screenshot_b64, shot_hash):
+        full_path = os.path.join(self.screenshot_dir, f"{shot_hash}.png")
+        if os.path.exists(full_path):
+            return
+        png = base64.b64decode(screenshot_b64)
+
+        if Image is not None:
+            with Image.open(io.BytesIO(png)) as image:
+                thumbnail = image.copy()
+                thumbnail.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_WIDTH * 4))
+                buffer = io.BytesIO()
+                thumbnail.save(buffer, format="PNG", optimize=True)
+            self._write_file(os.path.join(self.screenshot_dir, f"{shot_hash}_thumb.png"), buffer.getvalue())
+
+        self._write_file(full_path, png)
+
+    def _write_dom_snapshot(self, page_source, url, dom_hash):
+        path = os.path.join(self.screenshot_dir, f"{dom_hash}.html.gz")
+        if os.path.exists(path):
+            return
+        document = f"<!-- Captured from {url} -->\n{page_source}"
+        self._write_file(path, gzip.compress(document.encode("utf-8")))
+
+    def _write_file(self, path, data):
+        # Write to a temp file first so a parallel worker never sees half a file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -1,90 +1,552 @@
 import logging
+import time
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import (
+    ElementClickInterceptedException, ElementNotInteractableException, JavascriptException,
+    StaleElementReferenceException, TimeoutException
+)
+from utils import BrowserState, Instrumentation, LocatorRegistry, PerfMetrics
 
 # Get a logger for this module, which will be configured by pytest.ini
 log = logging.getLogger(__name__)
 
+# --- In-browser wait engine ---
+# Helper functions injected into every wait script. 'findAll' understands the
+# same (By.X, value) locator tuples the page objects use, so conditions can be
+# evaluated entirely inside the browser.
+FIND_ELEMENTS_JS = """
+function findAll(by, value) {
+    switch (by) {
+        case 'id':
+            var el = document.getElementById(value);
+            return el ? [el] : [];
+        case 'class name':
+            return Array.prototype.slice.call(document.getElementsByClassName(value));
+        case 'css selector':
+            return Array.prototype.slice.call(document.querySelectorAll(value));
+        case 'name':
+            return Array.prototype.slice.call(document.getElementsByName(value));
+        case 'tag name':
+            return Array.prototype.slice.call(document.getElementsByTagName(value));
+        case 'xpath':
+            var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var found = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) { found.push(snapshot.snapshotItem(i)); }
+            return found;
+        case 'link text':
+        case 'partial link text':
+            return Array.prototype.filter.call(document.getElementsByTagName('a'), function (a) {
+                var text = a.innerText.trim();
+                return by === 'link text' ? text === value : text.indexOf(value) !== -1;
+            });
+    }
+    throw new Error('Unsupported locator strategy: ' + by);
+}
+function isVisible(el) {
+    if (!el || !el.isConnected) { return false; }
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') { return false; }
+    var rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+function isEnabled(el) {
+    return !el.disabled;
+}
+"""
+
+# Element states understood by wait_for_element. Each body receives the first
+# matching element (or null) and returns a truthy value once the state holds.
+ELEMENT_STATES = {
+    "present": "return el;",
+    "visible": "return isVisible(el) ? el : null;",
+    "clickable": "return (isVisible(el) && isEnabled(el)) ? el : null;",
+    "invisible": "return isVisible(el) ? null : {gone: true};",
+}
+
+# Reads the state of several locators at once. 'locators' maps a name to a
+# (By.X, value) tuple; every requested attribute is read from the first match.
+SNAPSHOT_JS = """
+function snapshot(locators, attributes) {
+    var result = {};
+    Object.keys(locators).forEach(function (name) {
+        var els = findAll(locators[name][0], locators[name][1]);
+        var el = els[0] || null;
+        var entry = {
+            present: el !== null,
+            count: els.length,
+            visible: isVisible(el),
+            enabled: el !== null && isEnabled(el),
+            text: isVisible(el) ? el.innerText.trim() : null,
+            texts: els.filter(isVisible).map(function (e) { return e.innerText.trim(); }),
+            attributes: {}
+        };
+        attributes.forEach(function (attr) {
+            var value = el === null ? null : (attr in el ? el[attr] : el.getAttribute(attr));
+            entry.attributes[attr] = (value === undefined) ? null : value;
+        });
+        result[name] = entry;
+    });
+    return result;
+}
+"""
+
+# Per-entry conditions used by query_elements(wait_for=...)
+SNAPSHOT_STATES = {
+    "present": "e.present",
+    "visible": "e.visible",
+    "clickable": "e.visible && e.enabled",
+}
+
+# Runs 'check' immediately, then again on every DOM mutation, and finishes as
+# soon as it returns a truthy value or the budget runs out. The slow interval
+# is a safety net for changes that don't mutate the DOM (e.g. CSS transitions).
+ASYNC_WAIT_JS = """
+var done = arguments[arguments.length - 1];
+var timeoutMs = arguments[0];
+var args = arguments[1];
+/*HELPERS*/
+var check = function (args) { /*BODY*/ };
+var finished = false, observer = null, timer = null, poll = null;
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearTimeout(timer);
+    clearInterval(poll);
+    done(result);
+}
+function attempt() {
+    try {
+        var value = check(args);
+        if (value) { finish({ok: true, value: value}); }
+    } catch (e) {
+        finish({ok: false, error: String(e)});
+    }
+}
+attempt();
+if (!finished) {
+    observer = new MutationObserver(attempt);
+    observer.observe(document.documentElement || document,
+                     {childList: true, subtree: true, attributes: true, characterData: true});
+    poll = setInterval(attempt, 100);
+    timer = setTimeout(function () { finish({ok: false}); }, timeoutMs);
+}
+"""
+
+# Text of a (cached) element, or null when it is not visible
+VISIBLE_TEXT_JS = FIND_ELEMENTS_JS + """
+var el = arguments[0];
+return isVisible(el) ? el.innerText.trim() : null;
+"""
+
+# JavascriptException messages that mean the document went away while a wait
+# script ran (navigation, reload, closed frame); the wait is retried on the
+# new document. Any other script error is a bug in the condition.
+NAVIGATION_ERRORS = (
+    "document unloaded",
+    "document was unloaded",
+    "execution context was destroyed",
+    "cannot find context with specified id",
+    "inspected target navigated or closed",
+    "navigated or closed",
+)
+# Pause before retrying an interrupted wait, doubled on every retry up to the max
+RETRY_BACKOFF = 0.05
+MAX_RETRY_BACKOFF = 0.5
+
+# Returned by BasePage._try_cached when no usable cached element exists
+_CACHE_MISS = object()
+
+
+def _is_navigation_error(error):
+    message = (error.msg or "").lower()
+    return any(fragment in message for fragment in NAVIGATION_ERRORS)
+
+
+class ReadyGate:
+    """
+    One condition a page must meet before a page-chain method hands it to
+    the test. 'function' is a JavaScript function expression that receives
+    'arg' and returns a truthy value once the page is ready.
+    """
+
+    def __init__(self, description, function, arg=None, locator=None):
+        self.description = description
+        self.function = function
+        self.arg = arg
+        # Set for element gates; the element found is put in the page's cache
+        self.locator = locator
+
+    @classmethod
+    def element(cls, by_locator, state="present"):
+        """
+        The first element matching 'by_locator' is in 'state'
+        ('present', 'visible' or 'clickable').
+        """
+        body = "var el = findAll(arg[0], arg[1])[0] || null; " + ELEMENT_STATES[state]
+        return cls(f"{by_locator} {state}", f"function (arg) {{ {body} }}", list(by_locator), tuple(by_locator))
+
+    @classmethod
+    def url_contains(cls, fragment):
+        """
+        The browser has reached this page. Guards against element gates
+        matching the previous page, which 'eager'/'none' page loads expose.
+        """
+        return cls(f"URL contains '{fragment}'", "function (arg) { return location.href.indexOf(arg) !== -1; }", fragment)
+
+    @classmethod
+    def network_idle(cls, quiet_ms=500):
+        """
+        No new resource has finished loading for 'quiet_ms' milliseconds.
+        """
+        function = """function (arg) {
+            var count = performance.getEntriesByType('resource').length, now = Date.now();
+            var seen = window.__readyGateNetwork;
+            if (!seen || seen.count !== count) { window.__readyGateNetwork = {count: count, since: now}; return false; }
+            return now - seen.since >= arg;
+        }"""
+        return cls(f"network idle for {quiet_ms}ms", function, quiet_ms)
+
+    @classmethod
+    def script(cls, expression, description=None):
+        """
+        A custom JavaScript expression is truthy, e.g. "window.appReady === true".
+        """
+        return cls(description or expression, f"function (arg) {{ return ({expression}); }}")
+
+
 class BasePage:
     """
     Contains common methods and utilities that will be inherited by all
     Page Object classes.
     """
 
-    def __init__(self, driver):
+    # Default wait budget (seconds) for every wait on this page.
+    # Page classes can override it; a per-call 'timeout' overrides both.
+    DEFAULT_TIMEOUT = 10
+
+    # Conditions checked by wait_until_ready (see ReadyGate). Pages that set
+    # URL_PATH also wait until the browser's URL contains it.
+    READY_GATES = ()
+    URL_PATH = None
+
+    # Client-side performance budgets, {metric: max ms}, checked against the
+    # metrics read once the page is ready (with '--perf-metrics')
+    PERF_BUDGETS = {}
+
+    # Longest single in-browser wait. Longer budgets are split into several
+    # scripts so they never run into the driver's script timeout.
+    MAX_SCRIPT_WAIT = 30
+
+    # Opt-in: reuse WebElements found by earlier actions on this page object
+    # (see _with_element). Enabled for every page by '--cache-elements'.
+    CACHE_ELEMENTS = False
+
+    def __init__(self, driver, timeout=None, cache_elements=None):
         """
         The constructor receives the 'driver' fixture from the test
-        and initializes the WebDriverWait.
+        and sets the wait budget for this page.
         """
         self.driver = driver
-        # Set a standard 10-second explicit wait
-        self.wait = WebDriverWait(self.driver, 10)
+        self.timeout = self.DEFAULT_TIMEOUT if timeout is None else timeout
+        self.cache_elements = self.CACHE_ELEMENTS if cache_elements is None else cache_elements
+        self._element_cache = {}
+        self.cache_stats = {"hits": 0, "misses": 0, "stale": 0}
+        # Kept for custom expected_conditions; the page methods below use the
+        # in-browser wait engine instead
+        self.wait = WebDriverWait(self.driver, self.timeout, poll_frequency=0.05)
+
+    # --- Wait engine ---
+
+    def wait_for_condition(self, body, args=None, timeout=None, description="condition"):
+        """
+        Waits until the JavaScript function 'body' (which receives 'args')
+        returns a truthy value, and returns that value. The condition is
+        evaluated inside the browser, so the wait ends within a few ms of the
+        DOM change. Raises TimeoutException after exactly 'timeout' seconds.
+        A wait interrupted by a navigation is retried on the new document
+        with a short backoff; any other script error is raised right away.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        script = ASYNC_WAIT_JS.replace("/*HELPERS*/", FIND_ELEMENTS_JS).replace("/*BODY*/", body)
+        deadline = time.monotonic() + timeout
+        interrupted = None
+        backoff = RETRY_BACKOFF
+        # Tab drivers (see TabRunner) share a browser and wait in short slices
+        max_slice = getattr(self.driver, "max_script_wait", self.MAX_SCRIPT_WAIT)
+
+        while True:
+            remaining = deadline - time.monotonic()
+            slice_ms = int(max(0, min(remaining, max_slice)) * 1000)
+            try:
+                with Instrumentation.phase(self.driver, "wait"):
+                    result = self.driver.execute_async_script(script, slice_ms, args)
+            except (JavascriptException, TimeoutException) as e:
+                # The page navigated while the script was waiting (or the
+                # driver's script timeout is shorter than our slice): try
+                # again on the new document with whatever budget is left
+                if isinstance(e, JavascriptException) and not _is_navigation_error(e):
+                    raise
+                log.debug("Wait for %s interrupted, retrying: %s", description, e.msg)
+                interrupted = e.msg
+                result = None
+                time.sleep(max(0, min(backoff, deadline - time.monotonic())))
+                backoff = min(backoff * 2, MAX_RETRY_BACKOFF)
+
+            if result and result.get("ok"):
+                return result["value"]
+            if result and result.get("error"):
+                raise JavascriptException(f"Error while waiting for {description}: {result['error']}")
+            if time.monotonic() >= deadline:
+                raise TimeoutException(
+                    f"Timed out after {timeout}s waiting for {description}"
+                    + (f" (last interruption: {interrupted})" if interrupted else "")
+                )
+
+    def wait_for_element(self, by_locator, state="visible", timeout=None):
+        """
+        Waits until the first element matching 'by_locator' is in 'state'
+        ('present', 'visible', 'clickable' or 'invisible') and returns it.
+        For 'invisible' the return value is True.
+        """
+        body = "var el = findAll(args[0], args[1])[0] || null; " + ELEMENT_STATES[state]
+        value = self.wait_for_condition(
+            body, list(by_locator), timeout, description=f"{by_locator} to be {state}"
+        )
+        return True if state == "invisible" else value
+
+    # --- Page readiness ---
+
+    def wait_until_ready(self, timeout=None):
+        """
+        Waits until every READY_GATES condition holds, in one in-browser wait,
+        and returns the page. With the 'eager' or 'none' page-load strategy
+        this is what decides when a page can be used.
+        Once ready, the page's client-side performance metrics are recorded
+        (when enabled, see PerfMetrics). With the element cache on, the same
+        round trip also looks up every locator of the page (a precompiled
+        script, see LocatorRegistry) and caches what it finds.
+        """
+        started = time.perf_counter()
+        gates = list(self.READY_GATES)
+        if self.URL_PATH:
+            gates.insert(0, ReadyGate.url_contains(self.URL_PATH))
+
+        if gates:
+            lookup = LocatorRegistry.compile_lookup_script(type(self)) if self.cache_elements else "null"
+            body = (
+                "var gates = [" + ", ".join(gate.function for gate in gates) + "];"
+                + " var values = [];"
+                + " for (var i = 0; i < gates.length; i++) {"
+                + " var value = gates[i](args[i]); if (!value) { return null; } values.push(value); }"
+                + f" var lookup = {lookup};"
+                + " return [values, lookup ? lookup() : {}];"
+            )
+            description = f"{type(self).__name__} to be ready ({'; '.join(gate.description for gate in gates)})"
+            values, elements = self.wait_for_condition(
+                body, [gate.arg for gate in gates], timeout, description=description
+            )
+            # Elements the gates found are likely the next ones the test uses
+            for gate, value in zip(gates, values):
+                if gate.locator is not None:
+                    self._remember(gate.locator, value)
+            for name, element in elements.items():
+                if element is not None:
+                    self._remember(getattr(type(self), name), element)
+            log.info("%s is ready.", type(self).__name__, extra={"event": "ready"})
+
+        PerfMetrics.capture(self.driver, self, (time.perf_counter() - started) * 1000)
+        return self
+
+    def chain_to(self, page_cls, timeout=None):
+        """
+        Returns the next page of a flow once its readiness gates pass.
+        Page-chain methods end with 'return self.chain_to(NextPage)'.
+        While a CheckpointStore is recording, the state on arrival is
+        captured as a checkpoint named after the page class.
+        """
+        self.clear_element_cache()
+        page = page_cls(self.driver).wait_until_ready(timeout)
+        BrowserState.record_checkpoint(self.driver, page_cls.__name__)
+        return page
+
+    # --- Element cache ---
+
+    def prefetch_elements(self):
+        """
+        Looks up every locator of this page in one round trip and caches the
+        elements found (element cache only). Returns the attribute names of
+        the locators that matched nothing.
+        """
+        elements = self.driver.execute_script(
+            FIND_ELEMENTS_JS + "return (" + LocatorRegistry.compile_lookup_script(type(self)) + ")();"
+        )
+        for name, element in elements.items():
+            if element is not None:
+                self._remember(getattr(type(self), name), element)
+        return sorted(name for name, element in elements.items() if element is None)
+
+    def clear_element_cache(self):
+        """
+        Forgets every cached element. Called whenever this page navigates away.
+        """
+        self._element_cache.clear()
+
+    def _with_element(self, by_locator, state, action, timeout=None):
+        """
+        Runs 'action' on the element for 'by_locator' and returns its result.
+        A cached element is tried first; otherwise (or if it went stale) the
+        normal wait for 'state' finds the element and caches it.
+        """
+        result = self._try_cached(by_locator, action)
+        if result is not _CACHE_MISS:
+            return result
+        element = self.wait_for_element(by_locator, state, timeout)
+        self._remember(by_locator, element)
+        return action(element)
+
+    def _try_cached(self, by_locator, action):
+        """
+        Returns 'action' applied to the cached element, or _CACHE_MISS when
+        the cache is off, has no entry, or the element is stale or not
+        interactable any more (the entry is then dropped).
+        """
+        if not self.cache_elements:
+            return _CACHE_MISS
+        element = self._element_cache.get(by_locator)
+        if element is None:
+            self._count_cache("misses")
+            return _CACHE_MISS
+        try:
+            result = action(element)
+        except (StaleElementReferenceException, ElementNotInteractableException, ElementClickInterceptedException):
+            log.debug("Cached element went stale, finding it again: %s", by_locator)
+            self._count_cache("stale")
+            del self._element_cache[by_locator]
+            return _CACHE_MISS
+        self._count_cache("hits")
+        return result
+
+    def _remember(self, by_locator, element):
+        if self.cache_elements:
+            self._element_cache[by_locator] = element
+
+    def _visible_text(self, element):
+        """
+        The element's text in one round trip; raises
+        ElementNotInteractableException if it is not visible.
+        """
+        text = self.driver.execute_script(VISIBLE_TEXT_JS, element)
+        if text is None:
+            raise ElementNotInteractableException("Element is not visible")
+        return text
+
+    def _count_cache(self, event):
+        self.cache_stats[event] += 1
+        Instrumentation.count(self.driver, f"elementCache.{event}")
+
+    # --- Batched reads ---
+
+    def query_elements(self, locators, attributes=(), wait_for=None, timeout=None):
+        """
+        Reads the state of many elements in a single browser round trip.
+
+        'locators' maps names to locator tuples. Returns a dict with, per name:
+        present, count, visible, enabled, text (first visible match),
+        texts (all visible matches) and the requested 'attributes'.
+
+        With 'wait_for' set to an element state ('present', 'visible',
+        'clickable'), the snapshot is taken as soon as every element is in
+        that state, so the wait and the read share one round trip.
+        """
+        log.info("Querying %d element(s) in one round trip: %s", len(locators), list(locators), extra={"event": "query"})
+        args = [{name: list(locator) for name, locator in locators.items()}, list(attributes)]
+
+        if wait_for is None:
+            script = FIND_ELEMENTS_JS + SNAPSHOT_JS + "return snapshot(arguments[0], arguments[1]);"
+            return self.driver.execute_script(script, *args)
+
+        body = (
+            SNAPSHOT_JS
+            + "var state = snapshot(args[0], args[1]);"
+            + " var ready = Object.keys(state).every(function (name) {"
+            + " var e = state[name]; return " + SNAPSHOT_STATES[wait_for] + "; });"
+            + " return ready ? state : null;"
+        )
+        return self.wait_for_condition(
+            body, args, timeout, description=f"{list(locators)} to be {wait_for}"
+        )
+
+    # --- Actions ---
 
     def do_click(self, by_locator):
         """
         Waits for an element to be clickable, then clicks it.
         """
-        log.info(f"Attempting to click element: {by_locator}")
         try:
-            element = self.wait.until(EC.element_to_be_clickable(by_locator))
-            element.click()
-            log.info(f"Successfully clicked element: {by_locator}")
+            self._with_element(by_locator, "clickable", lambda element: element.click())
+            log.info("Clicked element: %s", by_locator, extra={"event": "click", "locator": by_locator})
         except TimeoutException:
-            log.error(f"Timeout: Element not clickable: {by_locator}", exc_info=True)
+            log.error("Timeout: Element not clickable: %s", by_locator, exc_info=True)
             # Re-raise the exception to fail the test
             raise
 
     def do_send_keys(self, by_locator, text):
         """
         Waits for an element to be clickable (interactable), clears it, then sends keys.
+        Only the length of 'text' is logged, never the text (it may be a password).
         """
-        log.info(f"Attempting to send keys '{text}' to element: {by_locator}")
         try:
             # Wait for element to be clickable (ensures it's interactable)
-            element = self.wait.until(EC.element_to_be_clickable(by_locator))
-            element.clear()
-            element.send_keys(text)
-            log.info(f"Successfully sent keys to element: {by_locator}")
+            def type_text(element):
+                element.clear()
+                element.send_keys(text)
+
+            self._with_element(by_locator, "clickable", type_text)
+            log.info(
+                "Sent %d character(s) to element: %s", len(text), by_locator,
+                extra={"event": "send_keys", "locator": by_locator},
+            )
         except TimeoutException:
-            log.error(f"Timeout: Element not clickable/interactable: {by_locator}", exc_info=True)
+            log.error("Timeout: Element not clickable/interactable: %s", by_locator, exc_info=True)
             raise
 
-    def get_element_text(self, by_locator):
+    def get_element_text(self, by_locator, timeout=None):
         """
         Waits for an element to be visible, then returns its text.
         """
-        log.info(f"Attempting to get text from element: {by_locator}")
         try:
-            element = self.wait.until(EC.visibility_of_element_located(by_locator))
-            text = element.text
-            log.info(f"Found text '{text}' in element: {by_locator}")
+            text = self._with_element(by_locator, "visible", self._visible_text, timeout)
+            log.info(
+                "Found text '%s' in element: %s", text, by_locator,
+                extra={"event": "get_text", "locator": by_locator},
+            )
             return text
         except TimeoutException:
-            log.error(f"Timeout: Element not visible for text retrieval: {by_locator}", exc_info=True)
+            log.error("Timeout: Element not visible for text retrieval: %s", by_locator, exc_info=True)
             raise
 
-    def is_element_visible(self, by_locator, timeout=10):
+    def is_element_visible(self, by_locator, timeout=None):
         """
         Waits for an element to be visible, returns True/False.
-        Allows for a custom timeout.
+        Allows for a custom timeout; the page's budget is used otherwise.
         """
-        log.info(f"Checking visibility of element: {by_locator}")
+        timeout = self.timeout if timeout is None else timeout
         try:
-            # Use a custom wait if provided, else default
-            wait = WebDriverWait(self.driver, timeout)
-            wait.until(EC.visibility_of_element_located(by_locator))
-            log.info(f"Element is visible: {by_locator}")
+            if self._try_cached(by_locator, self._visible_text) is _CACHE_MISS:
+                self._remember(by_locator, self.wait_for_element(by_locator, "visible", timeout))
+            log.info("Element is visible: %s", by_locator, extra={"event": "is_visible", "locator": by_locator})
             return True
         except TimeoutException:
-            log.warning(f"Element not visible after {timeout}s: {by_locator}")
+            log.warning("Element not visible after %ss: %s", timeout, by_locator)
             return False
 
     def get_page_title(self):
         """
         Returns the title of the current page.
         """
-        log.info(f"Getting page title. Current URL: {self.driver.current_url}")
         title = self.driver.title
-        log.info(f"Page title is: '{title}'")
+        # Reading the URL is a round trip of its own, so only when it is logged
+        if log.isEnabledFor(logging.INFO):
+            log.info("Page title is '%s' at %s", title, self.driver.current_url, extra={"event": "get_title"})
         return title
@@ -0,0 +1,173 @@
+import contextlib
+import json
+import logging
+import math
+import os
+import time
+from datetime import datetime
+from statistics import median
+
+log = logging.getLogger(__name__)
+
+# Differences smaller than this are treated as noise, however large they are
+# relative to a very fast step
+MIN_REGRESSION_SECONDS = 0.005
+
+
+def percentile(values, pct):
+    """
+    Linear-interpolated percentile of 'values' (pct in 0..100).
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples):
+    """
+    Turns {step: [seconds, ...]} into {step: {"n", "p50", "p95", "max"}}.
+    """
+    return {
+        step: {
+            "n": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "max": max(values),
+        }
+        for step, values in samples.items() if values
+    }
+
+
+class BenchmarkRecorder:
+    """
+    Collects step timings from the benchmark tests for the whole run.
+
+    Usage inside a benchmark test:
+        for _ in bench.rounds():
+            with bench.step("login.submit"):
+                login_page.login(user, password)
+    """
+
+    def __init__(self, rounds=10, warmup=1):
+        self.rounds_count = rounds
+        self.warmup = warmup
+        self.samples = {}
+        self.regressions = []
+        self._recording = True
+
+    def rounds(self):
+        """
+        Yields the round index. Warm-up rounds run the flow without recording.
+        """
+        for index in range(self.warmup + self.rounds_count):
+            self._recording = index >= self.warmup
+            yield index
+        self._recording = True
+
+    @contextlib.contextmanager
+    def step(self, name):
+        started = time.perf_counter()
+        yield
+        if self._recording:
+            self.samples.setdefault(name, []).append(time.perf_counter() - started)
+
+    def summary(self):
+        return summarize(self.samples)
+
+    def write_samples(self, path):
+        """
+        Writes the raw samples, so a parallel run's controller can merge
+        every worker's samples before comparing them with the history.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.samples, f)
+
+
+def merge_samples(paths):
+    """
+    Combines the samples written by write_samples() into one {step: [seconds]}.
+    Missing or unreadable files are skipped.
+    """
+    merged = {}
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                samples = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for step, values in samples.items():
+            merged.setdefault(step, []).extend(values)
+    return merged
+
+
+# --- History and regression checks ---
+
+def load_history(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def append_history(path, summary, regressed):
+    history = load_history(path)
+    history.append({
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "regressed": regressed,
+        "steps": summary,
+    })
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+
+
+def baseline_from_history(history, window=5):
+    """
+    Builds the baseline from the last 'window' runs that did not regress:
+    for every step, the median of their p50 and p95 values.
+    """
+    runs = [run for run in history if not run.get("regressed")][-window:]
+    steps = {}
+    for run in runs:
+        for step, stats in run["steps"].items():
+            steps.setdefault(step, {"p50": [], "p95": []})
+            steps[step]["p50"].append(stats["p50"])
+            steps[step]["p95"].append(stats["p95"])
+    return {
+        step: {"p50": median(values["p50"]), "p95": median(values["p95"])}
+        for step, values in steps.items()
+    }
+
+
+def find_regressions(summary, baseline, threshold):
+    """
+    Returns a message for every step whose p50 or p95 exceeds the baseline
+    by more than 'threshold' (a fraction, e.g. 0.2 for 20%).
+    """
+    regressions = []
+    for step, stats in sorted(summary.items()):
+        if step not in baseline:
+            continue
+        for metric in ("p50", "p95"):
+            base, current = baseline[step][metric], stats[metric]
+            if current > base * (1 + threshold) and current - base > MIN_REGRESSION_SECONDS:
+                regressions.append(
+                    f"{step} {metric}: {current * 1000:.1f}ms vs baseline {base * 1000:.1f}ms "
+                    f"(+{(current / base - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def format_summary(summary):
+    lines = [f"{'step':<40} {'n':>4} {'p50':>10} {'p95':>10} {'max':>10}"]
+    for step, stats in sorted(summary.items()):
+        lines.append(
+            f"{step:<40} {stats['n']:>4} {stats['p50'] * 1000:>8.1f}ms "
+            f"{stats['p95'] * 1000:>8.1f}ms {stats['max'] * 1000:>8.1f}ms"
+        )
+    return lines
@@ -0,0 +1,169 @@
+import contextlib
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# Copies both web storages of the current origin into plain objects
+CAPTURE_STORAGE_SCRIPT = """
+function dump(storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        items[key] = storage.getItem(key);
+    }
+    return items;
+}
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+RESTORE_STORAGE_SCRIPT = """
+var local = arguments[0], session = arguments[1];
+Object.keys(local).forEach(function (key) { window.localStorage.setItem(key, local[key]); });
+Object.keys(session).forEach(function (key) { window.sessionStorage.setItem(key, session[key]); });
+"""
+
+
+def capture_state(driver):
+    """
+    Captures the cookies, web storage and URL of the current page.
+    """
+    storage = driver.execute_script(CAPTURE_STORAGE_SCRIPT)
+    return {
+        "url": driver.current_url,
+        "cookies": driver.get_cookies(),
+        "local_storage": storage["local"],
+        "session_storage": storage["session"],
+        "captured_at": time.time(),
+    }
+
+
+def apply_state(driver, state, origin_url, target_url=None):
+    """
+    Injects a captured state into the browser. Cookies and storage can only be
+    set for the origin that is currently loaded, so the browser first opens
+    'origin_url', then navigates to 'target_url' (default: the captured URL).
+    """
+    driver.get(origin_url)
+    for cookie in state["cookies"]:
+        driver.add_cookie(cookie)
+    driver.execute_script(RESTORE_STORAGE_SCRIPT, state["local_storage"], state["session_storage"])
+    driver.get(target_url or state["url"])
+
+
+def is_state_expired(state, ttl):
+    """
+    A state is expired once it is older than 'ttl' seconds or any of its
+    cookies has passed its own expiry time.
+    """
+    now = time.time()
+    if now - state["captured_at"] > ttl:
+        return True
+    return any(cookie.get("expiry") is not None and cookie["expiry"] <= now for cookie in state["cookies"])
+
+
+class StateStore:
+    """
+    Captured browser states by key, each usable for 'ttl' seconds (and
+    while its cookies last, see is_state_expired). Shared by the login
+    state cache and the page-chain checkpoints.
+    """
+
+    # Logged when get() drops an expired state
+    expired_message = "State '{key}' has expired."
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._states = {}
+        self._lock = threading.Lock()
+        # --- Statistics reported at the end of the run
+        self.hits = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """
+        Returns the state stored as 'key', or None if there is no fresh one.
+        """
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None and is_state_expired(state, self.ttl):
+                log.info(self.expired_message.format(key=key))
+                del self._states[key]
+                state = None
+        return state
+
+    def put(self, key, state):
+        with self._lock:
+            self._states[key] = state
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._states.pop(key, None) is not None:
+                self.invalidations += 1
+
+
+class AuthStateCache(StateStore):
+    """
+    Remembers the browser state of a logged-in user so later tests can
+    inject it instead of driving the login form again. Keyed by user.
+    """
+
+    expired_message = "Cached login state for '{key}' has expired."
+
+    def __init__(self, ttl=300):
+        super().__init__(ttl)
+        self.ui_logins = 0
+
+    def summary(self):
+        return (
+            f"Login state cache: {self.ui_logins} UI login(s), {self.hits} login(s) "
+            f"skipped via injected state, {self.invalidations} invalidation(s)."
+        )
+
+
+# --- Page-chain checkpoints ---
+
+def record_checkpoint(driver, page_name):
+    """
+    Called by BasePage.chain_to after every page-chain transition. Captures
+    the state as checkpoint 'page_name' while a CheckpointStore is recording
+    on this driver (see CheckpointStore.recording); does nothing otherwise.
+    """
+    recording = getattr(driver, "_checkpoint_recording", None)
+    if recording is not None:
+        store, prefix = recording
+        store.put(f"{prefix}:{page_name}", capture_state(driver))
+        log.info(f"Checkpoint '{prefix}:{page_name}' captured.")
+
+
+class CheckpointStore(StateStore):
+    """
+    Browser states captured at page-chain transitions, keyed
+    '<prefix>:<PageClass>' (the prefix is usually the user), so tests can
+    start from a page without replaying the steps that lead to it.
+    """
+
+    expired_message = "Checkpoint '{key}' has expired."
+
+    def __init__(self, ttl=300):
+        super().__init__(ttl)
+        self.builds = 0
+
+    @contextlib.contextmanager
+    def recording(self, driver, prefix):
+        """
+        Captures a checkpoint at every page-chain transition made through
+        'driver' inside the 'with' block.
+        """
+        driver._checkpoint_recording = (self, prefix)
+        try:
+            yield
+        finally:
+            driver._checkpoint_recording = None
+
+    def summary(self):
+        return (
+            f"Checkpoints: {self.hits} test(s) started from a restored checkpoint, "
+            f"{self.builds} prefix step(s) replayed, {self.invalidations} invalidation(s)."
+        )
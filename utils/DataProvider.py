@@ -0,0 +1,162 @@
+import csv
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+from pathlib import Path
+
+import pytest
+
+log = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+# Parsed/filtered row selections, keyed by file path + mtime + options
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "data"
+
+
+def resolve_data_file(file_name):
+    """
+    Returns the absolute path of a file in the 'data' directory.
+    """
+    return DATA_DIR / file_name
+
+
+def iter_rows(file_name):
+    """
+    Streams the rows of a .csv or .xlsx data file as dicts, one at a time,
+    without loading the whole file. Values of .xlsx cells are converted to
+    strings so both formats behave the same.
+    """
+    path = resolve_data_file(file_name)
+    if path.suffix.lower() == ".xlsx":
+        yield from _iter_xlsx_rows(path)
+        return
+
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def _iter_xlsx_rows(path):
+    # openpyxl is only imported when an .xlsx file is actually used
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell) for cell in next(rows, ())]
+        for values in rows:
+            yield {
+                column: "" if value is None else str(value)
+                for column, value in zip(header, values)
+            }
+    finally:
+        workbook.close()
+
+
+def _matches(row, where):
+    """
+    'where' maps a column to an accepted value, or to a tuple/list of them.
+    """
+    for column, accepted in where.items():
+        if isinstance(accepted, (tuple, list, set)):
+            if row.get(column) not in accepted:
+                return False
+        elif row.get(column) != accepted:
+            return False
+    return True
+
+
+def _row_marks(row, marks_column):
+    if not marks_column or not row.get(marks_column):
+        return []
+    return [mark.strip() for mark in row[marks_column].split(",") if mark.strip()]
+
+
+def select_rows(file_name, where=None, with_marks=None, marks_column=None, sample=None, seed=0):
+    """
+    Streams a data file and returns the rows that pass the filters:
+    'where' (column values), 'with_marks' (rows whose 'marks_column' lists
+    any of these marker names) and 'sample' (at most N rows, chosen by
+    reservoir sampling with a fixed seed, in file order).
+
+    The selection is cached on disk keyed by the file's path, mtime and the
+    options, so later collections only read the selected rows.
+    """
+    path = resolve_data_file(file_name)
+    stat = path.stat()
+    options = {
+        "where": where or {}, "with_marks": sorted(with_marks or []), "marks_column": marks_column,
+        "sample": sample, "seed": seed,
+    }
+    key_source = json.dumps([str(path), stat.st_mtime_ns, stat.st_size, options], sort_keys=True, default=list)
+    cache_file = CACHE_DIR / f"{hashlib.sha1(key_source.encode()).hexdigest()}.json"
+
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    rng = random.Random(seed)
+    selected = []
+    seen = 0
+    for index, row in enumerate(iter_rows(file_name)):
+        if where and not _matches(row, where):
+            continue
+        if with_marks and not set(with_marks) & set(_row_marks(row, marks_column)):
+            continue
+
+        entry = (index, row)
+        if sample is None or len(selected) < sample:
+            selected.append(entry)
+        else:
+            # Reservoir sampling: every matching row has the same chance to be kept
+            slot = rng.randint(0, seen)
+            if slot < sample:
+                selected[slot] = entry
+        seen += 1
+
+    rows = [row for _, row in sorted(selected, key=lambda entry: entry[0])]
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(rows, f)
+    os.replace(tmp_file, cache_file)
+    log.debug(f"Selected {len(rows)} of {seen} matching rows from {file_name}")
+    return rows
+
+
+def _readable_id(row, id_columns):
+    text = "-".join(str(row.get(column, "")) for column in id_columns)
+    # Keep ids short and free of characters that are awkward on the command line
+    return re.sub(r"[^\w.@-]+", "_", text).strip("_")[:60] or "row"
+
+
+def load_params(file_name, columns, id_columns=None, where=None, with_marks=None,
+                marks_column=None, sample=None, seed=0):
+    """
+    Builds 'pytest.mark.parametrize' values from a data file.
+
+    'columns' are the values passed to the test, in parametrize order.
+    'id_columns' (default: the first column) make up each test id; duplicate
+    ids get a numeric suffix. If 'marks_column' is set, the comma-separated
+    marker names in that column are applied to the row's test. The other
+    options filter/sample rows before they become test items (see select_rows).
+    """
+    id_columns = id_columns or columns[:1]
+    rows = select_rows(file_name, where, with_marks, marks_column, sample, seed)
+
+    params = []
+    used_ids = {}
+    for row in rows:
+        test_id = _readable_id(row, id_columns)
+        used_ids[test_id] = used_ids.get(test_id, 0) + 1
+        if used_ids[test_id] > 1:
+            test_id = f"{test_id}_{used_ids[test_id]}"
+
+        marks = [getattr(pytest.mark, name) for name in _row_marks(row, marks_column)]
+        params.append(pytest.param(*(row[column] for column in columns), id=test_id, marks=marks))
+    return params
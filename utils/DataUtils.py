@@ -1,20 +1,48 @@
-import pandas as pd
-import os
+from utils.DataProvider import iter_rows
+
+# Spellings pandas.read_csv reads as booleans
+_TRUE_VALUES = ("True", "true", "TRUE")
+_FALSE_VALUES = ("False", "false", "FALSE")
+
 
 def get_csv_data(file_name):
     """
     Reads test data from a CSV file in the 'data' directory.
+    Kept for existing callers; new tests should use DataProvider.load_params,
+    which adds readable ids, filtering, sampling and caching.
     """
-    # Get the absolute path to the data directory
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    data_dir = os.path.join(current_dir, "..", "data")
-    file_path = os.path.join(data_dir, file_name)
+    # Stream rows with the built-in 'csv' module and convert them to tuples
+    rows = [tuple(row.values()) for row in iter_rows(file_name)]
+    if not rows:
+        return rows
+    # Typed per column like the pandas.read_csv version this replaced, so
+    # callers still get ints, floats and bools where the column holds them
+    columns = [_convert_column(column) for column in zip(*rows)]
+    return list(zip(*columns))
+
+
+def _convert_column(values):
+    filled = [value for value in values if value != ""]
+    missing = float("nan")
+
+    def convert_all(convert):
+        return [convert(value) if value != "" else missing for value in values]
 
-    df = pd.read_csv(file_path)
+    if not filled:
+        return [missing] * len(values)
+    if all(_parses(int, value) for value in filled):
+        # Like pandas, an integer column with blanks becomes a float column
+        return convert_all(int) if len(filled) == len(values) else convert_all(float)
+    if all(_parses(float, value) for value in filled):
+        return convert_all(float)
+    if all(value in _TRUE_VALUES + _FALSE_VALUES for value in filled):
+        return convert_all(lambda value: value in _TRUE_VALUES)
+    return convert_all(str)
 
-    # Convert dataframe to a list of tuples
-    # 'itertuples' is a fast way to get rows
-    return [tuple(row) for row in df.itertuples(index=False)]
 
-# Note: If pandas is not desired, this can be done
-# with the built-in 'csv' module.
+def _parses(convert, value):
+    try:
+        convert(value)
+    except ValueError:
+        return False
+    return True
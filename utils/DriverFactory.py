@@ -0,0 +1,152 @@
+import logging
+import shutil
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.firefox.service import Service as FirefoxService
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from utils.BasePage import BasePage
+from utils import LaunchProfiles, ResourceProfiles
+
+log = logging.getLogger(__name__)
+
+SUPPORTED_BROWSERS = ("chrome", "firefox")
+
+
+def create_driver(browser_name, is_headless, driver_path=None, resource_profile=None, page_load_strategy="normal",
+                  launch_profile=None, user_data_dir=None):
+    """
+    Launches a new local WebDriver session for the given browser.
+    'driver_path' comes from DriverResolver.resolve_driver_path; when it is
+    None, Selenium Manager locates the driver binary.
+    'resource_profile' is a ResourceProfiles.ResourceProfile whose resources
+    are blocked for the whole session.
+    'page_load_strategy' ('normal', 'eager' or 'none') decides when driver.get
+    and clicks that navigate return; pages then rely on their readiness gates.
+    'launch_profile' is a LaunchProfiles.LaunchProfile (flags, window size,
+    template). Template profiles get a tmpfs copy of the template, deleted on
+    quit, unless an explicit 'user_data_dir' is passed.
+    Raises ValueError for an unsupported browser name.
+    """
+    resource_profile = resource_profile or ResourceProfiles.RESOURCE_PROFILES["none"]
+    launch_profile = launch_profile or LaunchProfiles.LAUNCH_PROFILES["default"]
+    if browser_name not in SUPPORTED_BROWSERS:
+        raise ValueError(f"Browser '{browser_name}' is not supported. Use 'chrome' or 'firefox'.")
+
+    session_dir = None
+    if user_data_dir is None and launch_profile.use_template:
+        user_data_dir = session_dir = LaunchProfiles.session_profile_dir(browser_name, launch_profile)
+
+    try:
+        # --- 1. Initialize the browser specified
+        options = _build_options(
+            browser_name, is_headless, page_load_strategy, launch_profile, resource_profile, user_data_dir
+        )
+        if browser_name == "chrome":
+            service = ChromeService(executable_path=driver_path)
+            driver_instance = webdriver.Chrome(service=service, options=options)
+
+        elif browser_name == "firefox":
+            service = FirefoxService(executable_path=driver_path)
+            driver_instance = webdriver.Firefox(service=service, options=options)
+    except Exception:
+        # A failed launch must not leave its profile copy behind on tmpfs
+        if session_dir is not None:
+            shutil.rmtree(session_dir, ignore_errors=True)
+        raise
+
+    # --- 2. Configure common driver properties
+    _configure_driver(driver_instance, launch_profile, resource_profile)
+    if session_dir is not None:
+        _remove_on_quit(driver_instance, session_dir)
+
+    log.info(
+        f"WebDriver initialized: {browser_name}, headless={is_headless}, "
+        f"page load strategy={page_load_strategy}, launch profile={launch_profile.name}"
+    )
+    return driver_instance
+
+
+def create_remote_driver(command_executor, browser_name, is_headless, resource_profile=None,
+                         page_load_strategy="normal", launch_profile=None):
+    """
+    Starts a WebDriver session on a remote end ('command_executor' is the URL
+    of a Selenium Grid, a grid node or a driver binary listening on a port),
+    with the same options as create_driver. Profile templates only exist on
+    this machine, so a launch profile's template is not used.
+    Raises ValueError for an unsupported browser name.
+    """
+    resource_profile = resource_profile or ResourceProfiles.RESOURCE_PROFILES["none"]
+    launch_profile = launch_profile or LaunchProfiles.LAUNCH_PROFILES["default"]
+    if browser_name not in SUPPORTED_BROWSERS:
+        raise ValueError(f"Browser '{browser_name}' is not supported. Use 'chrome' or 'firefox'.")
+
+    options = _build_options(browser_name, is_headless, page_load_strategy, launch_profile, resource_profile)
+    driver_instance = webdriver.Remote(command_executor=command_executor, options=options)
+    _configure_driver(driver_instance, launch_profile, resource_profile)
+
+    log.info(f"Remote WebDriver initialized on {command_executor}: {browser_name}, headless={is_headless}")
+    return driver_instance
+
+
+def _build_options(browser_name, is_headless, page_load_strategy, launch_profile, resource_profile,
+                   user_data_dir=None):
+    if browser_name == "chrome":
+        chrome_options = ChromeOptions()
+        chrome_options.page_load_strategy = page_load_strategy
+        if is_headless:
+            chrome_options.add_argument("--headless")
+            # Arguments required for running headless in CI/Docker environments
+            chrome_options.add_argument("--no-sandbox")
+            chrome_options.add_argument("--disable-dev-shm-usage")
+            if launch_profile.window_size is None:
+                chrome_options.add_argument("--window-size=1920,1080")
+        LaunchProfiles.apply_to_options(browser_name, chrome_options, launch_profile, user_data_dir)
+        ResourceProfiles.configure_options(browser_name, chrome_options, resource_profile)
+        return chrome_options
+
+    firefox_options = FirefoxOptions()
+    firefox_options.page_load_strategy = page_load_strategy
+    if is_headless:
+        firefox_options.add_argument("--headless")
+    LaunchProfiles.apply_to_options(browser_name, firefox_options, launch_profile, user_data_dir)
+    ResourceProfiles.configure_options(browser_name, firefox_options, resource_profile)
+    return firefox_options
+
+
+def _configure_driver(driver_instance, launch_profile, resource_profile):
+    # No implicit wait: BasePage's wait engine owns every wait, and an implicit
+    # wait would stretch negative checks far past their stated timeout.
+    # The script timeout only has to outlast the engine's longest single wait.
+    driver_instance.set_script_timeout(BasePage.MAX_SCRIPT_WAIT + 30)
+    if launch_profile.window_size is None:
+        driver_instance.maximize_window()
+    ResourceProfiles.apply_profile(driver_instance, resource_profile)
+
+
+def prepare_launch_profile(browser_name, is_headless, driver_path=None, launch_profile=None):
+    """
+    Builds the launch profile's user-data-dir template (once per machine) by
+    launching the browser on it and quitting. Call it before timing launches.
+    """
+    if launch_profile is None or not launch_profile.use_template:
+        return
+    LaunchProfiles.ensure_template(
+        browser_name, launch_profile,
+        lambda path: create_driver(
+            browser_name, is_headless, driver_path, launch_profile=launch_profile, user_data_dir=path
+        ).quit(),
+    )
+
+
+def _remove_on_quit(driver_instance, session_dir):
+    # Wraps quit() on this instance so the session's profile copy goes with it
+    quit_driver = driver_instance.quit
+
+    def quit_and_remove_profile():
+        try:
+            quit_driver()
+        finally:
+            shutil.rmtree(session_dir, ignore_errors=True)
+
+    driver_instance.quit = quit_and_remove_profile
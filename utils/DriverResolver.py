@@ -0,0 +1,244 @@
+import contextlib
+import functools
+import json
+import logging
+import os
+import re
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# Persistent cache of driver binaries, shared by every run on this machine.
+# Air-gapped runners can be seeded by copying this directory over.
+CACHE_DIR = Path(os.environ.get("WEBDRIVER_CACHE_DIR", Path.home() / ".cache" / "web-automation" / "drivers"))
+MANIFEST_FILE = CACHE_DIR / "manifest.json"
+# Held while a process updates the manifest
+MANIFEST_LOCK = CACHE_DIR / "manifest.lock"
+# A lock older than this is left over from a killed process
+STALE_LOCK_SECONDS = 60
+
+BROWSER_BINARIES = {
+    "chrome": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"],
+    "firefox": ["firefox"],
+}
+# macOS: browsers live in app bundles that are not on PATH
+MACOS_BROWSER_BINARIES = {
+    "chrome": [
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        "/Applications/Chromium.app/Contents/MacOS/Chromium",
+    ],
+    "firefox": ["/Applications/Firefox.app/Contents/MacOS/firefox"],
+}
+# Windows: 'chrome --version' opens a browser window instead of printing the
+# version, so the version is read from the registry
+WINDOWS_VERSION_KEYS = {
+    "chrome": [
+        ("HKEY_CURRENT_USER", r"Software\Google\Chrome\BLBeacon", "version"),
+        ("HKEY_LOCAL_MACHINE", r"Software\Google\Chrome\BLBeacon", "version"),
+    ],
+    "firefox": [
+        ("HKEY_LOCAL_MACHINE", r"Software\Mozilla\Mozilla Firefox", "CurrentVersion"),
+        ("HKEY_CURRENT_USER", r"Software\Mozilla\Mozilla Firefox", "CurrentVersion"),
+    ],
+}
+DRIVER_BINARIES = {
+    "chrome": "chromedriver",
+    "firefox": "geckodriver",
+}
+# Environment variables that point at a specific driver binary
+DRIVER_PATH_ENV_VARS = {
+    "chrome": "CHROMEDRIVER_PATH",
+    "firefox": "GECKODRIVER_PATH",
+}
+
+
+def detect_browser_version(browser_name):
+    """
+    Returns the installed browser's major version (e.g. '124'), or None if
+    the browser can't be found or doesn't report a version. Looks on PATH,
+    in the macOS app bundles and, on Windows, in the registry.
+    """
+    if sys.platform == "win32":
+        version = _windows_registry_version(browser_name)
+        if version:
+            return version
+
+    candidates = [shutil.which(binary) for binary in BROWSER_BINARIES.get(browser_name, [])]
+    if sys.platform == "darwin":
+        candidates += MACOS_BROWSER_BINARIES.get(browser_name, [])
+    for path in candidates:
+        if not path or not os.path.isfile(path):
+            continue
+        try:
+            output = subprocess.run(
+                [path, "--version"], capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        version = _major_version(output)
+        if version:
+            return version
+    return None
+
+
+def _major_version(text):
+    match = re.search(r"(\d+)(\.\d+)+", text or "")
+    return match.group(1) if match else None
+
+
+def _windows_registry_version(browser_name):
+    import winreg
+
+    for hive, key_path, value_name in WINDOWS_VERSION_KEYS.get(browser_name, []):
+        try:
+            with winreg.OpenKey(getattr(winreg, hive), key_path) as key:
+                value, _ = winreg.QueryValueEx(key, value_name)
+        except OSError:
+            continue
+        version = _major_version(str(value))
+        if version:
+            return version
+    return None
+
+
+def _load_manifest():
+    try:
+        with open(MANIFEST_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@contextlib.contextmanager
+def _manifest_lock(timeout=30):
+    """
+    Cross-process lock around the manifest's read-modify-write, so parallel
+    workers don't drop each other's entries. Uses an O_EXCL lock file, which
+    works the same on every platform.
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(MANIFEST_LOCK, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(MANIFEST_LOCK) > STALE_LOCK_SECONDS:
+                    os.remove(MANIFEST_LOCK)
+                    continue
+            except OSError:
+                # Released between the two calls
+                continue
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for the driver manifest lock {MANIFEST_LOCK}")
+            time.sleep(0.05)
+    try:
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.remove(MANIFEST_LOCK)
+        except OSError:
+            pass
+
+
+def _save_manifest_entry(key, driver_path):
+    """
+    Adds one entry to the manifest. The update is done under the manifest
+    lock and the file is replaced atomically, because parallel workers may
+    resolve drivers at the same time.
+    """
+    with _manifest_lock():
+        manifest = _load_manifest()
+        manifest[key] = str(driver_path)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, MANIFEST_FILE)
+
+
+def _is_executable(path):
+    return path and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _download_driver(browser_name):
+    """
+    Asks webdriver-manager for a driver (needs network). Returns its path,
+    or None if the download fails.
+    """
+    try:
+        if browser_name == "chrome":
+            from webdriver_manager.chrome import ChromeDriverManager
+            return ChromeDriverManager().install()
+        from webdriver_manager.firefox import GeckoDriverManager
+        return GeckoDriverManager().install()
+    except Exception as e:
+        log.warning(f"webdriver-manager could not provide a {browser_name} driver: {e}")
+        return None
+
+
+def _store_in_cache(browser_name, version, source_path):
+    """
+    Copies a driver binary into the persistent cache and records it in the manifest.
+    """
+    target_dir = CACHE_DIR / f"{browser_name}-{version}"
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / os.path.basename(source_path)
+    # Copy next to the target and rename, so a worker never runs half a binary
+    fd, tmp_path = tempfile.mkstemp(dir=target_dir, prefix=f".{target.name}.")
+    os.close(fd)
+    shutil.copy2(source_path, tmp_path)
+    os.chmod(tmp_path, os.stat(tmp_path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.replace(tmp_path, target)
+    _save_manifest_entry(f"{browser_name}:{version}", target)
+    return str(target)
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_driver_path(browser_name, offline=False):
+    """
+    Finds the driver binary for 'browser_name', once per process.
+
+    Resolution order:
+      1. CHROMEDRIVER_PATH / GECKODRIVER_PATH environment variable
+      2. The on-disk cache entry for the installed browser version
+      3. A webdriver-manager download, which is then cached (skipped when offline)
+      4. A driver binary already on PATH
+    Returns None when nothing is found, in which case Selenium Manager
+    (built into Selenium 4.6+) is left to locate the driver.
+    """
+    env_path = os.environ.get(DRIVER_PATH_ENV_VARS[browser_name])
+    if _is_executable(env_path):
+        log.info(f"Using {browser_name} driver from environment: {env_path}")
+        return env_path
+
+    version = detect_browser_version(browser_name)
+    if version:
+        cached = _load_manifest().get(f"{browser_name}:{version}")
+        if _is_executable(cached):
+            log.info(f"Using cached {browser_name} driver for browser version {version}: {cached}")
+            return cached
+
+        if not offline:
+            downloaded = _download_driver(browser_name)
+            if downloaded:
+                cached = _store_in_cache(browser_name, version, downloaded)
+                log.info(f"Cached {browser_name} driver for browser version {version}: {cached}")
+                return cached
+    else:
+        log.warning(f"Could not detect the installed {browser_name} version; skipping the driver cache.")
+
+    on_path = shutil.which(DRIVER_BINARIES[browser_name])
+    if on_path:
+        log.info(f"Using {browser_name} driver found on PATH: {on_path}")
+        return on_path
+
+    log.info(f"No {browser_name} driver found; falling back to Selenium Manager.")
+    return None
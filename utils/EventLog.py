@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import queue
+import threading
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else on a record came from 'extra'
+_STANDARD_ATTRIBUTES = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+
+class _ContextFilter(logging.Filter):
+    # Runs in the logging thread, so the record carries the test running there
+    def __init__(self, event_log):
+        super().__init__()
+        self.event_log = event_log
+
+    def filter(self, record):
+        record.test_id = self.event_log.current_test
+        record.worker_id = self.event_log.worker_id
+        return True
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Puts records on the queue as they are. The stock QueueHandler formats
+    the message in the logging thread; here that happens in the writer.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    One compact JSON object per record: time, level, logger, test and
+    worker id, the message and any 'extra' fields (e.g. event, locator).
+    """
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "test": getattr(record, "test_id", None),
+            "worker": getattr(record, "worker_id", None),
+            "msg": record.getMessage(),
+        }
+        for name, value in record.__dict__.items():
+            if name not in _STANDARD_ATTRIBUTES and name not in ("test_id", "worker_id"):
+                entry[name] = value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, separators=(",", ":"))
+
+
+class _CountingHandler(logging.Handler):
+    # Tallies records for the run-end summary (on the writer thread)
+    def __init__(self):
+        super().__init__()
+        self.levels = Counter()
+        self.events = Counter()
+        self.tests = Counter()
+
+    def emit(self, record):
+        self.levels[record.levelname] += 1
+        self.events[getattr(record, "event", None) or "other"] += 1
+        if record.test_id is not None:
+            self.tests[record.test_id] += 1
+
+
+class EventLog:
+    """
+    Structured, buffered logging for a test run. While started, every record
+    at 'level' or above from the root logger is put on a queue without being
+    formatted; a background thread writes it to 'path' as JSONL and counts it
+    for the run-end summary. 'current_test' is stamped on each record.
+    """
+
+    def __init__(self, path, level=logging.INFO, worker_id=None):
+        self.path = path
+        self.level = level
+        self.worker_id = worker_id
+        self.current_test = None
+        self.counts = _CountingHandler()
+        self._queue = queue.SimpleQueue()
+        self._handler = _DeferredQueueHandler(self._queue)
+        self._handler.addFilter(_ContextFilter(self))
+        self._listener = None
+        self._file_handler = None
+        self._previous_level = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file_handler = logging.FileHandler(self.path, mode="w", encoding="utf-8", delay=True)
+            self._file_handler.setFormatter(JsonLinesFormatter())
+            self._listener = QueueListener(self._queue, self._file_handler, self.counts)
+            self._listener.start()
+
+            root = logging.getLogger()
+            self._handler.setLevel(self.level)
+            root.addHandler(self._handler)
+            self._previous_level = root.level
+            root.setLevel(min(root.level, self.level))
+
+    def stop(self):
+        """
+        Writes out everything still queued and stops the writer thread.
+        """
+        with self._lock:
+            if self._listener is None:
+                return
+            root = logging.getLogger()
+            root.removeHandler(self._handler)
+            root.setLevel(self._previous_level)
+            self._listener.stop()
+            self._file_handler.close()
+            self._listener = None
+
+    def summary_lines(self, top=5):
+        counts = self.counts
+        total = sum(counts.levels.values())
+        lines = [
+            f"{total} log record(s) written to {self.path}: "
+            + ", ".join(f"{count} {level}" for level, count in counts.levels.most_common())
+        ]
+        if counts.events:
+            lines.append("Events: " + ", ".join(f"{event}={count}" for event, count in counts.events.most_common()))
+        for test_id, count in counts.tests.most_common(top):
+            lines.append(f"  {count:5d} record(s)  {test_id}")
+        return lines
@@ -0,0 +1,304 @@
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from selenium.common.exceptions import WebDriverException
+from utils.DriverResolver import DRIVER_BINARIES
+
+log = logging.getLogger(__name__)
+
+# Seconds a node may take to answer /status
+STATUS_TIMEOUT = 5
+# Seconds a node that failed to start a session is tried after the others
+FAILURE_COOLDOWN = 30
+
+
+class GridNode:
+    """
+    A remote end that can start WebDriver sessions: a Selenium Grid hub, a
+    grid node, or a driver binary (chromedriver/geckodriver) on a port.
+    'max_sessions' is used when the node's /status doesn't list its slots;
+    'share' is how many of those this process may use (see split_slots),
+    None meaning all of them.
+    """
+
+    def __init__(self, url, max_sessions=1, share=None):
+        self.url = url.rstrip("/")
+        self.max_sessions = max_sessions
+        self.share = share
+        self.active = 0
+        # --- Statistics reported at the end of the run
+        self.sessions = 0
+        self.failures = 0
+        self.peak = 0
+        self.busy_seconds = 0.0
+        self.failed_at = None
+
+    def free_slots(self):
+        """
+        Free session slots: from the node's /status when it lists them
+        (Selenium Grid 4, counting every process's sessions), else from this
+        process's share of 'max_sessions' and the sessions it started there.
+        Returns 0 if the node doesn't answer or isn't ready.
+        """
+        try:
+            with urllib.request.urlopen(f"{self.url}/status", timeout=STATUS_TIMEOUT) as response:
+                status = json.load(response).get("value", {})
+        except (OSError, ValueError) as e:
+            log.debug(f"Grid node {self.url} did not answer /status: {e}")
+            return 0
+        if not status.get("ready", False) and self.active == 0:
+            return 0
+
+        slots = [
+            slot
+            for node in status.get("nodes", [])
+            if node.get("availability", "UP") == "UP"
+            for slot in node.get("slots", [])
+        ]
+        if slots:
+            self.max_sessions = len(slots)
+            return sum(1 for slot in slots if not slot.get("session"))
+        capacity = self.max_sessions if self.share is None else self.share
+        return max(0, capacity - self.active)
+
+    def stats(self):
+        return {
+            "url": self.url,
+            "max_sessions": self.max_sessions,
+            "sessions": self.sessions,
+            "failures": self.failures,
+            "peak": self.peak,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+def split_slots(nodes, worker_index, num_workers):
+    """
+    Gives a parallel worker its share of each node's 'max_sessions', so the
+    workers together never start more sessions than a node has slots. The
+    remainders go to different workers for different nodes.
+    """
+    for index, node in enumerate(nodes):
+        share, remainder = divmod(node.max_sessions, num_workers)
+        node.share = share + (1 if (worker_index - index) % num_workers < remainder else 0)
+
+class GridDispatcher:
+    """
+    Starts each new session on the node with the most free slots. A node
+    that fails to start a session is skipped and the next one is tried
+    (it is tried last for FAILURE_COOLDOWN seconds); launch() gives up
+    once every node has failed 'retries' + 1 rounds.
+    """
+
+    def __init__(self, nodes, start_session, retries=1, wait_for_slot=60):
+        """
+        'start_session(url)' starts a session on the remote end at 'url' and
+        returns the driver (e.g. DriverFactory.create_remote_driver).
+        """
+        self.nodes = nodes
+        self._start_session = start_session
+        self.retries = retries
+        self.wait_for_slot = wait_for_slot
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    def launch(self):
+        deadline = time.monotonic() + self.wait_for_slot
+        last_error = None
+        for attempt in range(self.retries + 1):
+            candidates = self._by_free_slots()
+            while not candidates and time.monotonic() < deadline:
+                # Every node is busy: sessions end as other tests finish
+                time.sleep(0.5)
+                candidates = self._by_free_slots()
+
+            for node in candidates:
+                with self._lock:
+                    node.active += 1
+                    node.peak = max(node.peak, node.active)
+                try:
+                    driver = self._start_session(node.url)
+                except (WebDriverException, OSError) as e:
+                    with self._lock:
+                        node.active -= 1
+                        node.failures += 1
+                        node.failed_at = time.monotonic()
+                    last_error = e
+                    log.warning(f"Could not start a session on {node.url}, trying another node: {e}")
+                    continue
+                with self._lock:
+                    node.sessions += 1
+                self._release_on_quit(driver, node)
+                log.info(f"Session started on grid node {node.url} ({node.active} active).")
+                return driver
+            log.warning(f"No grid node could start a session (round {attempt + 1}/{self.retries + 1}).")
+
+        raise WebDriverException(f"No grid node could start a session; last error: {last_error}")
+
+    def _by_free_slots(self):
+        # Nodes that failed recently go last, then the most free slots first
+        now = time.monotonic()
+        ranked = sorted(
+            ((node.failed_at is not None and now - node.failed_at < FAILURE_COOLDOWN, -free, node)
+             for node, free in ((node, node.free_slots()) for node in self.nodes)),
+            key=lambda entry: entry[:2],
+        )
+        return [node for _, neg_free, node in ranked if neg_free < 0]
+
+    def _release_on_quit(self, driver, node):
+        # Wraps quit() on this instance so the node's slot is given back
+        quit_driver = driver.quit
+        started = time.monotonic()
+
+        def quit_and_release():
+            try:
+                quit_driver()
+            finally:
+                with self._lock:
+                    node.active -= 1
+                    node.busy_seconds += time.monotonic() - started
+
+        driver.quit = quit_and_release
+
+    def utilization_lines(self):
+        return format_utilization([node.stats() for node in self.nodes], time.monotonic() - self._started)
+
+    def write_stats(self, path):
+        """
+        Writes the per-node statistics, so a parallel run's controller can
+        report the utilization of every worker together (see merge_node_stats).
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"elapsed": time.monotonic() - self._started,
+                       "nodes": [node.stats() for node in self.nodes]}, f)
+
+
+def merge_node_stats(paths):
+    """
+    Combines the files written by write_stats() into (node stats, elapsed).
+    Sessions, failures, busy time and peaks are summed per node URL, so the
+    peak is an upper bound of the concurrent sessions. Missing or
+    unreadable files are skipped.
+    """
+    merged = {}
+    elapsed = 0.0
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            continue
+        elapsed = max(elapsed, stats["elapsed"])
+        for node in stats["nodes"]:
+            total = merged.setdefault(node["url"], dict(node, sessions=0, failures=0, peak=0, busy_seconds=0.0))
+            total["max_sessions"] = max(total["max_sessions"], node["max_sessions"])
+            for key in ("sessions", "failures", "peak", "busy_seconds"):
+                total[key] += node[key]
+    return list(merged.values()), elapsed
+
+
+def format_utilization(nodes, elapsed):
+    """
+    One line per node's stats(): sessions, failed starts, peak concurrency
+    and the share of its slot time spent in sessions over 'elapsed' seconds.
+    """
+    lines = []
+    for node in nodes:
+        capacity = node["max_sessions"] * elapsed
+        utilization = node["busy_seconds"] / capacity if capacity else 0.0
+        lines.append(
+            f"Grid node {node['url']}: {node['sessions']} session(s), {node['failures']} failed start(s), "
+            f"peak {node['peak']}/{node['max_sessions']} concurrent, "
+            f"{utilization:.0%} utilized over {elapsed:.0f}s"
+        )
+    return lines
+
+
+def parse_node_urls(value, default_max_sessions=1):
+    """
+    Parses '--grid-url' values: comma-separated URLs, each optionally
+    followed by '=N' for its number of session slots.
+    """
+    nodes = []
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        url, _, slots = entry.partition("=")
+        nodes.append(GridNode(url, int(slots) if slots else default_max_sessions))
+    return nodes
+
+
+class LocalNodes:
+    """
+    Driver binaries started on free local ports to act as grid nodes, so the
+    grid mode can run without any external service. Used as a context
+    manager; the processes are stopped on exit.
+    """
+
+    def __init__(self, browser_name, count, driver_path=None, max_sessions=None):
+        self.browser_name = browser_name
+        self.count = count
+        self.driver_path = driver_path or shutil.which(DRIVER_BINARIES[browser_name])
+        # geckodriver serves one session at a time
+        self.max_sessions = max_sessions or (1 if browser_name == "firefox" else 4)
+        self.processes = []
+        self.nodes = []
+
+    def start(self):
+        if self.driver_path is None:
+            raise RuntimeError(f"No {DRIVER_BINARIES[self.browser_name]} found to start local grid nodes.")
+        try:
+            for _ in range(self.count):
+                port = _free_port()
+                process = subprocess.Popen(
+                    [self.driver_path, f"--port={port}"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+                self.processes.append(process)
+                _wait_until_listening(port, process)
+                self.nodes.append(GridNode(f"http://127.0.0.1:{port}", self.max_sessions))
+        except Exception:
+            self.stop()
+            raise
+        log.info(f"Started {self.count} local {self.browser_name} node(s): {[node.url for node in self.nodes]}")
+        return self.nodes
+
+    def stop(self):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_listening(port, process, timeout=15):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Local grid node on port {port} exited with code {process.returncode}.")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/status", timeout=1):
+                return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.1)
+    raise RuntimeError(f"Local grid node on port {port} did not start within {timeout}s.")
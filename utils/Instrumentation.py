@@ -0,0 +1,172 @@
+import contextlib
+import html
+import json
+import logging
+import threading
+import time
+from selenium.webdriver.remote.command import Command
+
+log = logging.getLogger(__name__)
+
+PHASES = ("setup", "navigation", "wait", "interaction", "query", "teardown")
+
+# Phase of a WebDriver command when no explicit phase is active.
+# Anything not listed here (find, get text, title, ...) counts as 'query'.
+COMMAND_PHASES = {
+    Command.GET: "navigation",
+    Command.GO_BACK: "navigation",
+    Command.GO_FORWARD: "navigation",
+    Command.REFRESH: "navigation",
+    Command.CLICK_ELEMENT: "interaction",
+    Command.SEND_KEYS_TO_ELEMENT: "interaction",
+    Command.CLEAR_ELEMENT: "interaction",
+    Command.W3C_ACTIONS: "interaction",
+    Command.W3C_EXECUTE_SCRIPT_ASYNC: "wait",
+    Command.QUIT: "teardown",
+}
+
+# Returned by phase() when the driver isn't instrumented, so the disabled
+# path costs one attribute lookup
+_NO_PHASE = contextlib.nullcontext()
+
+
+def phase(driver, name):
+    """
+    Attributes every command sent through 'driver' inside the 'with' block to
+    phase 'name'. Does nothing when the driver isn't instrumented.
+    """
+    recorder = getattr(driver, "_command_recorder", None)
+    if recorder is None:
+        return _NO_PHASE
+    return recorder.phase(name)
+
+
+def count(driver, name):
+    """
+    Counts one occurrence of event 'name' (e.g. an element cache hit) for the
+    current test. Does nothing when the driver isn't instrumented.
+    """
+    recorder = getattr(driver, "_command_recorder", None)
+    if recorder is not None:
+        recorder.count(name)
+
+
+class CommandRecorder:
+    """
+    Records every WebDriver command (name, phase, duration) sent by the
+    drivers it is attached to, grouped by the test that was running.
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.counters = {}
+        self._current_test = "session"
+        self._phases = threading.local()
+        self._lock = threading.Lock()
+
+    # --- Wiring ---
+
+    def attach(self, driver):
+        """
+        Wraps driver.execute, the single entry point of every WebDriver command.
+        """
+        execute = driver.execute
+
+        def instrumented_execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                self.add(driver_command, self._phase_for(driver_command), time.perf_counter() - start)
+
+        driver.execute = instrumented_execute
+        driver._command_recorder = self
+        return driver
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        stack = self._phase_stack()
+        stack.append(name)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def start_test(self, test_id):
+        self._current_test = test_id
+
+    def end_test(self):
+        self._current_test = "session"
+
+    # --- Recording ---
+
+    def add(self, name, phase_name, seconds):
+        """
+        Adds one command (or a synthetic span such as a browser launch).
+        """
+        with self._lock:
+            self.records.setdefault(self._current_test, []).append((name, phase_name, seconds))
+
+    def count(self, name):
+        with self._lock:
+            counters = self.counters.setdefault(self._current_test, {})
+            counters[name] = counters.get(name, 0) + 1
+
+    def _phase_stack(self):
+        stack = getattr(self._phases, "stack", None)
+        if stack is None:
+            stack = self._phases.stack = []
+        return stack
+
+    def _phase_for(self, driver_command):
+        stack = self._phase_stack()
+        if stack:
+            return stack[-1]
+        return COMMAND_PHASES.get(driver_command, "query")
+
+    # --- Reporting ---
+
+    def test_summary(self, test_id):
+        """
+        Returns {phase: {"count": n, "seconds": total}} for one test.
+        """
+        summary = {name: {"count": 0, "seconds": 0.0} for name in PHASES}
+        for _, phase_name, seconds in self.records.get(test_id, []):
+            entry = summary.setdefault(phase_name, {"count": 0, "seconds": 0.0})
+            entry["count"] += 1
+            entry["seconds"] += seconds
+        return summary
+
+    def summary_html(self, test_id):
+        summary = self.test_summary(test_id)
+        rows = "".join(
+            f"<tr><td>{html.escape(name)}</td><td>{entry['count']}</td><td>{entry['seconds'] * 1000:.0f} ms</td></tr>"
+            for name, entry in summary.items() if entry["count"]
+        )
+        counters = "".join(
+            f"<tr><td>{html.escape(name)}</td><td>{value}</td></tr>"
+            for name, value in sorted(self.counters.get(test_id, {}).items())
+        )
+        if counters:
+            counters = "<table><tr><th>Event</th><th>Count</th></tr>" + counters + "</table>"
+        return (
+            "<div><p><b>WebDriver commands</b></p>"
+            "<table><tr><th>Phase</th><th>Commands</th><th>Time</th></tr>" + rows + "</table>"
+            + counters + "</div>"
+        )
+
+    def write_json(self, path):
+        data = {
+            test_id: {
+                "phases": self.test_summary(test_id),
+                "counters": self.counters.get(test_id, {}),
+                "commands": [
+                    {"command": name, "phase": phase_name, "ms": round(seconds * 1000, 2)}
+                    for name, phase_name, seconds in records
+                ],
+            }
+            for test_id, records in self.records.items()
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        log.info(f"WebDriver command timings written to {path}")
@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+
+log = logging.getLogger(__name__)
+
+# Initialized user-data-dir templates, one per browser and launch profile
+TEMPLATE_DIR = Path(os.environ.get(
+    "WEBDRIVER_PROFILE_DIR", Path.home() / ".cache" / "web-automation" / "profiles"
+))
+# Per-session copies go to memory-backed storage when the host has it
+TMPFS_DIR = "/dev/shm"
+
+# Background services a test browser never needs: extensions, sync, updates,
+# metrics, first-run UI and throttling of background tabs
+CHROME_PERF_ARGS = [
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-extensions",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-client-side-phishing-detection",
+    "--disable-hang-monitor",
+    "--disable-popup-blocking",
+    "--disable-prompt-on-repost",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-features=Translate,OptimizationHints,MediaRouter",
+    "--metrics-recording-only",
+    "--password-store=basic",
+    "--use-mock-keychain",
+]
+
+FIREFOX_PERF_PREFS = {
+    "browser.shell.checkDefaultBrowser": False,
+    "browser.startup.page": 0,
+    "browser.startup.homepage_override.mstone": "ignore",
+    "app.update.auto": False,
+    "app.update.enabled": False,
+    "extensions.update.enabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "toolkit.telemetry.enabled": False,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "network.prefetch-next": False,
+}
+
+# Cache and lock files that must not be copied from a template
+_TEMPLATE_IGNORE = shutil.ignore_patterns(
+    "Cache", "Code Cache", "GPUCache", "ShaderCache", "GrShaderCache", "Crashpad",
+    "Singleton*", "lock", "parent.lock", ".parentlock", "cache2", "startupCache",
+)
+_template_lock = threading.Lock()
+
+
+class LaunchProfile:
+    """
+    How a browser is launched: extra Chrome arguments, Firefox preferences,
+    the window size (None means maximize after launch) and whether each
+    session starts from a copy of an initialized user-data-dir template.
+    """
+
+    def __init__(self, name, chrome_args=(), firefox_prefs=None, window_size=None, use_template=False):
+        self.name = name
+        self.chrome_args = list(chrome_args)
+        self.firefox_prefs = dict(firefox_prefs or {})
+        self.window_size = window_size
+        self.use_template = use_template
+
+
+LAUNCH_PROFILES = {
+    # A fresh on-disk profile and a maximize round trip after launch
+    "default": LaunchProfile("default"),
+    # Performance flags and a window size set at launch
+    "tuned": LaunchProfile("tuned", CHROME_PERF_ARGS, FIREFOX_PERF_PREFS, window_size=(1920, 1080)),
+    # 'tuned', starting from a copy of an initialized profile on tmpfs
+    "fast": LaunchProfile("fast", CHROME_PERF_ARGS, FIREFOX_PERF_PREFS, window_size=(1920, 1080), use_template=True),
+}
+
+
+def apply_to_options(browser_name, options, profile, user_data_dir=None):
+    """
+    Adds the profile's arguments/preferences, window size and user-data-dir
+    to ChromeOptions or FirefoxOptions.
+    """
+    if browser_name == "chrome":
+        for argument in profile.chrome_args:
+            options.add_argument(argument)
+        if profile.window_size:
+            options.add_argument(f"--window-size={profile.window_size[0]},{profile.window_size[1]}")
+        if user_data_dir:
+            options.add_argument(f"--user-data-dir={user_data_dir}")
+        return
+
+    for name, value in profile.firefox_prefs.items():
+        options.set_preference(name, value)
+    if profile.window_size:
+        options.add_argument(f"--width={profile.window_size[0]}")
+        options.add_argument(f"--height={profile.window_size[1]}")
+    if user_data_dir:
+        options.add_argument("-profile")
+        options.add_argument(str(user_data_dir))
+
+
+def template_path(browser_name, profile):
+    return TEMPLATE_DIR / f"{browser_name}-{profile.name}"
+
+
+def ensure_template(browser_name, profile, initialize):
+    """
+    Creates the profile's user-data-dir template if it doesn't exist yet.
+    'initialize(path)' launches the browser on 'path' and quits it, which
+    leaves an initialized profile behind. Safe across threads and processes:
+    the template is built in a staging directory and renamed into place.
+    """
+    target = template_path(browser_name, profile)
+    with _template_lock:
+        if target.is_dir():
+            return target
+        TEMPLATE_DIR.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f"{target.name}.", dir=TEMPLATE_DIR))
+        log.info(f"Initializing the '{profile.name}' {browser_name} profile template in {target}")
+        try:
+            initialize(staging)
+            os.rename(staging, target)
+        except OSError as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            if target.is_dir():
+                log.debug(f"Another worker finished the {target.name} profile template first.")
+            else:
+                # Sessions then start from an empty profile
+                log.warning(f"Could not create the {target.name} profile template in {target}: {e}")
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+    return target
+
+
+def session_profile_dir(browser_name, profile):
+    """
+    Copies the profile's template (if built) into a new directory on tmpfs
+    and returns its path. The caller removes it when the session ends.
+    """
+    root = TMPFS_DIR if os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK) else None
+    session_dir = tempfile.mkdtemp(prefix=f"webdriver-{browser_name}-{profile.name}-", dir=root)
+    template = template_path(browser_name, profile)
+    if template.is_dir():
+        shutil.copytree(template, session_dir, ignore=_TEMPLATE_IGNORE, dirs_exist_ok=True)
+    return session_dir
+
+
+class LaunchTimings:
+    """
+    Cold-launch durations per browser/profile for this run, appended to a
+    history file so profiles can be compared across runs.
+    """
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, browser_name, profile_name, seconds):
+        with self._lock:
+            self.samples.setdefault(f"{browser_name}/{profile_name}", []).append(seconds)
+
+    def append_history(self, path):
+        history = load_launch_history(path)
+        timestamp = datetime.now().isoformat(timespec="seconds")
+        for key, values in self.samples.items():
+            history.extend({"timestamp": timestamp, "profile": key, "seconds": round(v, 3)} for v in values)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=2)
+
+    def summary_lines(self, history=()):
+        """
+        One line per profile used in this run, next to the median of every
+        profile recorded in 'history' for comparison.
+        """
+        lines = []
+        previous = {}
+        for entry in history:
+            previous.setdefault(entry["profile"], []).append(entry["seconds"])
+        for key, values in sorted(self.samples.items()):
+            lines.append(f"Cold launch {key}: median {median(values):.2f}s over {len(values)} launch(es) this run")
+        for key, values in sorted(previous.items()):
+            lines.append(f"  history {key}: median {median(values):.2f}s over {len(values)} launch(es)")
+        return lines
+
+
+def load_launch_history(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
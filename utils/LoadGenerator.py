@@ -0,0 +1,248 @@
+import argparse
+import contextlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+from pages import LoginPage, InventoryPage
+from utils.Benchmark import percentile
+from utils.DriverFactory import create_driver
+from utils.DriverResolver import resolve_driver_path
+from utils.SessionPool import SessionPool
+from utils.StandInServer import StandInServer
+
+log = logging.getLogger(__name__)
+
+LOAD_PERCENTILES = (50, 90, 95, 99)
+
+
+# --- Scripted flows ---
+# A flow runs one iteration for one virtual user. 'step(name)' times a step;
+# 'think()' pauses like a user would between steps (not counted in any step).
+
+def login_flow(driver, base_url, step, think, user="standard_user", password="secret_sauce"):
+    login_page = LoginPage(driver)
+    with step("login.navigate_to_login_page"):
+        login_page.navigate_to_login_page(base_url)
+    think()
+    with step("login.login"):
+        login_page.login(user, password)
+        if not InventoryPage(driver).is_inventory_page_displayed():
+            raise AssertionError(f"Login as '{user}' did not reach the inventory page.")
+
+
+def checkout_flow(driver, base_url, step, think):
+    """
+    The steps of test_end_to_end_checkout, from the login form to the
+    order confirmation.
+    """
+    login_flow(driver, base_url, step, think)
+    think()
+    inventory_page = InventoryPage(driver)
+    with step("inventory.add_backpack_to_cart"):
+        inventory_page.add_backpack_to_cart()
+    think()
+    with step("checkout.go_to_cart"):
+        cart_page = inventory_page.go_to_cart()
+    think()
+    with step("checkout.proceed_to_checkout"):
+        checkout_info_page = cart_page.proceed_to_checkout()
+    think()
+    with step("checkout.fill_shipping_info"):
+        checkout_overview_page = checkout_info_page.fill_shipping_info("Test", "User", "12345")
+    think()
+    with step("checkout.finish_checkout"):
+        checkout_complete_page = checkout_overview_page.finish_checkout()
+        message = checkout_complete_page.get_complete_message()
+    if message != "Thank you for your order!":
+        raise AssertionError(f"Checkout did not complete: '{message}'")
+
+
+FLOWS = {
+    "login": login_flow,
+    "checkout": checkout_flow,
+}
+
+
+class LoadGenerator:
+    """
+    Runs 'users' virtual users through 'flow' for 'duration' seconds.
+
+    Users start evenly spread over 'ramp_up' seconds and pause a random
+    0.5x-1.5x 'think_time' between steps. At most 'max_browsers' browsers
+    exist at once; a user waits for a free one before each iteration, and
+    browsers are reset and reused between iterations (see SessionPool).
+    """
+
+    def __init__(self, flow, base_url, launcher, users=5, ramp_up=0.0, think_time=0.0,
+                 duration=60.0, max_browsers=None, seed=0):
+        self.flow = flow
+        self.base_url = base_url
+        self.users = users
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.duration = duration
+        self.max_browsers = max_browsers or users
+        self.seed = seed
+        self.pool = SessionPool(launcher, max_uses=100)
+        self.samples = {}
+        self.iterations = 0
+        self.errors = []
+        self.elapsed = 0.0
+        self._browsers = threading.BoundedSemaphore(self.max_browsers)
+        self._lock = threading.Lock()
+
+    def run(self):
+        """
+        Runs the load and returns the report (see report()).
+        """
+        started = time.monotonic()
+        deadline = started + self.duration
+        threads = [
+            threading.Thread(target=self._virtual_user, args=(index, started, deadline), name=f"vu-{index}")
+            for index in range(self.users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.monotonic() - started
+        self.pool.close()
+        return self.report()
+
+    def _virtual_user(self, index, started, deadline):
+        rng = random.Random(self.seed + index)
+        delay = self.ramp_up * index / self.users
+        time.sleep(max(0.0, started + delay - time.monotonic()))
+
+        def think():
+            if self.think_time:
+                time.sleep(self.think_time * rng.uniform(0.5, 1.5))
+
+        while time.monotonic() < deadline:
+            with self._browsers:
+                session = None
+                iteration = {}
+
+                @contextlib.contextmanager
+                def step(name):
+                    step_started = time.perf_counter()
+                    yield
+                    iteration[name] = time.perf_counter() - step_started
+
+                try:
+                    # A failed browser launch counts as a failed iteration
+                    session = self.pool.acquire()
+                    iteration_started = time.perf_counter()
+                    self.flow(session.driver, self.base_url, step, think)
+                except Exception as e:
+                    what = "iteration failed" if session is not None else "could not get a browser"
+                    log.warning(f"Virtual user {index}: {what}: {e}")
+                    with self._lock:
+                        self.errors.append(f"vu-{index}: {type(e).__name__}: {e}")
+                else:
+                    iteration["iteration"] = time.perf_counter() - iteration_started
+                    with self._lock:
+                        self.iterations += 1
+                        for name, seconds in iteration.items():
+                            self.samples.setdefault(name, []).append(seconds)
+                finally:
+                    if session is not None:
+                        self.pool.release(session)
+            if session is None:
+                # Don't retry the launch in a tight loop
+                think()
+
+    def report(self):
+        """
+        Returns throughput, error count and per-step latency percentiles.
+        """
+        return {
+            "users": self.users,
+            "browsers": self.max_browsers,
+            "elapsed": self.elapsed,
+            "iterations": self.iterations,
+            "errors": len(self.errors),
+            "throughput_per_minute": self.iterations / self.elapsed * 60 if self.elapsed else 0.0,
+            "steps": {
+                name: dict(
+                    n=len(values),
+                    **{f"p{pct}": percentile(values, pct) for pct in LOAD_PERCENTILES},
+                    max=max(values),
+                )
+                for name, values in self.samples.items()
+            },
+        }
+
+
+def format_report(report):
+    lines = [
+        f"{report['users']} user(s) on {report['browsers']} browser(s) for {report['elapsed']:.1f}s: "
+        f"{report['iterations']} iteration(s), {report['errors']} error(s), "
+        f"{report['throughput_per_minute']:.1f} iteration(s)/min",
+        f"{'step':<40} {'n':>5}" + "".join(f" {f'p{pct}':>10}" for pct in LOAD_PERCENTILES) + f" {'max':>10}",
+    ]
+    for name, stats in sorted(report["steps"].items()):
+        lines.append(
+            f"{name:<40} {stats['n']:>5}"
+            + "".join(f" {stats[f'p{pct}'] * 1000:>8.1f}ms" for pct in LOAD_PERCENTILES)
+            + f" {stats['max'] * 1000:>8.1f}ms"
+        )
+    return lines
+
+
+def main():
+    """
+    Runs a load test from the command line, e.g. against the local stand-in:
+        python -m utils.LoadGenerator --users 10 --browsers 4 --ramp-up 20 --duration 120
+    """
+    parser = argparse.ArgumentParser(description="Run virtual users through a page-object flow.")
+    parser.add_argument("--flow", choices=sorted(FLOWS), default="checkout")
+    parser.add_argument("--users", type=int, default=5, help="Concurrent virtual users")
+    parser.add_argument("--browsers", type=int, default=None, help="Max headless browsers (default: one per user)")
+    parser.add_argument("--ramp-up", type=float, default=0, help="Seconds over which users start")
+    parser.add_argument("--think-time", type=float, default=0, help="Mean pause between steps in seconds")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to generate load")
+    parser.add_argument("--browser", choices=("chrome", "firefox"), default="chrome")
+    parser.add_argument("--base-url", default="local", help="Site under test, or 'local' for the stand-in")
+    parser.add_argument("--standin-latency", type=float, default=0, help="Stand-in latency per request in ms")
+    parser.add_argument("--standin-jitter", type=float, default=0, help="Stand-in jitter per request in ms")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for think times and stand-in jitter")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(threadName)s] %(levelname)s %(message)s")
+    driver_path = resolve_driver_path(args.browser)
+
+    def launch():
+        return create_driver(args.browser, True, driver_path, page_load_strategy="eager")
+
+    with contextlib.ExitStack() as stack:
+        base_url = args.base_url
+        if base_url == "local":
+            server = stack.enter_context(StandInServer(
+                latency=args.standin_latency / 1000, jitter=args.standin_jitter / 1000, seed=args.seed
+            ))
+            base_url = server.base_url
+
+        generator = LoadGenerator(
+            FLOWS[args.flow], base_url, launch, users=args.users, ramp_up=args.ramp_up,
+            think_time=args.think_time, duration=args.duration, max_browsers=args.browsers, seed=args.seed,
+        )
+        report = generator.run()
+
+    for line in format_report(report):
+        print(line)
+    for error in generator.errors[:10]:
+        print(f"  error: {error}")
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+import argparse
+import contextlib
+import functools
+import json
+import logging
+import os
+from pathlib import Path
+from selenium.webdriver.common.by import By
+
+log = logging.getLogger(__name__)
+
+LOCATOR_STRATEGIES = frozenset(
+    value for name, value in vars(By).items() if not name.startswith("_") and isinstance(value, str)
+)
+
+# Finds with a median above this many ms are flagged as slow
+SLOW_FIND_MS = 0.5
+PROFILE_ROUNDS = 50
+
+# Times 'rounds' finds of every locator inside the browser, so the numbers
+# are the selector's own cost without the WebDriver round trip
+PROFILE_JS = """
+var locators = arguments[0], rounds = arguments[1], result = {};
+Object.keys(locators).forEach(function (name) {
+    var by = locators[name][0], value = locators[name][1], found = [], times = [];
+    for (var i = 0; i < rounds; i++) {
+        var started = performance.now();
+        found = findAll(by, value);
+        times.push(performance.now() - started);
+    }
+    times.sort(function (a, b) { return a - b; });
+    result[name] = {count: found.length, visible: found.filter(isVisible).length, ms: times[times.length >> 1]};
+});
+return result;
+"""
+
+# The fastest native call for each strategy's first match; the others fall
+# back to the wait engine's findAll
+_FIRST_MATCH_JS = {
+    By.ID: "document.getElementById({value})",
+    By.CLASS_NAME: "document.getElementsByClassName({value})[0] || null",
+    By.CSS_SELECTOR: "document.querySelector({value})",
+    By.NAME: "document.getElementsByName({value})[0] || null",
+    By.TAG_NAME: "document.getElementsByTagName({value})[0] || null",
+    By.XPATH: "document.evaluate({value}, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null)"
+              ".singleNodeValue",
+}
+
+
+def is_locator(value):
+    return (
+        isinstance(value, tuple) and len(value) == 2
+        and value[0] in LOCATOR_STRATEGIES and isinstance(value[1], str)
+    )
+
+
+def page_locators(page_cls):
+    """
+    Returns {attribute name: locator} for every locator class attribute of a
+    page object, inherited ones included.
+    """
+    return {
+        name: getattr(page_cls, name)
+        for name in dir(page_cls)
+        if name.isupper() and is_locator(getattr(page_cls, name))
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def compile_lookup_script(page_cls):
+    """
+    A JavaScript function expression that returns {attribute name: first
+    matching element or null} for every locator of 'page_cls' in one pass.
+    Each locator is compiled to a direct DOM call; only the link-text
+    strategies need the wait engine's findAll helper in scope.
+    """
+    lines = []
+    for name, (by, value) in sorted(page_locators(page_cls).items()):
+        template = _FIRST_MATCH_JS.get(by, "findAll({by}, {value})[0] || null")
+        lines.append(f"{json.dumps(name)}: {template.format(by=json.dumps(by), value=json.dumps(value))}")
+    return "function () { return {" + ", ".join(lines) + "}; }"
+
+
+def discover_pages(base_cls):
+    """
+    Every subclass of 'base_cls' (at any depth) that defines locators.
+    """
+    found, pending = [], list(base_cls.__subclasses__())
+    while pending:
+        page_cls = pending.pop(0)
+        pending.extend(page_cls.__subclasses__())
+        if page_locators(page_cls):
+            found.append(page_cls)
+    return found
+
+
+class LocatorRegistry:
+    """
+    Index of the locators of every page object: which page declares what,
+    and which locator tuples are shared by several pages.
+    """
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.locators = {page_cls: page_locators(page_cls) for page_cls in self.pages}
+
+    @classmethod
+    def from_base(cls, base_cls):
+        return cls(discover_pages(base_cls))
+
+    def entries(self):
+        """
+        Yields (page class, attribute name, locator) for every locator.
+        """
+        for page_cls in self.pages:
+            for name, locator in sorted(self.locators[page_cls].items()):
+                yield page_cls, name, locator
+
+    def shared_locators(self):
+        """
+        Returns {locator: [page names]} for locators declared by more than
+        one page; such a locator also matches on pages it wasn't meant for.
+        """
+        users = {}
+        for page_cls, name, locator in self.entries():
+            users.setdefault(locator, []).append(f"{page_cls.__name__}.{name}")
+        return {locator: names for locator, names in users.items() if len(names) > 1}
+
+    def page_for_url(self, url):
+        """
+        The page whose URL_PATH is in 'url', else the page without a
+        URL_PATH (the login form at the site root).
+        """
+        default = None
+        for page_cls in self.pages:
+            path = getattr(page_cls, "URL_PATH", None)
+            if path and path in url:
+                return page_cls
+            if not path:
+                default = page_cls
+        return default
+
+
+def profile_page(driver, page_cls, rounds=PROFILE_ROUNDS):
+    """
+    Measures every locator of 'page_cls' on the document currently loaded
+    in 'driver'. Returns {attribute name: {count, visible, ms}}, where 'ms'
+    is the median time of one find.
+    """
+    # BasePage imports this module, so its helpers are imported on use
+    from utils.BasePage import FIND_ELEMENTS_JS
+
+    locators = {name: list(locator) for name, locator in page_locators(page_cls).items()}
+    return driver.execute_script(FIND_ELEMENTS_JS + PROFILE_JS, locators, rounds)
+
+
+def find_problems(registry, results, slow_ms=SLOW_FIND_MS):
+    """
+    Returns [(page name, attribute name, problem)] for locators that match
+    nothing or several elements, or whose median find is over 'slow_ms'.
+    'results' is {page class: profile_page() result}.
+    """
+    problems = []
+    for page_cls, measurements in results.items():
+        for name, measured in sorted(measurements.items()):
+            if measured["count"] == 0:
+                problems.append((page_cls.__name__, name, "matches no element"))
+            elif measured["count"] > 1:
+                problems.append((page_cls.__name__, name, f"not unique: matches {measured['count']} elements"))
+            if measured["ms"] > slow_ms:
+                problems.append((page_cls.__name__, name, f"slow: {measured['ms']:.3f}ms per find"))
+    for locator, names in sorted(registry.shared_locators().items()):
+        problems.append((", ".join(names), "", f"{locator} is shared by {len(names)} pages"))
+    return problems
+
+
+def format_profile(registry, results, problems):
+    lines = [f"{'Locator':<44} {'Strategy':<14} {'Matches':>7} {'Visible':>7} {'Median ms':>10}"]
+    for page_cls, measurements in results.items():
+        for name, measured in sorted(measurements.items()):
+            by = registry.locators[page_cls][name][0]
+            lines.append(
+                f"{page_cls.__name__ + '.' + name:<44} {by:<14} {measured['count']:>7} "
+                f"{measured['visible']:>7} {measured['ms']:>10.3f}"
+            )
+    lines.append("")
+    lines.append(f"{len(problems)} problem(s):" if problems else "No problems found.")
+    for page_name, name, problem in problems:
+        lines.append(f"  {page_name}{'.' + name if name else ''}: {problem}")
+    return lines
+
+
+def profile_local_target(driver, registry, base_url, rounds=PROFILE_ROUNDS):
+    """
+    Walks the checkout flow with the page objects and profiles every page
+    the first time the flow reaches it.
+    """
+    from utils.LoadGenerator import checkout_flow
+
+    results = {}
+
+    @contextlib.contextmanager
+    def step(name):
+        yield
+        page_cls = registry.page_for_url(driver.current_url)
+        if page_cls is not None and page_cls not in results:
+            results[page_cls] = profile_page(driver, page_cls, rounds)
+
+    checkout_flow(driver, base_url, step, think=lambda: None)
+    return results
+
+
+def profile_saved_pages(driver, registry, saved_dir, rounds=PROFILE_ROUNDS):
+    """
+    Profiles saved copies of the pages: '<saved_dir>/<PageClass>.html' or
+    the page's URL_PATH file name ('index.html' for the site root).
+    """
+    results = {}
+    for page_cls in registry.pages:
+        for file_name in (f"{page_cls.__name__}.html", getattr(page_cls, "URL_PATH", None) or "index.html"):
+            path = Path(saved_dir) / file_name
+            if path.is_file():
+                driver.get(path.resolve().as_uri())
+                results[page_cls] = profile_page(driver, page_cls, rounds)
+                break
+        else:
+            log.warning(f"No saved page for {page_cls.__name__} in {saved_dir}")
+    return results
+
+
+def main():
+    """
+    Profiles every page-object locator, e.g.:
+        python -m utils.LocatorRegistry                      # the local stand-in
+        python -m utils.LocatorRegistry --saved-dir saved/   # saved page copies
+    Exits with status 1 if any locator is flagged.
+    """
+    import pages  # noqa: F401 (defines every page object)
+    from utils.BasePage import BasePage
+    from utils.DriverFactory import create_driver
+    from utils.DriverResolver import resolve_driver_path
+    from utils.StandInServer import StandInServer
+
+    parser = argparse.ArgumentParser(description="Profile the page-object locators.")
+    parser.add_argument("--base-url", default="local", help="Site to walk, or 'local' for the stand-in")
+    parser.add_argument("--saved-dir", help="Profile saved pages from this directory instead")
+    parser.add_argument("--browser", choices=("chrome", "firefox"), default="chrome")
+    parser.add_argument("--rounds", type=int, default=PROFILE_ROUNDS, help="Finds per locator")
+    parser.add_argument("--slow-ms", type=float, default=SLOW_FIND_MS, help="Median find time flagged as slow")
+    parser.add_argument("--json", help="Also write the measurements to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    registry = LocatorRegistry.from_base(BasePage)
+    driver = create_driver(args.browser, True, resolve_driver_path(args.browser), page_load_strategy="eager")
+    try:
+        if args.saved_dir:
+            results = profile_saved_pages(driver, registry, args.saved_dir, args.rounds)
+        elif args.base_url == "local":
+            with StandInServer() as server:
+                results = profile_local_target(driver, registry, server.base_url, args.rounds)
+        else:
+            results = profile_local_target(driver, registry, args.base_url, args.rounds)
+    finally:
+        driver.quit()
+
+    problems = find_problems(registry, results, args.slow_ms)
+    for line in format_profile(registry, results, problems):
+        print(line)
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "results": {page_cls.__name__: measured for page_cls, measured in results.items()},
+                "problems": [list(problem) for problem in problems],
+            }, f, indent=2)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
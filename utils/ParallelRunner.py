@@ -0,0 +1,268 @@
+import heapq
+import html
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from statistics import median
+
+log = logging.getLogger(__name__)
+
+# Environment variable that tells a pytest process it is a parallel worker
+WORKER_ENV_VAR = "PYTEST_WORKER_ID"
+
+# Duration assumed for tests that have never been timed before
+DEFAULT_DURATION = 5.0
+
+
+def get_worker_id():
+    """
+    Returns the worker id ('gw0', 'gw1', ...) of this process, or None when
+    the suite runs serially.
+    """
+    return os.environ.get(WORKER_ENV_VAR)
+
+
+# --- Duration history ---
+
+def load_durations(path):
+    """
+    Reads the {nodeid: seconds} map recorded by earlier runs.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(path, new_durations):
+    """
+    Merges freshly measured durations into the history file.
+    """
+    durations = load_durations(path)
+    durations.update(new_durations)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(durations, f, indent=2, sort_keys=True)
+
+
+# --- Scheduling ---
+
+def assign_shards(nodeids, durations, num_shards):
+    """
+    Spreads tests across 'num_shards' workers using the longest-processing-
+    time-first rule: tests are sorted by their recorded duration (longest
+    first) and each one goes to the worker with the least total work so far.
+    Returns a list of nodeid lists, one per shard, each in collection order.
+
+    The result only depends on the inputs, so every worker computes the same
+    split independently.
+    """
+    known = [durations[n] for n in nodeids if n in durations]
+    fallback = median(known) if known else DEFAULT_DURATION
+
+    order = {nodeid: index for index, nodeid in enumerate(nodeids)}
+    by_cost = sorted(nodeids, key=lambda n: (-durations.get(n, fallback), order[n]))
+
+    loads = [(0.0, shard) for shard in range(num_shards)]
+    shards = [[] for _ in range(num_shards)]
+    for nodeid in by_cost:
+        load, shard = heapq.heappop(loads)
+        shards[shard].append(nodeid)
+        heapq.heappush(loads, (load + durations.get(nodeid, fallback), shard))
+
+    return [sorted(shard, key=order.get) for shard in shards]
+
+
+class ResultRecorder:
+    """
+    Collects the outcome and total duration (setup + call + teardown) of
+    every test executed by this process, and where failed tests failed.
+    """
+
+    def __init__(self):
+        self.results = {}
+
+    def record(self, report):
+        entry = self.results.setdefault(report.nodeid, {"outcome": "passed", "duration": 0.0})
+        entry["duration"] += report.duration
+        if report.failed:
+            entry["outcome"] = "failed" if report.when == "call" else "error"
+            # Set by the makereport hook (see ResultsStore.failing_step)
+            entry.setdefault("failing_step", getattr(report, "failing_step", None))
+            entry.setdefault("message", getattr(report, "failure_message", None))
+        elif report.skipped and entry["outcome"] == "passed":
+            entry["outcome"] = "skipped"
+
+    def durations(self):
+        # Skipped tests say nothing about how long a test really takes
+        return {
+            nodeid: round(entry["duration"], 3)
+            for nodeid, entry in self.results.items()
+            if entry["outcome"] != "skipped"
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.results, f, indent=2)
+
+
+# --- Controller ---
+
+def strip_option(args, name):
+    """
+    Removes '--name value' and '--name=value' from an argument list.
+    """
+    stripped = []
+    skip_next = False
+    for arg in args:
+        if skip_next:
+            skip_next = False
+        elif arg == name:
+            skip_next = True
+        elif not arg.startswith(name + "="):
+            stripped.append(arg)
+    return stripped
+
+
+def run_parallel(config, num_workers, durations_file, on_results=None, worker_options=None):
+    """
+    Runs the suite in 'num_workers' pytest subprocesses, each owning its own
+    browser, then merges their logs and reports. 'on_results(results)' is
+    called with the merged {nodeid: entry} map. 'worker_options' maps
+    options to the value the workers get instead of this run's (None drops
+    the option). Returns the exit code.
+    """
+    base_dir = str(config.invocation_params.dir)
+    args = strip_option(list(config.invocation_params.args), "--workers")
+    for name, value in (worker_options or {}).items():
+        args = strip_option(args, name)
+        if value is not None:
+            args.append(f"{name}={value}")
+
+    reports_dir = os.path.join(base_dir, "reports")
+    logs_dir = os.path.join(base_dir, "logs")
+    os.makedirs(reports_dir, exist_ok=True)
+    os.makedirs(logs_dir, exist_ok=True)
+
+    # Drop result files left by an earlier run so they can't leak into this one
+    for name in os.listdir(reports_dir):
+        if name.startswith("results-gw") and name.endswith(".json"):
+            os.remove(os.path.join(reports_dir, name))
+
+    workers = []
+    for index in range(num_workers):
+        worker_id = f"gw{index}"
+        command = [
+            sys.executable, "-m", "pytest", *args,
+            f"--shard-id={index}",
+            f"--num-shards={num_workers}",
+            f"--html=reports/report-{worker_id}.html",
+            "-o", f"log_file=logs/test_run-{worker_id}.log",
+            "-p", "no:cacheprovider",
+        ]
+        env = dict(os.environ, **{WORKER_ENV_VAR: worker_id})
+        console = open(os.path.join(logs_dir, f"console-{worker_id}.txt"), "w", encoding="utf-8")
+        log.info(f"Starting worker {worker_id}")
+        process = subprocess.Popen(command, cwd=base_dir, env=env, stdout=console, stderr=subprocess.STDOUT)
+        workers.append((worker_id, process, console, time.monotonic()))
+
+    exit_codes = {}
+    for worker_id, process, console, started in workers:
+        exit_codes[worker_id] = process.wait()
+        console.close()
+        log.info(f"[{worker_id}] finished with exit code {exit_codes[worker_id]} "
+                 f"in {time.monotonic() - started:.1f}s (output: logs/console-{worker_id}.txt)")
+
+    results = merge_results(reports_dir, exit_codes)
+    save_durations(durations_file, {
+        nodeid: entry["duration"]
+        for nodeid, entry in results.items()
+        if entry["outcome"] != "skipped"
+    })
+    merge_logs(logs_dir, exit_codes)
+    write_index_report(os.path.join(reports_dir, "report.html"), results)
+    if on_results is not None:
+        on_results(results)
+
+    # Exit code 5 means 'no tests collected', which is expected for a worker
+    # whose shard is empty
+    codes = [code for code in exit_codes.values() if code != 5]
+    if not codes:
+        return 5
+    return max(codes)
+
+
+def merge_results(reports_dir, worker_ids):
+    """
+    Combines the per-worker result files into one {nodeid: entry} map.
+    """
+    results = {}
+    for worker_id in worker_ids:
+        path = os.path.join(reports_dir, f"results-{worker_id}.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                worker_results = json.load(f)
+        except (OSError, ValueError):
+            log.warning(f"No results found for worker {worker_id}")
+            continue
+        for nodeid, entry in worker_results.items():
+            results[nodeid] = dict(entry, worker=worker_id)
+    return results
+
+
+def merge_logs(logs_dir, worker_ids):
+    """
+    Concatenates the per-worker log files into logs/test_run.log, prefixing
+    each line with the worker id, and their event logs into logs/events.jsonl.
+    """
+    with open(os.path.join(logs_dir, "test_run.log"), "w", encoding="utf-8") as merged:
+        for worker_id in worker_ids:
+            path = os.path.join(logs_dir, f"test_run-{worker_id}.log")
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    merged.write(f"[{worker_id}] {line}")
+
+    # Structured event logs (--structured-logs) already name their worker
+    event_logs = [os.path.join(logs_dir, f"events-{worker_id}.jsonl") for worker_id in worker_ids]
+    event_logs = [path for path in event_logs if os.path.exists(path)]
+    if event_logs:
+        with open(os.path.join(logs_dir, "events.jsonl"), "w", encoding="utf-8") as merged:
+            for path in event_logs:
+                with open(path, encoding="utf-8") as f:
+                    merged.writelines(f)
+
+
+def write_index_report(path, results):
+    """
+    Writes a summary HTML report that lists every test and links to the
+    full pytest-html report of the worker that ran it.
+    """
+    rows = []
+    for nodeid, entry in sorted(results.items()):
+        worker_id = entry["worker"]
+        rows.append(
+            f"<tr class='{entry['outcome']}'><td>{html.escape(nodeid)}</td>"
+            f"<td>{entry['outcome']}</td><td>{entry['duration']:.2f}s</td>"
+            f"<td><a href='report-{worker_id}.html'>{worker_id}</a></td></tr>"
+        )
+
+    counts = {}
+    for entry in results.values():
+        counts[entry["outcome"]] = counts.get(entry["outcome"], 0) + 1
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items()))
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Parallel test report</title>"
+            "<style>body{font-family:sans-serif}td,th{padding:2px 8px;text-align:left}"
+            ".passed{color:green}.failed,.error{color:red}.skipped{color:gray}</style></head><body>"
+            f"<h1>Parallel test report</h1><p>{summary}</p>"
+            "<table><tr><th>Test</th><th>Outcome</th><th>Duration</th><th>Worker report</th></tr>"
+            + "".join(rows) +
+            "</table></body></html>"
+        )
@@ -0,0 +1,176 @@
+import html
+import json
+import logging
+import os
+import threading
+import warnings
+from datetime import datetime
+from statistics import median
+
+log = logging.getLogger(__name__)
+
+# Collects Navigation Timing, paint and long-task metrics of the current
+# document (all in ms since navigation start). After a client-side route
+# change the navigation entry belongs to an earlier URL, so only paint and
+# long-task data are reported for it.
+PERF_METRICS_JS = """
+var done = arguments[arguments.length - 1];
+var metrics = {};
+var nav = performance.getEntriesByType('navigation')[0];
+if (nav && nav.name === location.href) {
+    metrics.ttfb = nav.responseStart;
+    metrics.domContentLoaded = nav.domContentLoadedEventEnd || null;
+    metrics.load = nav.loadEventEnd || null;
+    metrics.transferSize = nav.transferSize;
+}
+performance.getEntriesByType('paint').forEach(function (entry) {
+    metrics[entry.name === 'first-paint' ? 'firstPaint' : 'firstContentfulPaint'] = entry.startTime;
+});
+var longTasks = [];
+function finish() {
+    metrics.longTaskCount = longTasks.length;
+    metrics.longTaskTotal = longTasks.reduce(function (sum, entry) { return sum + entry.duration; }, 0);
+    done(metrics);
+}
+try {
+    var observer = new PerformanceObserver(function (list) { longTasks = longTasks.concat(list.getEntries()); });
+    observer.observe({type: 'longtask', buffered: true});
+    setTimeout(function () {
+        longTasks = longTasks.concat(observer.takeRecords());
+        observer.disconnect();
+        finish();
+    }, 0);
+} catch (e) {
+    finish();
+}
+"""
+
+# Columns of the per-test report table
+REPORTED_METRICS = (
+    "ready", "ttfb", "domContentLoaded", "load", "firstContentfulPaint", "longTaskCount", "longTaskTotal",
+)
+
+
+class PerfBudgetWarning(UserWarning):
+    """
+    A page exceeded one of its PERF_BUDGETS (in '--perf-budgets=warn' mode).
+    """
+
+
+def capture(driver, page, ready_ms):
+    """
+    Called by BasePage.wait_until_ready once a page is ready. Records the
+    page's metrics and checks its budgets when a PerfRecorder is attached
+    to the driver; does nothing otherwise.
+    """
+    recorder = getattr(driver, "_perf_recorder", None)
+    if recorder is not None:
+        recorder.capture(driver, page, ready_ms)
+
+
+class PerfRecorder:
+    """
+    Client-side performance metrics of every page reached, per test, and the
+    budget checks against each page's PERF_BUDGETS ({metric: max ms}).
+
+    'budget_mode' is 'warn' (PerfBudgetWarning), 'fail' (AssertionError in
+    the test) or 'off'.
+    """
+
+    def __init__(self, budget_mode="warn"):
+        self.budget_mode = budget_mode
+        self.records = {}
+        self._current_test = "session"
+        self._lock = threading.Lock()
+
+    def attach(self, driver):
+        driver._perf_recorder = self
+        return driver
+
+    def start_test(self, test_id):
+        self._current_test = test_id
+
+    def end_test(self):
+        self._current_test = "session"
+
+    def capture(self, driver, page, ready_ms):
+        page_name = type(page).__name__
+        try:
+            metrics = driver.execute_async_script(PERF_METRICS_JS)
+        except Exception as e:
+            log.debug(f"Could not read performance metrics on {page_name}: {e}")
+            return
+        metrics["ready"] = ready_ms
+
+        violations = [
+            f"{page_name} {metric} {metrics[metric]:.0f}ms > budget {budget}ms"
+            for metric, budget in page.PERF_BUDGETS.items()
+            if metrics.get(metric) is not None and metrics[metric] > budget
+        ]
+        with self._lock:
+            self.records.setdefault(self._current_test, []).append(
+                {"page": page_name, "metrics": metrics, "violations": violations}
+            )
+        log.info(f"Performance of {page_name}: " + ", ".join(
+            f"{name}={value:.0f}" for name, value in sorted(metrics.items()) if value is not None
+        ))
+
+        if violations and self.budget_mode == "fail":
+            raise AssertionError("Performance budget exceeded: " + "; ".join(violations))
+        if self.budget_mode == "warn":
+            for violation in violations:
+                warnings.warn(violation, PerfBudgetWarning, stacklevel=4)
+
+    # --- Reporting ---
+
+    def summary_html(self, test_id):
+        rows = "".join(
+            f"<tr><td>{html.escape(entry['page'])}</td>"
+            + "".join(
+                f"<td>{'' if entry['metrics'].get(name) is None else round(entry['metrics'][name])}</td>"
+                for name in REPORTED_METRICS
+            )
+            + f"<td>{html.escape('; '.join(entry['violations']))}</td></tr>"
+            for entry in self.records.get(test_id, [])
+        )
+        header = "".join(f"<th>{name}</th>" for name in REPORTED_METRICS)
+        return (
+            "<div><p><b>Client-side performance</b> (times in ms)</p>"
+            f"<table><tr><th>Page</th>{header}<th>Over budget</th></tr>" + rows + "</table></div>"
+        )
+
+    def page_medians(self):
+        """
+        Returns {page: {metric: median over this run}}.
+        """
+        samples = {}
+        for entries in self.records.values():
+            for entry in entries:
+                page = samples.setdefault(entry["page"], {})
+                for name, value in entry["metrics"].items():
+                    if value is not None:
+                        page.setdefault(name, []).append(value)
+        return {
+            page: {name: median(values) for name, values in metrics.items()}
+            for page, metrics in samples.items()
+        }
+
+    def write_json(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.records, f, indent=2)
+        log.info(f"Client-side performance metrics written to {path}")
+
+    def append_trend(self, path):
+        """
+        Appends this run's per-page medians to the trend file.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                trend = json.load(f)
+        except (OSError, ValueError):
+            trend = []
+        trend.append({"timestamp": datetime.now().isoformat(timespec="seconds"), "pages": self.page_medians()})
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trend, f, indent=2)
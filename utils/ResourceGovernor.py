@@ -0,0 +1,377 @@
+import contextlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+log = logging.getLogger(__name__)
+
+# psutil is optional: without it host headroom is read from /proc and the
+# load average, and browser process trees can't be measured (no recycling)
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# One lock per host: every worker process (and every concurrent run) starts
+# its browsers through the same admission queue
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+MB = 1024 * 1024
+SHM_DIR = "/dev/shm"
+ADMISSION_LOCK_FILE = os.path.join(tempfile.gettempdir(), "web-automation-governor.lock")
+
+
+def host_headroom():
+    """
+    Returns (available memory in bytes, CPU busy percent, free /dev/shm bytes);
+    any of them is None if it can't be read on this host.
+    """
+    if psutil is not None:
+        available = psutil.virtual_memory().available
+        cpu = psutil.cpu_percent(interval=None)
+    else:
+        available = _meminfo_available()
+        try:
+            cpu = os.getloadavg()[0] / (os.cpu_count() or 1) * 100
+        except OSError:
+            cpu = None
+    try:
+        stats = os.statvfs(SHM_DIR)
+        shm_free = stats.f_bavail * stats.f_frsize
+    except OSError:
+        shm_free = None
+    return available, cpu, shm_free
+
+
+def _meminfo_available():
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def browser_root_pid(driver):
+    """
+    The pid of the driver binary a local session runs under (the browser
+    is its child), or None for remote sessions.
+    """
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+def tree_usage(pid, known=None):
+    """
+    Resident memory (bytes) and CPU use (percent of one core) of a process
+    and all its descendants. CPU is measured since the previous call with
+    the same 'known' {pid: psutil.Process} dict, so the first call reports
+    0. Returns (None, None) without psutil or once the process is gone.
+    """
+    if psutil is None or pid is None:
+        return None, None
+    known = {} if known is None else known
+    try:
+        root = known.get(pid) or psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return None, None
+    rss, cpu = 0, 0.0
+    alive = {}
+    for process in processes:
+        # Keep the Process objects: cpu_percent() compares with their last call
+        process = known.get(process.pid, process)
+        try:
+            rss += process.memory_info().rss
+            cpu += process.cpu_percent(interval=None)
+        except psutil.Error:
+            # Renderers come and go while we measure
+            continue
+        alive[process.pid] = process
+    known.clear()
+    known.update(alive)
+    return rss, cpu
+
+
+def _read_forced_time(lock_file):
+    """
+    The time.time() of the last admission forced on this host, as written
+    to the lock file by _write_forced_time(), or 0.
+    """
+    lock_file.seek(0)
+    try:
+        return float(lock_file.read().decode("ascii") or 0)
+    except ValueError:
+        return 0.0
+
+
+def _write_forced_time(lock_file, timestamp):
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(f"{timestamp:.3f}".encode("ascii"))
+    lock_file.flush()
+
+
+@contextlib.contextmanager
+def _host_lock(path):
+    """
+    Exclusive lock shared by every process on this host. The OS releases it
+    if the holder dies. Yields the lock file, which the holder may rewrite.
+    """
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            # LK_LOCK retries for 10s before raising; keep waiting
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield f
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class _TrackedBrowser:
+    def __init__(self, label, pid):
+        self.label = label
+        self.pid = pid
+        self.rss = 0
+        self.peak = 0
+        self.cpu = 0.0
+        self.peak_cpu = 0.0
+        self.recycled = False
+        # psutil.Process objects of the tree, for CPU deltas between samples;
+        # the sampler thread and recycle checks both measure
+        self.processes = {}
+        self.lock = threading.Lock()
+
+
+class ResourceGovernor:
+    """
+    Admits new browser sessions only while the host has headroom (available
+    memory, CPU and /dev/shm), samples the memory and CPU of every tracked
+    browser's process tree in the background, and flags browsers that grew
+    past 'memory_ceiling_mb' so the session pool recycles them.
+
+    Admission goes through a host-wide lock file, so parallel worker
+    processes start their browsers one at a time and each one sees the
+    memory taken by the browsers admitted before it. The lock file also
+    records when an admission was last forced, so no worker waits again
+    for headroom that didn't come back within 'max_wait'.
+    """
+
+    def __init__(self, min_free_memory_mb=1024, max_cpu_percent=90, min_free_shm_mb=256,
+                 memory_ceiling_mb=1500, sample_interval=1.0, max_wait=120, lock_path=ADMISSION_LOCK_FILE):
+        self.min_free_memory = min_free_memory_mb * MB
+        self.max_cpu_percent = max_cpu_percent
+        self.min_free_shm = min_free_shm_mb * MB
+        self.memory_ceiling = memory_ceiling_mb * MB if memory_ceiling_mb else None
+        self.sample_interval = sample_interval
+        self.max_wait = max_wait
+        self.lock_path = lock_path
+        self._browsers = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._next_label = 1
+        # --- Statistics reported at the end of the run
+        self.throttle_reasons = Counter()
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.forced_admissions = 0
+        # time.time() of the last admission forced after waiting 'max_wait'
+        self.last_forced = 0.0
+        self.lowest_free_memory = None
+        self.finished = []
+
+    def start(self):
+        if psutil is None:
+            log.warning("psutil is not installed: browser memory and CPU are not measured and sessions are not "
+                        "recycled by memory; admission uses /proc and the load average.")
+            return
+        # The first cpu_percent() call only sets the baseline for later ones
+        psutil.cpu_percent(interval=None)
+        self._sampler = threading.Thread(target=self._sample_loop, name="resource-governor", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    # --- Admission ---
+
+    @contextlib.contextmanager
+    def admission(self):
+        """
+        Holds the host-wide admission lock while the host lacks headroom and
+        while the caller launches its browser, so the next process measures
+        the host with this browser already running:
+
+            with governor.admission():
+                driver = create_driver(...)
+        """
+        with _host_lock(self.lock_path) as lock_file:
+            # Another worker may have given up waiting a moment ago
+            self.last_forced = max(self.last_forced, _read_forced_time(lock_file))
+            forced = self.last_forced
+            self.admit()
+            if self.last_forced != forced:
+                _write_forced_time(lock_file, self.last_forced)
+            yield
+
+    def admit(self):
+        """
+        Blocks until the host has room for another browser. Whether browsers
+        of this process or of other workers are using it doesn't matter; the
+        host's headroom decides. Admits anyway after 'max_wait' seconds so a
+        run can't hang, and without waiting when this process has no browser
+        running (it can't make progress without one) or an admission was
+        forced less than 'max_wait' seconds ago.
+        """
+        started = time.monotonic()
+        reasons = self._lack_of_headroom()
+        if not reasons:
+            return
+        shortage = ", ".join(message for _, message in reasons)
+        with self._lock:
+            running = len(self._browsers)
+        since_forced = time.time() - self.last_forced
+        if not running or since_forced < self.max_wait:
+            why = ("no browser of this process is running" if not running
+                   else f"an admission was already forced {since_forced:.0f}s ago")
+            log.warning(f"Starting a browser without headroom ({shortage}): {why}.")
+            with self._lock:
+                self.forced_admissions += 1
+            return
+        with self._lock:
+            self.throttled += 1
+            self.throttle_reasons.update(kind for kind, _ in reasons)
+        log.warning(f"Holding back a new browser session: {shortage}")
+
+        while reasons:
+            if time.monotonic() - started >= self.max_wait:
+                log.warning(f"Starting a browser without headroom after waiting {self.max_wait}s.")
+                with self._lock:
+                    self.forced_admissions += 1
+                self.last_forced = time.time()
+                break
+            time.sleep(self.sample_interval)
+            reasons = self._lack_of_headroom()
+        with self._lock:
+            self.throttled_seconds += time.monotonic() - started
+
+    def _lack_of_headroom(self):
+        available, cpu, shm_free = host_headroom()
+        reasons = []
+        if available is not None:
+            with self._lock:
+                if self.lowest_free_memory is None or available < self.lowest_free_memory:
+                    self.lowest_free_memory = available
+            if available < self.min_free_memory:
+                reasons.append(("memory", f"{available // MB} MB memory available"))
+        if cpu is not None and cpu > self.max_cpu_percent:
+            reasons.append(("cpu", f"CPU {cpu:.0f}% busy"))
+        if shm_free is not None and shm_free < self.min_free_shm:
+            reasons.append(("shm", f"{shm_free // MB} MB free in {SHM_DIR}"))
+        return reasons
+
+    # --- Browser tracking ---
+
+    def track(self, driver):
+        """
+        Starts measuring the browser behind 'driver'. It is forgotten (and its
+        peak kept for the summary) when the driver quits.
+        """
+        pid = browser_root_pid(driver)
+        with self._lock:
+            browser = _TrackedBrowser(f"browser-{self._next_label}", pid)
+            self._next_label += 1
+            self._browsers[id(driver)] = browser
+        self._measure(browser)
+
+        quit_driver = driver.quit
+
+        def quit_and_forget():
+            try:
+                quit_driver()
+            finally:
+                with self._lock:
+                    self.finished.append(self._browsers.pop(id(driver), browser))
+
+        driver.quit = quit_and_forget
+        return driver
+
+    def recycle_reason(self, driver):
+        """
+        Returns why the session should be recycled (its browser is over the
+        memory ceiling), or None. Used as the SessionPool's recycle check.
+        """
+        browser = self._browsers.get(id(driver))
+        if browser is None or self.memory_ceiling is None:
+            return None
+        rss = self._measure(browser)
+        if rss is not None and rss > self.memory_ceiling:
+            browser.recycled = True
+            return f"{browser.label} uses {rss // MB} MB (ceiling {self.memory_ceiling // MB} MB)"
+        return None
+
+    def _measure(self, browser):
+        with browser.lock:
+            rss, cpu = tree_usage(browser.pid, browser.processes)
+        if rss is not None:
+            browser.rss = rss
+            browser.peak = max(browser.peak, rss)
+            browser.cpu = cpu
+            browser.peak_cpu = max(browser.peak_cpu, cpu)
+        return rss
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.sample_interval):
+            with self._lock:
+                browsers = list(self._browsers.values())
+            for browser in browsers:
+                self._measure(browser)
+
+    # --- Reporting ---
+
+    def summary_lines(self):
+        with self._lock:
+            browsers = self.finished + list(self._browsers.values())
+        lines = []
+        for browser in browsers:
+            if browser.peak:
+                lines.append(
+                    f"{browser.label}: peak {browser.peak // MB} MB RSS, peak CPU {browser.peak_cpu:.0f}%"
+                    + (" (recycled over the memory ceiling)" if browser.recycled else "")
+                )
+        if psutil is None:
+            lines.append("Browser memory and CPU not measured (psutil is not installed).")
+        lines.append(
+            f"Admission throttled {self.throttled} time(s) for {self.throttled_seconds:.1f}s"
+            + (f" ({', '.join(f'{kind}: {count}' for kind, count in self.throttle_reasons.items())})"
+               if self.throttle_reasons else "")
+            + f", {self.forced_admissions} admitted without headroom"
+        )
+        if self.lowest_free_memory is not None:
+            lines.append(f"Lowest available host memory seen: {self.lowest_free_memory // MB} MB")
+        return lines
@@ -0,0 +1,153 @@
+import json
+import logging
+from collections import Counter
+
+log = logging.getLogger(__name__)
+
+# Chrome's Network.setBlockedURLs only matches URL patterns, so resource types
+# are blocked through the file extensions that identify them
+RESOURCE_TYPE_PATTERNS = {
+    "Image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"],
+    "Font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "Media": ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav"],
+    "Stylesheet": ["*.css"],
+}
+
+# Third-party analytics / error reporting loaded by saucedemo
+TRACKER_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*backtrace.io*",
+    "*optimizely.com*",
+]
+
+
+class ResourceProfile:
+    """
+    A named set of resource types and URL patterns to block in the browser.
+    """
+
+    def __init__(self, name, block_types=(), url_patterns=()):
+        self.name = name
+        self.block_types = list(block_types)
+        self.url_patterns = list(url_patterns)
+
+    @property
+    def is_active(self):
+        return bool(self.block_types or self.url_patterns)
+
+    def blocked_patterns(self):
+        patterns = list(self.url_patterns)
+        for resource_type in self.block_types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+        return patterns
+
+
+RESOURCE_PROFILES = {
+    # Load everything (the default)
+    "none": ResourceProfile("none"),
+    # Nothing our assertions look at: images, fonts, media and trackers
+    "lean": ResourceProfile("lean", ["Image", "Font", "Media"], TRACKER_PATTERNS),
+    # Also drops stylesheets; elements keep a layout box, but anything that
+    # depends on CSS visibility rules may behave differently
+    "strict": ResourceProfile("strict", ["Image", "Font", "Media", "Stylesheet"], TRACKER_PATTERNS),
+}
+
+
+def configure_options(browser_name, options, profile):
+    """
+    Adjusts browser options before launch so the profile can be applied.
+    Chrome gets performance logging (to count requests); Firefox, which has no
+    DevTools protocol in Selenium, gets the closest preferences instead.
+    """
+    if not profile.is_active:
+        return
+
+    if browser_name == "chrome":
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        return
+
+    if "Image" in profile.block_types:
+        options.set_preference("permissions.default.image", 2)
+    if "Font" in profile.block_types:
+        options.set_preference("browser.display.use_document_fonts", 0)
+    if "Media" in profile.block_types:
+        options.set_preference("media.autoplay.default", 5)
+    log.warning(
+        f"Resource profile '{profile.name}' on Firefox: images/fonts/media are disabled via preferences, "
+        "but URL-pattern blocking and per-test request statistics need Chrome."
+    )
+
+
+def apply_profile(driver, profile):
+    """
+    Turns on request blocking for a freshly launched Chrome session.
+    """
+    if not profile.is_active or not hasattr(driver, "execute_cdp_cmd"):
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": profile.blocked_patterns()})
+    log.info(f"Resource profile '{profile.name}' active: blocking {len(profile.blocked_patterns())} URL pattern(s).")
+
+
+class ResourceStats:
+    """
+    Reads Chrome's performance log to count the requests made and blocked
+    since the last call, and keeps run totals. Blocked requests never reach
+    the network, so only their number (per resource type) is known; nothing
+    is fetched to estimate their size.
+    """
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.totals = {"requests": 0, "bytes": 0, "blocked": 0}
+        self.blocked_types = Counter()
+
+    def collect(self, driver):
+        """
+        Returns this test's loaded "requests" and "bytes", and the number of
+        "blocked" requests with a {resource type: count} "blocked_types" map;
+        or None when the driver has no performance log.
+        """
+        if not self.profile.is_active or not hasattr(driver, "execute_cdp_cmd"):
+            return None
+        try:
+            entries = driver.get_log("performance")
+        except Exception as e:
+            log.debug(f"Performance log unavailable: {e}")
+            return None
+
+        stats = {"requests": 0, "bytes": 0, "blocked": 0}
+        blocked_types = Counter()
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            params = message.get("params", {})
+            if message["method"] == "Network.loadingFinished":
+                stats["requests"] += 1
+                stats["bytes"] += int(params.get("encodedDataLength", 0))
+            elif message["method"] == "Network.loadingFailed" and params.get("blockedReason"):
+                stats["blocked"] += 1
+                blocked_types[params.get("type", "Other")] += 1
+
+        for key, value in stats.items():
+            self.totals[key] += value
+        self.blocked_types.update(blocked_types)
+        return dict(stats, blocked_types=dict(blocked_types))
+
+    def summary(self):
+        return (
+            f"Resource profile '{self.profile.name}': blocked {self.totals['blocked']} request(s)"
+            f"{format_types(self.blocked_types)}; loaded {self.totals['requests']} "
+            f"request(s), {self.totals['bytes'] / 1024:.0f} KiB."
+        )
+
+
+def format_types(counts):
+    """
+    Formats a {resource type: count} map as ' (3 Image, 1 Font)', most
+    frequent first, or '' when it is empty.
+    """
+    if not counts:
+        return ""
+    return " (" + ", ".join(f"{count} {resource_type}" for resource_type, count in Counter(counts).most_common()) + ")"
@@ -0,0 +1,218 @@
+import hashlib
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from utils.BasePage import BasePage
+
+log = logging.getLogger(__name__)
+
+# Files whose changes decide what '--changed-only' reruns, relative to the
+# project root: page objects, their base class, test modules and data files
+TRACKED_FILES = ("pages/*.py", "utils/BasePage.py", "tests/*.py", "data/*")
+# Every test depends on these; the login fixtures use LoginPage for every
+# logged-in test, whatever the test module imports
+SHARED_DEPENDENCIES = ("utils/BasePage.py", "tests/conftest.py", "pages/__init__.py", "pages/LoginPage.py")
+
+FAILED_OUTCOMES = ("failed", "error")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    finished REAL NOT NULL,
+    green INTEGER NOT NULL,
+    files TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    failing_step TEXT,
+    message TEXT,
+    PRIMARY KEY (run_id, nodeid)
+);
+CREATE INDEX IF NOT EXISTS results_by_test ON results (nodeid, run_id);
+"""
+
+
+def fingerprint_files(root, patterns=TRACKED_FILES):
+    """
+    Returns {path relative to 'root': sha256} for the files matching 'patterns'.
+    """
+    root = Path(root)
+    files = {}
+    for pattern in patterns:
+        for path in sorted(root.glob(pattern)):
+            if path.is_file():
+                files[path.relative_to(root).as_posix()] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return files
+
+
+def module_dependencies(module, root):
+    """
+    The tracked files a test module depends on: itself, the modules of the
+    page objects it uses (and of the pages those chain to), the shared
+    files, and every data file whose name appears in its source.
+    """
+    root = Path(root).resolve()
+    dependencies = set(SHARED_DEPENDENCIES)
+    pending, seen = [module], set()
+    while pending:
+        current = pending.pop()
+        path = Path(getattr(current, "__file__", "") or "").resolve()
+        if current.__name__ in seen or root not in path.parents:
+            continue
+        seen.add(current.__name__)
+        dependencies.add(path.relative_to(root).as_posix())
+        for value in vars(current).values():
+            if isinstance(value, type) and issubclass(value, BasePage) and value is not BasePage:
+                pending.append(sys.modules[value.__module__])
+
+    source = Path(module.__file__).read_text(encoding="utf-8")
+    data_dir = root / "data"
+    if data_dir.is_dir():
+        dependencies.update(
+            f"data/{path.name}" for path in data_dir.iterdir() if path.is_file() and path.name in source
+        )
+    return dependencies
+
+
+def changed_files(current, baseline):
+    """
+    Paths added, removed or modified between two fingerprint_files() results.
+    """
+    return {path for path in set(current) | set(baseline) if current.get(path) != baseline.get(path)}
+
+
+def failing_step(excinfo, root):
+    """
+    Where a test failed: the innermost page-object method in the traceback
+    (e.g. 'InventoryPage.go_to_cart'). BasePage internals (waits, element
+    helpers) only count when no page-object method is involved; failing
+    outside both, it is the innermost line of the test module itself.
+    """
+    root = Path(root).resolve()
+    base_step = test_line = None
+    for entry in reversed(excinfo.traceback):
+        path = Path(str(entry.path)).resolve()
+        if root not in path.parents:
+            continue
+        relative = path.relative_to(root).as_posix()
+        if relative.startswith("pages/"):
+            return _step_name(entry)
+        if base_step is None and relative == "utils/BasePage.py":
+            base_step = _step_name(entry)
+        elif test_line is None and relative.startswith("tests/"):
+            test_line = f"{relative}:{entry.lineno + 1}"
+    return base_step or test_line
+
+
+def _step_name(entry):
+    owner = entry.frame.f_locals.get("self")
+    return f"{type(owner).__name__}.{entry.name}" if owner is not None else entry.name
+
+
+class ResultsStore:
+    """
+    SQLite history of test runs: per run, whether it was green and the
+    fingerprint of the tracked files; per test, its outcome, duration and
+    (if it failed) the failing step and message.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        # Fingerprint and start time of the run in progress (see start_run)
+        self.run_files = {}
+        self.run_started = time.time()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # Parallel workers read while the controller writes
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def start_run(self, files):
+        """
+        Notes the tracked-file fingerprint the run in progress started from.
+        """
+        self.run_files = files
+        self.run_started = time.time()
+
+    def record_run(self, results):
+        """
+        Stores the run in progress. 'results' is {nodeid: {outcome,
+        duration, failing_step, message}}; the run is green if none failed.
+        Returns the run id.
+        """
+        green = bool(results) and not any(entry["outcome"] in FAILED_OUTCOMES for entry in results.values())
+        with self._connect() as connection:
+            run_id = connection.execute(
+                "INSERT INTO runs (started, finished, green, files) VALUES (?, ?, ?, ?)",
+                (self.run_started, time.time(), int(green), json.dumps(self.run_files, sort_keys=True)),
+            ).lastrowid
+            connection.executemany(
+                "INSERT INTO results (run_id, nodeid, outcome, duration, failing_step, message) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, nodeid, entry["outcome"], round(entry["duration"], 3),
+                     entry.get("failing_step"), entry.get("message"))
+                    for nodeid, entry in results.items()
+                ],
+            )
+        log.info(f"Recorded run {run_id} ({len(results)} test(s), {'green' if green else 'not green'}) in {self.path}")
+        return run_id
+
+    def latest_outcomes(self):
+        """
+        Returns {nodeid: outcome of its most recent run}.
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT nodeid, outcome FROM results r WHERE run_id = "
+                "(SELECT MAX(run_id) FROM results WHERE nodeid = r.nodeid)"
+            ).fetchall()
+        return dict(rows)
+
+    def recent_failures(self):
+        """
+        Tests whose most recent result was a failure or error, most
+        recently failed first.
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT nodeid FROM results r WHERE outcome IN (?, ?) AND run_id = "
+                "(SELECT MAX(run_id) FROM results WHERE nodeid = r.nodeid) ORDER BY run_id DESC",
+                FAILED_OUTCOMES,
+            ).fetchall()
+        return [nodeid for (nodeid,) in rows]
+
+    def last_passed_files(self):
+        """
+        Returns {nodeid: tracked-file fingerprint of the run it last passed
+        in}. Each test is compared with its own last pass, so a partial run
+        ('-k', one file, --benchmark) says nothing about the tests it skipped.
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT r.nodeid, r.run_id, runs.files FROM results r JOIN runs ON runs.id = r.run_id "
+                "WHERE r.outcome = 'passed' AND r.run_id = "
+                "(SELECT MAX(run_id) FROM results WHERE nodeid = r.nodeid AND outcome = 'passed')"
+            ).fetchall()
+        fingerprints = {}
+        for _, run_id, files in rows:
+            if run_id not in fingerprints:
+                fingerprints[run_id] = json.loads(files)
+        return {nodeid: fingerprints[run_id] for nodeid, run_id, _ in rows}
@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+from selenium.common.exceptions import WebDriverException
+
+log = logging.getLogger(__name__)
+
+# Clears web storage for whatever origin the browser is currently on.
+# Wrapped in try/catch because about:blank and data: URLs have no storage.
+CLEAR_STORAGE_SCRIPT = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class PooledSession:
+    """
+    A live WebDriver session owned by the SessionPool, plus its usage count.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+
+class SessionPool:
+    """
+    Keeps warm browser sessions alive across tests.
+
+    Sessions are handed out by acquire() and given back with release(),
+    which resets the browser to a clean state so the next test cannot see
+    anything left over by the previous one. A session is quit and replaced
+    once it reaches 'max_uses', fails its 'recycle_check' or fails its reset
+    (unhealthy).
+
+    prewarm() launches sessions on background threads ahead of time (e.g.
+    while pytest collects tests); acquire() waits for one of those instead
+    of launching a duplicate.
+    """
+
+    def __init__(self, launcher, max_uses=25, recycle_check=None):
+        """
+        'launcher' is a zero-argument callable returning a new WebDriver.
+        'recycle_check(driver)', if given, returns a reason to recycle the
+        session when it is released (e.g. ResourceGovernor.recycle_reason),
+        or None to keep it.
+        """
+        self._launcher = launcher
+        self.max_uses = max(1, max_uses)
+        self._recycle_check = recycle_check
+        self._idle = []
+        self._lock = threading.Lock()
+        # Signalled whenever a pre-warmed launch finishes
+        self._ready = threading.Condition(self._lock)
+        self._warming = 0
+        self._warm_threads = []
+        self._cancelled = False
+        # --- Statistics reported at the end of the run
+        self.launches = 0
+        self.reuses = 0
+        self.recycled = 0
+        self.unhealthy = 0
+        self.prewarmed = 0
+
+    def acquire(self):
+        """
+        Returns an idle PooledSession, or launches a new one if none is idle
+        and no pre-warmed launch is still on its way.
+        """
+        with self._ready:
+            while not self._idle and self._warming:
+                self._ready.wait()
+            session = self._idle.pop() if self._idle else None
+
+        if session is not None and session.uses == 0:
+            log.info("Using a pre-warmed browser session.")
+        elif session is not None:
+            self.reuses += 1
+            log.info(f"Reusing warm browser session (use {session.uses + 1}/{self.max_uses}).")
+        else:
+            session = PooledSession(self._launcher())
+            self.launches += 1
+
+        session.uses += 1
+        return session
+
+    def release(self, session):
+        """
+        Resets a session and returns it to the pool, or quits it if it has
+        reached its use limit or can no longer be reset.
+        """
+        if session.uses >= self.max_uses:
+            log.info(f"Recycling browser session after {session.uses} uses.")
+            self.recycled += 1
+            self._quit(session)
+            return
+
+        reason = self._recycle_check(session.driver) if self._recycle_check is not None else None
+        if reason:
+            log.info(f"Recycling browser session: {reason}.")
+            self.recycled += 1
+            self._quit(session)
+            return
+
+        try:
+            self.reset(session.driver)
+        except WebDriverException as e:
+            log.warning(f"Browser session is unhealthy, discarding it: {e}")
+            self.unhealthy += 1
+            self._quit(session)
+            return
+
+        with self._lock:
+            self._idle.append(session)
+
+    def prewarm(self, count):
+        """
+        Starts launching 'count' sessions on background threads and returns
+        immediately. A failed launch is only logged; acquire() then launches
+        the session itself.
+        """
+        for index in range(count):
+            with self._lock:
+                self._warming += 1
+            thread = threading.Thread(target=self._prewarm_one, name=f"prewarm-{index}", daemon=True)
+            self._warm_threads.append(thread)
+            thread.start()
+        log.info(f"Pre-warming {count} browser session(s) in the background.")
+
+    def cancel_prewarm(self):
+        """
+        Quits every pre-warmed session that no test has used yet; launches
+        still in progress quit their browser as soon as it is up.
+        """
+        with self._lock:
+            self._cancelled = True
+            unused = [session for session in self._idle if session.uses == 0]
+            self._idle = [session for session in self._idle if session.uses > 0]
+        for session in unused:
+            self._quit(session)
+        log.info("Browser pre-warming cancelled.")
+
+    def _prewarm_one(self):
+        try:
+            session = PooledSession(self._launcher())
+        except Exception as e:
+            log.warning(f"Pre-warming a browser failed; it will be launched on first use instead: {e}")
+            session = None
+
+        with self._ready:
+            self._warming -= 1
+            keep = session is not None and not self._cancelled
+            if keep:
+                self._idle.append(session)
+                self.launches += 1
+                self.prewarmed += 1
+            self._ready.notify_all()
+        if session is not None and not keep:
+            self._quit(session)
+
+    @staticmethod
+    def reset(driver):
+        """
+        Brings a browser back to a blank state: closes extra windows, clears
+        web storage and cookies, and navigates to about:blank.
+        """
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        driver.execute_script(CLEAR_STORAGE_SCRIPT)
+        driver.delete_all_cookies()
+        # Chromium can also drop cookies for every domain, not just the current one
+        if hasattr(driver, "execute_cdp_cmd"):
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.get("about:blank")
+
+    def close(self):
+        """
+        Quits all idle sessions, after waiting for pre-warmed launches still in
+        progress unless pre-warming was cancelled (nothing needs them; they
+        quit their browser themselves once it is up). Called at the end of
+        the run; calling it again is harmless.
+        """
+        with self._lock:
+            cancelled, self._cancelled = self._cancelled, True
+        if not cancelled:
+            for thread in self._warm_threads:
+                thread.join()
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            self._quit(session)
+
+    def summary(self):
+        return (
+            f"Session pool: {self.launches} browser launch(es) ({self.prewarmed} pre-warmed), "
+            f"{self.reuses} reuse(s) ({self.reuses} launch(es) avoided), "
+            f"{self.recycled} recycled, {self.unhealthy} discarded as unhealthy."
+        )
+
+    @staticmethod
+    def _quit(session):
+        log.info("WebDriver teardown: Closing browser")
+        try:
+            session.driver.quit()
+        except WebDriverException as e:
+            log.warning(f"Error while quitting browser session: {e}")
@@ -0,0 +1,134 @@
+import argparse
+import functools
+import logging
+import random
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# Static copy of the saucedemo pages the page objects cover
+SITE_DIR = Path(__file__).resolve().parent.parent / "standin"
+
+
+class _LatencyInjector:
+    """
+    Produces the artificial delay for each request: 'latency' seconds plus a
+    uniformly distributed +/- 'jitter'. Seeded, so runs are reproducible.
+    """
+
+    def __init__(self, latency, jitter, seed):
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next_delay(self):
+        if not self.latency and not self.jitter:
+            return 0.0
+        with self._lock:
+            offset = self._random.uniform(-self.jitter, self.jitter)
+        return max(0.0, self.latency + offset)
+
+
+class _StandInRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the stand-in site and delays every response by the injected latency.
+    """
+
+    def __init__(self, *args, injector=None, **kwargs):
+        self.injector = injector
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        delay = self.injector.next_delay()
+        if delay:
+            time.sleep(delay)
+        super().do_GET()
+
+    def end_headers(self):
+        # Each run should see the server's latency, not the browser cache
+        self.send_header("Cache-Control", "no-store")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        log.debug("Stand-in %s - %s", self.address_string(), format % args)
+
+
+class StandInServer:
+    """
+    Local HTTP server that serves a faithful copy of the saucedemo login,
+    inventory, cart and checkout pages, so the suite can run offline.
+
+    Usage:
+        with StandInServer(latency=0.05, jitter=0.02) as server:
+            driver.get(server.base_url)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, seed=0):
+        """
+        'latency' and 'jitter' are in seconds. Port 0 picks a free port.
+        """
+        self.host = host
+        self.port = port
+        self.injector = _LatencyInjector(latency, jitter, seed)
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    def start(self):
+        handler = functools.partial(_StandInRequestHandler, directory=str(SITE_DIR), injector=self.injector)
+        self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="standin-server", daemon=True)
+        self._thread.start()
+        log.info(
+            f"Stand-in server running at {self.base_url} "
+            f"(latency={self.injector.latency * 1000:.0f}ms, jitter={self.injector.jitter * 1000:.0f}ms)"
+        )
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+            log.info("Stand-in server stopped.")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    """
+    Runs the stand-in in the foreground, e.g. for manual checks or load runs:
+        python -m utils.StandInServer --port 8000 --latency 50 --jitter 20
+    """
+    parser = argparse.ArgumentParser(description="Serve the local saucedemo stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0, help="Artificial latency per request in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="Random +/- jitter per request in ms")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the jitter sequence")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    server = StandInServer(args.host, args.port, args.latency / 1000, args.jitter / 1000, args.seed).start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
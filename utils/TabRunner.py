@@ -0,0 +1,176 @@
+import copy
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.switch_to import SwitchTo
+from utils.SessionPool import SessionPool
+
+log = logging.getLogger(__name__)
+
+# Longest single in-browser wait of a tab driver. A wait holds the session
+# while it runs, so tabs wait in short slices to let the others make progress.
+TAB_SCRIPT_WAIT = 0.25
+
+
+class TabGroup:
+    """
+    Consecutive parametrized cases of one test function that run together as
+    tabs of the first case's ("leader") browser.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.leader = items[0]
+        # {case id: exception or None}, filled in when the leader runs the group
+        self.outcomes = None
+        self.artifacts = {}
+
+    @property
+    def has_run(self):
+        return self.outcomes is not None
+
+
+class TabSession:
+    """
+    Shares one WebDriver session between several tab drivers.
+
+    Each tab driver is a shallow clone of the session's driver whose every
+    command (including WebElement commands, which go through the clone)
+    takes the session lock and first switches to the tab's window if another
+    tab was active. With Chrome DevTools, every tab is opened in its own
+    browser context, so cookies and storage are isolated between cases.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.host_handle = driver.current_window_handle
+        self.current_handle = self.host_handle
+        self.lock = threading.RLock()
+        self.isolated = hasattr(driver, "execute_cdp_cmd")
+
+    def open_tab(self):
+        """
+        Returns (window handle, browser context id) of a new isolated tab,
+        or None if isolated tabs are not available in this browser.
+        """
+        if not self.isolated:
+            return None
+        with self.lock:
+            self._focus(self.host_handle)
+            before = set(self.driver.window_handles)
+            try:
+                context_id = self.driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+                target_id = self.driver.execute_cdp_cmd(
+                    "Target.createTarget",
+                    {"url": "about:blank", "browserContextId": context_id, "newWindow": True},
+                )["targetId"]
+            except WebDriverException as e:
+                log.warning(f"Browser contexts are not available, running cases one at a time: {e.msg}")
+                self.isolated = False
+                return None
+
+            new_handles = [handle for handle in self.driver.window_handles if handle not in before]
+            handle = target_id if target_id in new_handles else (new_handles[0] if new_handles else None)
+            if handle is None:
+                log.warning("The new browser context has no WebDriver window, running cases one at a time.")
+                self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+                self.isolated = False
+                return None
+            return handle, context_id
+
+    def close_tab(self, handle, context_id):
+        with self.lock:
+            try:
+                self._focus(handle)
+                self.driver.close()
+            finally:
+                self.current_handle = None
+                self._focus(self.host_handle)
+                self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+
+    def tab_driver(self, handle):
+        """
+        Returns a driver whose commands all run in the window 'handle'.
+        """
+        tab = copy.copy(self.driver)
+        tab._switch_to = SwitchTo(tab)
+        driver_cls = type(self.driver)
+
+        def execute(driver_command, params=None):
+            with self.lock:
+                self._focus(handle)
+                # Runs on the clone, so returned WebElements belong to it
+                return driver_cls.execute(tab, driver_command, params)
+
+        tab.execute = execute
+        tab.max_script_wait = TAB_SCRIPT_WAIT
+        recorder = getattr(self.driver, "_command_recorder", None)
+        if recorder is not None:
+            recorder.attach(tab)
+        return tab
+
+    def _focus(self, handle):
+        if self.current_handle != handle:
+            self.driver.execute(Command.SWITCH_TO_WINDOW, {"handle": handle})
+            self.current_handle = handle
+
+
+def run_cases(driver, cases, max_tabs, on_failure=None):
+    """
+    Runs 'cases' ([(case id, function(driver)), ...]) in tabs of 'driver',
+    at most 'max_tabs' at a time. If isolated tabs are not available, the
+    cases run one after another in the browser's own window, which is reset
+    between them.
+
+    'on_failure(driver, case id)' is called while a failed case's tab is still
+    open (e.g. to take a screenshot). Returns {case id: exception or None}.
+    """
+    session = TabSession(driver)
+    outcomes = {}
+
+    def run_one(case_id, function):
+        tab = session.open_tab()
+        if tab is None:
+            # Not isolated: only one case may use the browser at a time
+            with session.lock:
+                session._focus(session.host_handle)
+                outcomes[case_id] = _call(driver, case_id, function, on_failure)
+                SessionPool.reset(driver)
+            return
+
+        handle, context_id = tab
+        try:
+            outcomes[case_id] = _call(session.tab_driver(handle), case_id, function, on_failure)
+        finally:
+            session.close_tab(handle, context_id)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_tabs), thread_name_prefix="tab") as executor:
+        for future in [executor.submit(run_one, case_id, function) for case_id, function in cases]:
+            future.result()
+
+    with session.lock:
+        session._focus(session.host_handle)
+    log.info(f"Ran {len(cases)} case(s) in {'isolated tabs' if session.isolated else 'one window'}.")
+    return outcomes
+
+
+def _call(driver, case_id, function, on_failure):
+    try:
+        function(driver)
+        return None
+    except pytest.skip.Exception as e:
+        return e
+    except (KeyboardInterrupt, SystemExit):
+        raise
+    except BaseException as e:
+        # BaseException also covers pytest.fail() outcomes
+        log.error(f"Case '{case_id}' failed in its tab: {e}")
+        if on_failure is not None:
+            try:
+                on_failure(driver, case_id)
+            except Exception as capture_error:
+                log.warning(f"Could not capture artifacts for '{case_id}': {capture_error}")
+        return e